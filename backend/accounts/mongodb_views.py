@@ -1,14 +1,47 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from core.mongodb import get_users_collection, db, client
-from bson import json_util
+from rest_framework.utils.urls import replace_query_param
+from django.http import StreamingHttpResponse
+from pymongo.errors import PyMongoError
+from core.mirrors import get_mirror
+from core.health import get_snapshot
+from core.mongodb import dumps_document, get_users_collection, mongo_call
+from core.mongo_sync import ensure_indexes
 import json
 
+USERS_PAGE_SIZE = 100
+MAX_USERS_PAGE_SIZE = 500
+
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def mongodb_users_list(request):
-    """Get all users from MongoDB Atlas"""
+    """
+    Get users from MongoDB Atlas, streamed in _id order
+    ?role= and ?department= filter through the mirror's indexes, ?fields=email,role
+    projects, ?limit= sets the page size and the "next" link continues after the last _id
+    """
+    spec = get_mirror('users')
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', USERS_PAGE_SIZE)), MAX_USERS_PAGE_SIZE))
+    except ValueError:
+        limit = USERS_PAGE_SIZE
+    
+    projection = None
+    if request.query_params.get('fields'):
+        fields = [field.strip() for field in request.query_params['fields'].split(',') if field.strip()]
+        unknown = set(fields) - set(spec.keys)
+        if unknown:
+            return Response({
+                'status': 'error',
+                'message': f"Unknown fields: {', '.join(sorted(unknown))}"
+            }, status=400)
+        projection = dict.fromkeys(fields, 1)
+    
+    query = {key: request.query_params[key] for key in ('role', 'department') if request.query_params.get(key)}
+    if request.query_params.get('after'):
+        query['_id'] = {'$gt': request.query_params['after']}
+    
     try:
         users_collection = get_users_collection()
         if users_collection is None:
@@ -17,52 +50,74 @@ def mongodb_users_list(request):
                 'message': 'MongoDB not connected'
             }, status=500)
         
-        users = list(users_collection.find({}).limit(100))
-        
-        # Convert MongoDB documents to JSON-serializable format
-        users_json = json.loads(json_util.dumps(users))
-        
-        return Response({
-            'status': 'success',
-            'count': len(users),
-            'users': users_json
-        })
+        ensure_indexes(spec)
+        with mongo_call():
+            # One extra document tells whether another page follows
+            cursor = users_collection.find(query, projection).sort('_id', 1).limit(limit + 1).batch_size(limit + 1)
+            # Run the query now so connection errors still get an error response
+            first = next(cursor, None)
         
     except Exception as e:
         return Response({
             'status': 'error',
             'message': str(e)
         }, status=500)
+    
+    def stream():
+        yield '{"status":"success","users":['
+        count = 0
+        last_id = None
+        has_more = False
+        document = first
+        try:
+            while document is not None:
+                if count == limit:
+                    has_more = True
+                    break
+                yield (',' if count else '') + dumps_document(document)
+                count += 1
+                last_id = document['_id']
+                document = next(cursor, None)
+        except PyMongoError as e:
+            # Headers are already sent; end the page early and let the client follow "next"
+            print(f"❌ MongoDB user listing interrupted: {e}")
+            has_more = True
+        finally:
+            cursor.close()
+        
+        next_link = None
+        if has_more and last_id is not None:
+            next_link = replace_query_param(request.build_absolute_uri(), 'after', last_id)
+        yield f'],"count":{count},"next":{json.dumps(next_link)}}}'
+    
+    return StreamingHttpResponse(stream(), content_type='application/json')
 
 @api_view(['GET'])
 def mongodb_status(request):
-    """Check MongoDB connection status"""
-    try:
-        if client is None:
-            return Response({
-                'status': 'disconnected',
-                'message': 'MongoDB client not initialized'
-            })
-        
-        # Ping the database
-        client.admin.command('ping')
-        
-        # Get database stats
-        stats = db.command('dbstats')
-        
+    """Check MongoDB connection status (served from the cached health snapshot)"""
+    snapshot = get_snapshot()
+    if snapshot is None:
         return Response({
-            'status': 'connected',
-            'database': db.name,
-            'collections': db.list_collection_names(),
-            'stats': {
-                'collections': stats.get('collections', 0),
-                'objects': stats.get('objects', 0),
-                'dataSize': stats.get('dataSize', 0),
-            }
-        })
-        
-    except Exception as e:
+            'status': 'starting',
+            'message': 'MongoDB status not collected yet'
+        }, status=503)
+    
+    mongo = snapshot['mongodb']
+    if mongo['status'] != 'up':
         return Response({
-            'status': 'error',
-            'message': str(e)
-        }, status=500)
+            'status': 'disconnected',
+            'message': mongo.get('error', 'MongoDB client not initialized or circuit breaker open'),
+            'health': mongo['health'],
+            'outbox': mongo['outbox'],
+            'checked_seconds_ago': snapshot['age_seconds']
+        })
+    
+    return Response({
+        'status': 'connected',
+        'database': mongo['database'],
+        'collections': mongo['collections'],
+        'health': mongo['health'],
+        'outbox': mongo['outbox'],
+        'stats': mongo['stats'],
+        'checked_seconds_ago': snapshot['age_seconds']
+    })
@@ -6,6 +6,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
 from .serializers import RegisterSerializer, UserSerializer, ChangePasswordSerializer
+from notifications.utils import refresh_user_groups
 
 User = get_user_model()
 
@@ -72,10 +73,14 @@ def get_current_user(request):
 def update_profile(request):
     """Update user profile"""
     user = request.user
+    groups_before = (user.role, user.department)
     serializer = UserSerializer(user, data=request.data, partial=True)
     
     if serializer.is_valid():
         serializer.save()
+        # Open sockets move to the new role/department groups
+        if (user.role, user.department) != groups_before:
+            refresh_user_groups(user.id)
         return Response(serializer.data)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -25,7 +25,7 @@ ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(','
 # Application definition
 
 INSTALLED_APPS = [
-    # 'daphne',  # Must be first for Channels - Temporarily disabled
+    'daphne',  # Must be first for Channels
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -37,9 +37,10 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
-    # 'channels',  # Temporarily disabled
+    'channels',
     
     # Local apps
+    'core',
     'accounts',
     'lost_found',
     'events',
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
     'clubs',
     'notifications',
     'chatbot',
+    'search',
 ]
 
 MIDDLEWARE = [
@@ -179,11 +181,95 @@ CORS_ALLOW_HEADERS = ['*']
 CORS_ALLOW_METHODS = ['*']
 
 # Channels settings
+# Queued notifications are pushed by notification_worker, a separate process,
+# so the layer must be shared between processes: DatabaseChannelLayer (through
+# the database, no broker) unless NOTIFICATION_QUEUE_EAGER delivers inline, or
+# channels_redis.core.RedisChannelLayer for larger deployments. The in-memory
+# layer only reaches sockets of the same process.
+NOTIFICATION_QUEUE_EAGER = os.environ.get('NOTIFICATION_QUEUE_EAGER', 'False') == 'True'
+CHANNEL_LAYER_BACKEND = os.environ.get(
+    'CHANNEL_LAYER_BACKEND',
+    'channels.layers.InMemoryChannelLayer' if NOTIFICATION_QUEUE_EAGER else 'notifications.layers.DatabaseChannelLayer',
+)
 CHANNEL_LAYERS = {
     'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer'
+        'BACKEND': CHANNEL_LAYER_BACKEND,
     }
 }
+if CHANNEL_LAYER_BACKEND == 'notifications.layers.DatabaseChannelLayer':
+    CHANNEL_LAYERS['default']['CONFIG'] = {
+        'poll_interval': float(os.environ.get('CHANNEL_LAYER_POLL_INTERVAL', '0.2')),
+    }
+elif os.environ.get('CHANNEL_LAYER_LOCATION'):
+    CHANNEL_LAYERS['default']['CONFIG'] = {
+        'hosts': [os.environ['CHANNEL_LAYER_LOCATION']],
+    }
+
+# Full-text search backend (dotted path); empty picks one for the database vendor
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', '')
+
+# Cache used for list responses and broadcast unread counts. Invalidation bumps
+# versions stored in the cache itself, so it must be shared between processes.
+# The default file cache is shared by every process on this host; with servers on
+# several hosts point CACHE_BACKEND/CACHE_LOCATION at Redis
+# (django.core.cache.backends.redis.RedisCache) or Memcached. A per-process
+# LocMemCache disables those caches (system check core.W001).
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    }
+}
+
+# Seconds a cached list response may live; writes invalidate it sooner
+LIST_CACHE_TIMEOUT = int(os.environ.get('LIST_CACHE_TIMEOUT', 300))
+
+# Notification outbox drained by `python manage.py notification_worker`
+NOTIFICATION_QUEUE = {
+    'BATCH_SIZE': int(os.environ.get('NOTIFICATION_QUEUE_BATCH_SIZE', 50)),
+    'POLL_INTERVAL': float(os.environ.get('NOTIFICATION_QUEUE_POLL_INTERVAL', 1.0)),
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_BASE': 5,
+    'BACKOFF_MAX': 600,
+    'LOCK_TIMEOUT': 300,
+    # Run jobs inline instead of queueing them (handy when no worker is running)
+    'EAGER': NOTIFICATION_QUEUE_EAGER,
+}
+
+# User changes mirrored to MongoDB by `python manage.py mongo_outbox_worker`
+MONGO_OUTBOX = {
+    'BATCH_SIZE': int(os.environ.get('MONGO_OUTBOX_BATCH_SIZE', 500)),
+    'POLL_INTERVAL': float(os.environ.get('MONGO_OUTBOX_POLL_INTERVAL', 1.0)),
+    'MAX_ATTEMPTS': 10,
+}
+
+# New feedback gets a scored priority and the least loaded eligible faculty/admin
+FEEDBACK_ROUTING = {
+    'ENABLED': os.environ.get('FEEDBACK_AUTO_ROUTING', 'True') == 'True',
+    'MIN_TRAINING_ROWS': 30,
+    'MAX_TRAINING_ROWS': 5000,
+    # Seconds between background retrains; requests use the last trained classifier
+    'RETRAIN_INTERVAL': 3600,
+    # Classifier votes below this probability are ignored
+    'MIN_CONFIDENCE': 0.6,
+    # Each process keeps its own load index and reloads it from the database this often
+    'REBUILD_INTERVAL': 300,
+}
+
+# Health endpoints serve a snapshot refreshed in the background every REFRESH_INTERVAL seconds
+HEALTH_CHECK = {
+    'REFRESH_INTERVAL': int(os.environ.get('HEALTH_REFRESH_INTERVAL', 30)),
+    'STALE_INTERVALS': 3,
+}
+
+# Notification sockets opened with ?batch=1 get bursts coalesced into one frame
+NOTIFICATION_SOCKET = {
+    'BATCH_WINDOW': float(os.environ.get('NOTIFICATION_SOCKET_BATCH_WINDOW', 0.25)),
+    'MAX_WINDOW': 5.0,
+    'MAX_BATCH': 50,
+    # Pending messages kept per slow client before the oldest are dropped
+    'MAX_PENDING': 200,
+}
 
 # Gemini API Key (optional for chatbot)
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
@@ -17,6 +17,7 @@ urlpatterns = [
     path('api/clubs/', include('clubs.urls')),
     path('api/notifications/', include('notifications.urls')),
     path('api/chatbot/', include('chatbot.urls')),
+    path('api/search/', include('search.urls')),
 ]
 
 if settings.DEBUG:
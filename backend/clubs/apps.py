@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ClubsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'clubs'
+    
+    def ready(self):
+        """Import signals when app is ready"""
+        import clubs.signals  # noqa
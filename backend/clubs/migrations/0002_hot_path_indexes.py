@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name'], name='club_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'name'], name='club_active_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clubactivity',
+            index=models.Index(fields=['club', 'created_at'], name='club_activity_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clubmembership',
+            index=models.Index(fields=['club', 'status', 'role'], name='club_member_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clubmembership',
+            index=models.Index(fields=['user', 'status'], name='club_member_user_idx'),
+        ),
+    ]
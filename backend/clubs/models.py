@@ -1,9 +1,47 @@
 from django.db import models
+from django.db.models.functions import Coalesce, RowNumber
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 
+class ClubQuerySet(models.QuerySet):
+    """QuerySet helpers for serializing clubs without per-row queries"""
+    
+    def with_membership_info(self, user=None, recent_activities=5):
+        """
+        Load the president, advisor, member ids and latest activities and
+        annotate member_count and is_member (for the given user) so
+        ClubSerializer runs a fixed number of queries for any page size
+        """
+        active = ClubMembership.objects.filter(club=models.OuterRef('pk'), status='active')
+        member_count = active.order_by().values('club').annotate(
+            count=models.Count('pk')
+        ).values('count')
+        
+        # Rank activities per club so one query fetches the latest N for every club
+        latest_activities = ClubActivity.objects.select_related('posted_by').annotate(
+            rank=models.Window(
+                expression=RowNumber(),
+                partition_by=[models.F('club')],
+                order_by=[models.F('created_at').desc(), models.F('id').desc()],
+            )
+        ).filter(rank__lte=recent_activities)
+        
+        queryset = self.select_related('president', 'faculty_advisor').prefetch_related(
+            models.Prefetch('members', queryset=User.objects.only('id')),
+            models.Prefetch('activities', queryset=latest_activities, to_attr='recent_activity_list'),
+        ).annotate(
+            member_count=Coalesce(
+                models.Subquery(member_count, output_field=models.IntegerField()), 0
+            )
+        )
+        
+        if user is not None and user.is_authenticated:
+            return queryset.annotate(is_member=models.Exists(active.filter(user=user)))
+        return queryset.annotate(is_member=models.Value(False))
+
+
 class Club(models.Model):
     """Model for student clubs"""
     
@@ -29,9 +67,16 @@ class Club(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ClubQuerySet.as_manager()
+    
     class Meta:
         db_table = 'clubs'
         ordering = ['name']
+        indexes = [
+            # Partial: SQLite compares booleans as bare columns, so is_active cannot lead an index
+            models.Index(fields=['name'], name='club_active_name_idx', condition=models.Q(is_active=True)),
+            models.Index(fields=['category', 'name'], name='club_active_category_idx', condition=models.Q(is_active=True)),
+        ]
     
     def __str__(self):
         return self.name
@@ -61,6 +106,10 @@ class ClubMembership(models.Model):
         db_table = 'club_memberships'
         unique_together = ('club', 'user')
         ordering = ['-joined_at']
+        indexes = [
+            models.Index(fields=['club', 'status', 'role'], name='club_member_status_idx'),
+            models.Index(fields=['user', 'status'], name='club_member_user_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.club.name}"
@@ -92,6 +141,9 @@ class ClubActivity(models.Model):
     class Meta:
         db_table = 'club_activities'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['club', 'created_at'], name='club_activity_recent_idx'),
+        ]
         verbose_name_plural = 'Club activities'
     
     def __str__(self):
@@ -40,14 +40,21 @@ class ClubSerializer(serializers.ModelSerializer):
         read_only_fields = ('created_at', 'updated_at')
     
     def get_member_count(self, obj):
+        # Annotated by Club.objects.with_membership_info()
+        if hasattr(obj, 'member_count'):
+            return obj.member_count
         return obj.memberships.filter(status='active').count()
     
     def get_is_member(self, obj):
+        if hasattr(obj, 'is_member'):
+            return obj.is_member
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.memberships.filter(user=request.user, status='active').exists()
         return False
     
     def get_recent_activities(self, obj):
+        if hasattr(obj, 'recent_activity_list'):
+            return ClubActivitySerializer(obj.recent_activity_list, many=True).data
         activities = obj.activities.all()[:5]
         return ClubActivitySerializer(activities, many=True).data
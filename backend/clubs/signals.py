@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.cache import invalidate
+from .models import Club, ClubMembership, ClubActivity
+
+
+@receiver([post_save, post_delete], sender=Club)
+@receiver([post_save, post_delete], sender=ClubMembership)
+@receiver([post_save, post_delete], sender=ClubActivity)
+def invalidate_club_lists(sender, **kwargs):
+    """Cached club lists embed member counts and recent activities"""
+    invalidate('clubs')
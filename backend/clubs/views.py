@@ -2,24 +2,22 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db import models
 from .models import Club, ClubMembership, ClubActivity
 from .serializers import ClubSerializer, ClubMembershipSerializer, ClubActivitySerializer
-from asgiref.sync import async_to_sync
+from search.backends import search_queryset
+from core.cache import CachedListMixin
 from accounts.permissions import IsFacultyOrAdmin, IsOwnerOrFacultyOrAdmin
-from notifications.utils import send_notification_to_all_users
+from notifications.groups import club_group
+from notifications.utils import push_to_group, join_groups, leave_groups
+from notifications.queue import enqueue_notification_to_all_users
 
-# Channels temporarily disabled - function stub
-def get_channel_layer():
-    return None
-
-
-class ClubViewSet(viewsets.ModelViewSet):
+class ClubViewSet(CachedListMixin, viewsets.ModelViewSet):
     """ViewSet for clubs - Admins can create, edit, and delete all clubs"""
     
     queryset = Club.objects.filter(is_active=True)
     serializer_class = ClubSerializer
     permission_classes = [IsAuthenticated]
+    cache_namespace = 'clubs'
     
     def get_permissions(self):
         """
@@ -34,32 +32,38 @@ class ClubViewSet(viewsets.ModelViewSet):
         return [IsAuthenticated()]
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().with_membership_info(self.request.user)
         
         # Filter by category
         category = self.request.query_params.get('category', None)
         if category:
             queryset = queryset.filter(category=category)
         
-        # Search
+        # Full-text search, best matches first
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                models.Q(name__icontains=search) |
-                models.Q(description__icontains=search)
-            )
+            queryset = search_queryset('clubs', queryset, search)
         
         return queryset
     
+    def get_user_fields(self, ids):
+        """Membership flag of the requesting user for cached club lists"""
+        member_of = set(
+            ClubMembership.objects.filter(
+                user=self.request.user, club_id__in=ids, status='active'
+            ).values_list('club_id', flat=True)
+        )
+        return {pk: {'is_member': pk in member_of} for pk in ids}
+    
     def perform_create(self, serializer):
-        """Create club - sends notification to all users"""
+        """Create club - queues a notification to all users"""
         club = serializer.save(created_by=self.request.user)
         
         # Send notification to all users about new club
         created_by = f"{self.request.user.first_name} {self.request.user.last_name}" if self.request.user.first_name else self.request.user.email
         role_badge = "🛡️ Admin" if self.request.user.role == 'admin' else "👨‍🏫 Faculty"
         
-        send_notification_to_all_users(
+        enqueue_notification_to_all_users(
             title=f"🎭 New Club: {club.name}",
             message=f"{role_badge} {created_by} created a new club '{club.name}'. Join now and be part of something amazing!",
             notification_type='club',
@@ -68,14 +72,14 @@ class ClubViewSet(viewsets.ModelViewSet):
         )
     
     def perform_update(self, serializer):
-        """Update club - sends notification to all users"""
+        """Update club - queues a notification to all users"""
         club = serializer.save()
         
         # Send notification to all users about club update
         updated_by = f"{self.request.user.first_name} {self.request.user.last_name}" if self.request.user.first_name else self.request.user.email
         role_badge = "🛡️ Admin" if self.request.user.role == 'admin' else "👨‍🏫 Faculty"
         
-        send_notification_to_all_users(
+        enqueue_notification_to_all_users(
             title=f"📢 Club Updated: {club.name}",
             message=f"{role_badge} {updated_by} updated the club '{club.name}'. Check out the latest updates!",
             notification_type='club',
@@ -99,22 +103,17 @@ class ClubViewSet(viewsets.ModelViewSet):
             club=club,
             user=request.user
         )
+        join_groups(request.user.id, [club_group(club.id)])
         
         # Notify club coordinators
         coordinators = club.memberships.filter(role__in=['president', 'coordinator'])
-        channel_layer = get_channel_layer()
-        for coord in coordinators:
-            async_to_sync(channel_layer.group_send)(
-                f'user_{coord.user.id}',
-                {
-                    'type': 'send_notification',
-                    'message': {
-                        'type': 'club_membership',
-                        'action': 'joined',
-                        'data': ClubMembershipSerializer(membership).data
-                    }
-                }
-            )
+        message = {
+            'type': 'club_membership',
+            'action': 'joined',
+            'data': ClubMembershipSerializer(membership).data
+        }
+        for user_id in coordinators.values_list('user_id', flat=True):
+            push_to_group(f'user_{user_id}', message)
         
         return Response(
             ClubMembershipSerializer(membership).data,
@@ -130,6 +129,7 @@ class ClubViewSet(viewsets.ModelViewSet):
             membership = club.memberships.get(user=request.user, status='active')
             membership.status = 'inactive'
             membership.save()
+            leave_groups(request.user.id, [club_group(club.id)])
             
             return Response({'message': 'Successfully left the club'})
         except ClubMembership.DoesNotExist:
@@ -182,18 +182,11 @@ class ClubViewSet(viewsets.ModelViewSet):
         )
         
         # Notify all club members
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f'club_{club.id}',
-            {
-                'type': 'send_notification',
-                'message': {
-                    'type': 'club_activity',
-                    'action': 'created',
-                    'data': ClubActivitySerializer(activity).data
-                }
-            }
-        )
+        push_to_group(club_group(club.id), {
+            'type': 'club_activity',
+            'action': 'created',
+            'data': ClubActivitySerializer(activity).data
+        })
         
         return Response(
             ClubActivitySerializer(activity).data,
@@ -206,7 +199,7 @@ class ClubViewSet(viewsets.ModelViewSet):
         memberships = ClubMembership.objects.filter(
             user=request.user,
             status='active'
-        ).select_related('club')
-        clubs = [m.club for m in memberships]
+        ).values('club')
+        clubs = Club.objects.with_membership_info(request.user).filter(pk__in=memberships)
         serializer = self.get_serializer(clubs, many=True)
         return Response(serializer.data)
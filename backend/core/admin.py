@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import MongoOutboxEntry
+
+@admin.register(MongoOutboxEntry)
+class MongoOutboxEntryAdmin(admin.ModelAdmin):
+    list_display = ('collection', 'object_id', 'attempts', 'created_at')
+    list_filter = ('collection',)
+    readonly_fields = ('last_error', 'created_at')
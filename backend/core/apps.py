@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    
+    def ready(self):
+        """Queue changes of mirrored models for MongoDB and register system checks"""
+        from . import checks  # noqa: F401
+        from .signals import connect_signals
+        connect_signals()
@@ -0,0 +1,151 @@
+"""
+Shared response cache for read-heavy list endpoints.
+
+CachedListMixin stores the serialized list response under a key built from
+the viewset, the query parameters and a per-namespace version number. Writes
+never delete keys: post_save/post_delete handlers call invalidate(namespace),
+which bumps the version once the transaction commits, so every older entry
+simply stops being read and expires on its own.
+
+Fields that depend on the requesting user (is_registered, is_member, ...) are
+not trusted from the cache; viewsets overlay them per request through
+get_user_fields() with one small query.
+
+The versions only work when every process reads the same cache: a bump made
+by one worker (or by notification_worker) never reaches another worker's
+local memory, which would go on serving the old entries. With a per-process
+backend such as LocMemCache, lists are therefore not cached at all and
+is_shared() tells other users of the versions to skip their caches too.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.response import Response
+
+STATS_KEY = 'listcache:stats:{namespace}:{kind}'
+VERSION_KEY = 'listcache:version:{namespace}'
+
+# Namespaces registered by CachedListMixin subclasses, for cache_stats()
+NAMESPACES = set()
+
+
+def is_shared():
+    """True when the default cache is visible to every process (Redis, Memcached, database, files)"""
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def _incr(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Missing key; add() is a no-op if another process created it meanwhile
+        cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Caches that store nothing (DummyCache) never have the key
+        return None
+
+
+def get_version(namespace):
+    key = VERSION_KEY.format(namespace=namespace)
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock so an evicted version never reuses old keys
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(namespace):
+    """Drop every cached response of a namespace once the current transaction commits"""
+    if not is_shared():
+        # Nothing was cached
+        return
+
+    def bump():
+        key = VERSION_KEY.format(namespace=namespace)
+        if cache.get(key) is None:
+            get_version(namespace)
+        _incr(key)
+    transaction.on_commit(bump)
+
+
+def record(namespace, kind):
+    _incr(STATS_KEY.format(namespace=namespace, kind=kind))
+
+
+def cache_stats():
+    """Hit/miss counters per namespace"""
+    stats = {}
+    for namespace in sorted(NAMESPACES):
+        hits = cache.get(STATS_KEY.format(namespace=namespace, kind='hit'), 0)
+        misses = cache.get(STATS_KEY.format(namespace=namespace, kind='miss'), 0)
+        total = hits + misses
+        stats[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 3) if total else None,
+            'version': cache.get(VERSION_KEY.format(namespace=namespace)),
+        }
+    return stats
+
+
+class CachedListMixin:
+    """
+    Cache the list action of a ModelViewSet
+    Set cache_namespace and override get_user_fields() for per-user fields
+    """
+    
+    cache_namespace = None
+    cache_timeout = None
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_namespace:
+            NAMESPACES.add(cls.cache_namespace)
+    
+    def get_cache_key(self, request):
+        params = sorted(request.query_params.lists())
+        digest = hashlib.md5(repr((request.get_host(), params)).encode()).hexdigest()
+        version = get_version(self.cache_namespace)
+        return f'listcache:{self.cache_namespace}:{version}:{type(self).__name__}:{self.action}:{digest}'
+    
+    def get_user_fields(self, ids):
+        """Return {pk: {field: value}} for the requesting user and the listed ids"""
+        return {}
+    
+    def list(self, request, *args, **kwargs):
+        if not is_shared():
+            # Invalidations from other processes would never reach this copy
+            response = super().list(request, *args, **kwargs)
+            response['X-Cache'] = 'BYPASS'
+            return response
+        
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is None:
+            record(self.cache_namespace, 'miss')
+            response = super().list(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            data = response.data
+            timeout = self.cache_timeout if self.cache_timeout is not None else settings.LIST_CACHE_TIMEOUT
+            cache.set(key, data, timeout)
+            response['X-Cache'] = 'MISS'
+            return response
+        
+        record(self.cache_namespace, 'hit')
+        # The cached copy carries the first requester's values; replace them
+        items = data['results'] if isinstance(data, dict) else data
+        overlay = self.get_user_fields([item['id'] for item in items])
+        for item in items:
+            item.update(overlay.get(item['id'], {}))
+        
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
@@ -0,0 +1,15 @@
+from django.core.checks import Warning, register
+
+from .cache import is_shared
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """List and unread count caches need a cache every process can see"""
+    if is_shared():
+        return []
+    return [Warning(
+        'The default cache is local to each process, so cached lists and unread counts are disabled.',
+        hint='Use the file, Redis or Memcached cache backend (CACHE_BACKEND).',
+        id='core.W001',
+    )]
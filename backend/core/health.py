@@ -0,0 +1,155 @@
+"""
+Cached health snapshot.
+
+Health endpoints never touch a database themselves. A daemon thread, started
+on the first health request of each process, collects the snapshot every
+HEALTH_CHECK['REFRESH_INTERVAL'] seconds: a SELECT 1 round trip and size of
+the SQL database, and the collection list and dbstats for MongoDB
+(skipped while its circuit breaker is open). Requests read the last snapshot
+from memory.
+
+Liveness only says the process answers. Readiness needs a fresh snapshot with
+a working SQL database; MongoDB only feeds the mirror, so an unreachable
+Mongo reports "degraded" without taking the instance out of rotation.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, close_old_connections
+
+from . import mongodb
+
+HEALTH_DEFAULTS = {
+    'REFRESH_INTERVAL': 30,
+    # A snapshot older than this many intervals means the refresher is stuck
+    'STALE_INTERVALS': 3,
+}
+
+_snapshot = None
+_refresher = None
+_lock = threading.Lock()
+
+
+def health_setting(name):
+    """Read a HEALTH_CHECK setting, falling back to HEALTH_DEFAULTS"""
+    return getattr(settings, 'HEALTH_CHECK', {}).get(name, HEALTH_DEFAULTS[name])
+
+
+def _timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, round((time.perf_counter() - started) * 1000, 2)
+
+
+def sql_stats():
+    def query():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            if connection.vendor == 'sqlite':
+                cursor.execute("SELECT page_count * page_size FROM pragma_page_count(), pragma_page_size()")
+            elif connection.vendor == 'postgresql':
+                cursor.execute("SELECT pg_database_size(current_database())")
+            else:
+                return None
+            return cursor.fetchone()[0]
+
+    try:
+        size, latency = _timed(query)
+    except Exception as e:
+        return {'status': 'down', 'vendor': connection.vendor, 'error': str(e)}
+    return {'status': 'up', 'vendor': connection.vendor, 'latency_ms': latency, 'size_bytes': size}
+
+
+def mongo_stats():
+    from .mongo_sync import outbox_lag
+
+    stats = {'health': mongodb.health(), 'outbox': outbox_lag()}
+    db = mongodb.get_db()
+    if db is None:
+        return dict(stats, status='down', database=mongodb.MONGODB_DB_NAME)
+
+    def query():
+        with mongodb.mongo_call():
+            collections = db.list_collection_names()
+            try:
+                dbstats = db.command('dbstats')
+            except NotImplementedError:
+                # mongomock has no dbstats
+                dbstats = {'collections': len(collections)}
+            return dbstats, collections
+
+    try:
+        (dbstats, collections), latency = _timed(query)
+    except Exception as e:
+        return dict(stats, status='down', database=db.name, error=str(e), health=mongodb.health())
+    return dict(
+        stats,
+        status='up',
+        database=db.name,
+        latency_ms=latency,
+        collections=collections,
+        stats={
+            'collections': dbstats.get('collections', 0),
+            'objects': dbstats.get('objects', 0),
+            'dataSize': dbstats.get('dataSize', 0),
+        },
+        health=mongodb.health(),
+    )
+
+
+def refresh():
+    """Collect a new snapshot and publish it to this process"""
+    global _snapshot
+    try:
+        snapshot = {'sql': sql_stats(), 'mongodb': mongo_stats()}
+    finally:
+        # The refresher thread holds its own connection; don't keep it open between runs
+        close_old_connections()
+        connection.close()
+    snapshot['collected_at'] = time.time()
+    _snapshot = snapshot
+    return snapshot
+
+
+def _run():
+    while True:
+        try:
+            refresh()
+        except Exception as e:
+            print(f"❌ Health refresh failed: {e}")
+        time.sleep(health_setting('REFRESH_INTERVAL'))
+
+
+def ensure_refresher():
+    """Start this process's refresher thread (once)"""
+    global _refresher
+    if _refresher is not None and _refresher.is_alive():
+        return
+    with _lock:
+        if _refresher is None or not _refresher.is_alive():
+            _refresher = threading.Thread(target=_run, name='health-refresher', daemon=True)
+            _refresher.start()
+
+
+def get_snapshot():
+    """Last snapshot (None until the first refresh finished), with its age in seconds"""
+    ensure_refresher()
+    snapshot = _snapshot
+    if snapshot is None:
+        return None
+    return dict(snapshot, age_seconds=round(time.time() - snapshot['collected_at'], 1))
+
+
+def readiness(snapshot):
+    """(ready, status) for a snapshot"""
+    if snapshot is None:
+        return False, 'starting'
+    if snapshot['age_seconds'] > health_setting('REFRESH_INTERVAL') * health_setting('STALE_INTERVALS'):
+        return False, 'stale'
+    if snapshot['sql']['status'] != 'up':
+        return False, 'unavailable'
+    if snapshot['mongodb']['status'] != 'up':
+        return True, 'degraded'
+    return True, 'ok'
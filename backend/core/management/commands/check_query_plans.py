@@ -0,0 +1,156 @@
+"""
+Run the hot API paths against seeded rows and EXPLAIN QUERY PLAN every
+SELECT they issue. A ``SCAN`` of a project table fails the check, except an
+in-order index walk on unfiltered lists. Everything runs inside a
+transaction that is rolled back, so it is safe against a development
+database. SQLite only.
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from clubs.models import Club, ClubActivity, ClubMembership
+from events.models import Event, EventRegistration
+from feedback.models import Feedback
+from lost_found.models import Claim, LostFoundItem
+from notifications.models import BroadcastNotification, Notification
+
+User = get_user_model()
+
+# (role of the requesting user, url, unfiltered); {event}, {club} and {item} are
+# filled in. Unfiltered lists may walk an index in order (the LIMIT stops them
+# early); filtered ones must SEARCH an index on their filter columns.
+HOT_PATHS = [
+    ('student', '/api/notifications/', False),
+    ('student', '/api/notifications/unread_count/', False),
+    ('student', '/api/events/', True),
+    ('student', '/api/events/?category=technical', False),
+    ('student', '/api/events/?status=upcoming', False),
+    ('student', '/api/events/?category=technical&status=upcoming', False),
+    ('student', '/api/events/registered_events/', False),
+    ('faculty', '/api/events/my_events/', False),
+    ('student', '/api/clubs/', True),
+    ('student', '/api/clubs/?category=technical', False),
+    ('student', '/api/clubs/my_clubs/', False),
+    ('student', '/api/clubs/{club}/members/', False),
+    ('student', '/api/clubs/{club}/activities/', False),
+    ('student', '/api/lost-found/items/', True),
+    ('student', '/api/lost-found/items/?type=lost&status=active', False),
+    ('student', '/api/lost-found/items/?type=found&status=active&category=electronics', False),
+    ('student', '/api/lost-found/items/?status=active', False),
+    ('student', '/api/lost-found/items/my_items/', False),
+    ('student', '/api/lost-found/items/{item}/matches/', False),
+    ('student', '/api/lost-found/claims/', False),
+    ('admin', '/api/lost-found/claims/', True),
+    ('student', '/api/feedback/', False),
+    ('admin', '/api/feedback/', True),
+    ('admin', '/api/feedback/?status=pending', False),
+    ('admin', '/api/feedback/?status=pending&priority=high', False),
+    ('admin', '/api/feedback/?status=pending&priority=high&category=academic', False),
+]
+
+ALIAS_RE = re.compile(r'"(\w+)" (U\d+|T\d+|V\d+)')
+SCAN_RE = re.compile(r'^SCAN (\S+)( USING (?:COVERING )?INDEX \S+)?$')
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN QUERY PLAN the hot API queries and fail on full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not just failures')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('check_query_plans reads SQLite EXPLAIN QUERY PLAN output; run it against SQLite')
+
+        self.verbose = options['verbose_plans']
+        self.project_tables = {
+            model._meta.db_table for model in (
+                Notification, BroadcastNotification, Event, EventRegistration, Club, ClubMembership,
+                ClubActivity, LostFoundItem, Claim, Feedback, User,
+            )
+        }
+        self.failures = []
+
+        # A dummy cache makes every list request reach the database
+        dummy_cache = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with override_settings(CACHES=dummy_cache, ALLOWED_HOSTS=['testserver']):
+            try:
+                with transaction.atomic():
+                    self.run_paths(self.seed())
+                    raise Rollback
+            except Rollback:
+                pass
+
+        if self.failures:
+            for url, sql, detail in self.failures:
+                self.stderr.write(f"❌ {url}\n   {detail}\n   {sql[:300]}")
+            raise CommandError(f"{len(self.failures)} queries fall back to a full table scan")
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(HOT_PATHS)} hot paths use indexes"))
+
+    def seed(self):
+        """Create a few rows of everything so every query path actually runs"""
+        now = timezone.now()
+        users = {
+            role: User.objects.create_user(email=f'plan-check-{role}@example.invalid', password=None, role=role)
+            for role in ('student', 'faculty', 'admin')
+        }
+        student = users['student']
+        event = Event.objects.create(
+            title='Plan check', description='Plan check', category='technical', venue='Hall',
+            start_date=now, end_date=now, organizer=users['faculty'], max_participants=10,
+        )
+        EventRegistration.objects.create(event=event, user=student)
+        club = Club.objects.create(name='Plan check club', description='Plan check', category='technical')
+        ClubMembership.objects.create(club=club, user=student)
+        ClubActivity.objects.create(club=club, activity_type='announcement', title='Plan check', description='Plan check', posted_by=users['faculty'])
+        item = LostFoundItem.objects.create(
+            item_type='lost', title='Plan check phone', description='Plan check', category='electronics',
+            location='Library', date_lost_found=now.date(), reported_by=student,
+        )
+        Claim.objects.create(item=item, claimer=student, description='Plan check')
+        Feedback.objects.create(title='Plan check', description='Plan check', category='academic', submitted_by=student)
+        Notification.objects.create(user=student, notification_type='general', title='Plan check', message='Plan check')
+        BroadcastNotification.objects.create(notification_type='general', title='Plan check', message='Plan check')
+        return {'users': users, 'event': event.pk, 'club': club.pk, 'item': item.pk}
+
+    def run_paths(self, seeded):
+        for role, url, unfiltered in HOT_PATHS:
+            url = url.format(**seeded)
+            client = APIClient()
+            client.force_authenticate(seeded['users'][role])
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f"GET {url} returned {response.status_code}")
+
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                    self.check_plan(url, sql, unfiltered)
+
+    def check_plan(self, url, sql, unfiltered):
+        aliases = dict((alias, table) for table, alias in ALIAS_RE.findall(sql))
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = [row[-1] for row in cursor.fetchall()]
+
+        if self.verbose:
+            self.stdout.write(f"{url}\n  {sql[:200]}\n  " + '\n  '.join(plan))
+
+        for detail in plan:
+            match = SCAN_RE.match(detail)
+            if not match or aliases.get(match.group(1), match.group(1)) not in self.project_tables:
+                continue
+            if match.group(2) and unfiltered:
+                continue
+            self.failures.append((url, sql, detail))
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from pymongo.errors import PyMongoError
+
+from core.mongo_sync import flush_batch, outbox_lag, outbox_setting, retry_dead_entries
+from core.mongodb import MongoUnavailable
+
+
+class Command(BaseCommand):
+    help = 'Write queued changes of every mirrored model to MongoDB in bulk (runs until interrupted)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Outbox entries per bulk_write')
+        parser.add_argument('--interval', type=float, default=None, help='Seconds to sleep when the outbox is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit')
+        parser.add_argument('--retry-dead', action='store_true', help='Retry entries that ran out of attempts')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or outbox_setting('BATCH_SIZE')
+        interval = options['interval'] if options['interval'] is not None else outbox_setting('POLL_INTERVAL')
+
+        if options['retry_dead']:
+            count = retry_dead_entries()
+            self.stdout.write(f"Requeued {count} dead entries")
+
+        self.stdout.write(f"MongoDB outbox worker started ({outbox_lag()})")
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    applied = flush_batch(batch_size)
+                except MongoUnavailable as e:
+                    # Entries stay queued; the circuit breaker spaces out the retries
+                    self.stderr.write(f"❌ {e}")
+                    if options['once']:
+                        break
+                    time.sleep(interval)
+                    continue
+                except (PyMongoError, ValueError) as e:
+                    self.stderr.write(f"❌ Batch rejected: {e}")
+                    applied = 0
+
+                if applied:
+                    lag = outbox_lag()
+                    self.stdout.write(f"Mirrored {applied} changes, {lag['pending']} pending, lag {lag['lag_seconds']}s")
+
+                if applied < batch_size:
+                    if options['once']:
+                        break
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write("MongoDB outbox worker stopped")
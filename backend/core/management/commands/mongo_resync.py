@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.mirrors import MIRRORS
+from core.mongo_sync import resync
+from core.mongodb import MongoUnavailable
+
+
+class Command(BaseCommand):
+    help = 'Copy every row of the mirrored models to MongoDB in bulk_write chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('collections', nargs='*', help=f"Collections to resync (default: all of {', '.join(MIRRORS)})")
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows per bulk_write')
+        parser.add_argument('--prune', action='store_true', help='Delete documents whose row no longer exists')
+
+    def handle(self, *args, **options):
+        collections = options['collections'] or list(MIRRORS)
+        unknown = set(collections) - set(MIRRORS)
+        if unknown:
+            raise CommandError(f"Unknown collections: {', '.join(sorted(unknown))}")
+
+        for collection in collections:
+            try:
+                written, pruned = resync(MIRRORS[collection], chunk_size=options['chunk_size'], prune=options['prune'])
+            except MongoUnavailable as e:
+                raise CommandError(str(e))
+            message = f"Mirrored {written} rows to {collection}"
+            if options['prune']:
+                message += f", pruned {pruned}"
+            self.stdout.write(self.style.SUCCESS(message))
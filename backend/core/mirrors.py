@@ -0,0 +1,129 @@
+"""
+Models mirrored into MongoDB.
+
+Each MirrorSpec maps one model to a collection with a declarative field list:
+a field name is copied as is, a (key, source) pair stores ``source`` under
+``key``, where source is an attribute name or a callable taking the instance.
+Documents are keyed by the primary key as a string ('_id'). Changes are
+captured by signals into the outbox (core.mongo_sync) and written in bulk.
+"""
+import datetime
+from decimal import Decimal
+
+from django.apps import apps
+from django.db.models.fields.files import FieldFile
+
+
+def to_bson(value):
+    """Convert a model value into something BSON can store"""
+    if isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.date):
+        # BSON has no date type
+        return datetime.datetime.combine(value, datetime.time.min)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, FieldFile):
+        return value.name or None
+    return value
+
+
+class MirrorSpec:
+    """Description of one mirrored model"""
+    
+    def __init__(self, collection, model, fields, related=(), ignore_fields=(), indexes=()):
+        self.collection = collection
+        self.model_label = model
+        self.fields = [(field, field) if isinstance(field, str) else field for field in fields]
+        self.related = related
+        # Saves touching only these fields are not mirrored
+        self.ignore_fields = set(ignore_fields)
+        # MongoDB index key lists, e.g. [('role', 1), ('_id', 1)]
+        self.indexes = indexes
+    
+    @property
+    def keys(self):
+        """Document keys, '_id' first"""
+        return ['_id'] + [key for key, source in self.fields]
+    
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+    
+    def get_queryset(self):
+        return self.model.objects.select_related(*self.related).order_by('pk')
+    
+    def to_pk(self, object_id):
+        return self.model._meta.pk.to_python(object_id)
+    
+    def should_capture(self, update_fields):
+        return not (update_fields and set(update_fields) <= self.ignore_fields)
+    
+    def document(self, instance):
+        document = {'_id': str(instance.pk)}
+        for key, source in self.fields:
+            value = source(instance) if callable(source) else getattr(instance, source)
+            document[key] = to_bson(value)
+        return document
+
+
+def _now_iso(instance):
+    return datetime.datetime.now().isoformat()
+
+
+MIRRORS = {
+    spec.collection: spec for spec in [
+        # Same document shape the user sync has always written
+        MirrorSpec(
+            'users', 'accounts.User',
+            (
+                ('user_id', 'id'), 'email', 'first_name', 'last_name', 'role',
+                ('phone', lambda user: user.phone or ''),
+                ('roll_number', lambda user: user.roll_number or ''),
+                ('department', lambda user: user.department or ''),
+                'is_active', 'is_staff',
+                ('date_joined', lambda user: user.date_joined.isoformat() if user.date_joined else _now_iso(user)),
+                ('last_updated', _now_iso),
+            ),
+            ignore_fields=('last_login',),
+            # Admin listing filters, walked in _id order
+            indexes=([('role', 1), ('_id', 1)], [('department', 1), ('_id', 1)]),
+        ),
+        MirrorSpec(
+            'events', 'events.Event',
+            (
+                'title', 'description', 'category', 'venue', 'start_date', 'end_date',
+                'max_participants', 'registered_count', 'registration_deadline', 'status',
+                ('organizer_id', 'organizer_id'), 'image', 'created_at', 'updated_at',
+            ),
+        ),
+        MirrorSpec(
+            'lost_found', 'lost_found.LostFoundItem',
+            (
+                'item_type', 'title', 'description', 'category', 'location', 'date_lost_found',
+                'status', ('reported_by_id', 'reported_by_id'), ('claimed_by_id', 'claimed_by_id'),
+                'image', 'created_at', 'updated_at',
+            ),
+        ),
+        MirrorSpec(
+            'feedback', 'feedback.Feedback',
+            (
+                'title', 'description', 'category', 'priority', 'status', 'is_anonymous',
+                # Anonymous feedback stays anonymous in the mirror too
+                ('submitted_by_id', lambda feedback: None if feedback.is_anonymous else feedback.submitted_by_id),
+                ('assigned_to_id', 'assigned_to_id'), 'attachment', 'created_at', 'updated_at',
+            ),
+        ),
+    ]
+}
+
+
+def get_mirror(collection):
+    return MIRRORS[collection]
+
+
+def get_mirror_for_model(model):
+    for spec in MIRRORS.values():
+        if spec.model_label == model._meta.label:
+            return spec
+    return None
@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class MongoOutboxEntry(models.Model):
+    """Pending change to a mirrored row, written to MongoDB by mongo_outbox_worker"""
+    
+    collection = models.CharField(max_length=50)
+    object_id = models.CharField(max_length=64)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'mongo_outbox'
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"{self.collection}:{self.object_id}"
@@ -0,0 +1,200 @@
+"""
+Outbox for mirroring models to MongoDB.
+
+Saving or deleting a mirrored row (see core.mirrors) only inserts a
+MongoOutboxEntry (collection and object id) in the same transaction, so
+nothing waits on MongoDB during a request. ``python manage.py
+mongo_outbox_worker`` takes entries in id order, reloads the current rows
+with one query per collection and writes each collection with a single
+unordered bulk_write: an upsert for rows that exist, a delete for rows that
+are gone. Every write carries the current state keyed by _id, so replaying a
+batch after a crash is harmless and repeated saves of one row collapse into
+one write. Entries are deleted only after MongoDB acknowledged the batch.
+Run a single worker.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.utils import timezone
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import PyMongoError
+
+from .mirrors import MIRRORS
+from .models import MongoOutboxEntry
+from .mongodb import get_db, mongo_call, MongoUnavailable
+
+OUTBOX_DEFAULTS = {
+    'BATCH_SIZE': 500,
+    'POLL_INTERVAL': 1.0,
+    'MAX_ATTEMPTS': 10,
+}
+
+
+# Collections whose indexes were ensured by this process
+_indexed = set()
+
+
+def outbox_setting(name):
+    """Read a MONGO_OUTBOX setting, falling back to OUTBOX_DEFAULTS"""
+    return getattr(settings, 'MONGO_OUTBOX', {}).get(name, OUTBOX_DEFAULTS[name])
+
+
+def enqueue(collection, object_id):
+    """Record that a mirrored row changed; call inside the transaction that changed it"""
+    return MongoOutboxEntry.objects.create(collection=collection, object_id=str(object_id))
+
+
+def enqueue_many(collection, object_ids):
+    """enqueue() for rows changed by one bulk update"""
+    return MongoOutboxEntry.objects.bulk_create([
+        MongoOutboxEntry(collection=collection, object_id=str(object_id)) for object_id in object_ids
+    ])
+
+
+def build_operations(spec, object_ids):
+    """Upserts for rows that exist, deletes for the rest"""
+    rows = spec.get_queryset().in_bulk([spec.to_pk(object_id) for object_id in object_ids])
+    operations = []
+    for object_id in object_ids:
+        instance = rows.get(spec.to_pk(object_id))
+        if instance is None:
+            operations.append(DeleteOne({'_id': object_id}))
+        else:
+            operations.append(UpdateOne({'_id': object_id}, {'$set': spec.document(instance)}, upsert=True))
+    return operations
+
+
+def ensure_indexes(spec, db=None):
+    """Create a mirror's MongoDB indexes once per process (create_index is a no-op when they exist)"""
+    if spec.collection in _indexed or not spec.indexes:
+        return
+    db = db if db is not None else get_db()
+    if db is None:
+        raise MongoUnavailable("MongoDB unavailable")
+    with mongo_call():
+        for keys in spec.indexes:
+            db[spec.collection].create_index(keys)
+    _indexed.add(spec.collection)
+
+
+def flush_batch(batch_size=None):
+    """
+    Write one batch of outbox entries to MongoDB; returns the number of entries applied
+    Raises MongoUnavailable (entries kept) when MongoDB cannot be reached
+    """
+    entries = list(
+        MongoOutboxEntry.objects.filter(attempts__lt=outbox_setting('MAX_ATTEMPTS'))
+        .order_by('id')[:batch_size or outbox_setting('BATCH_SIZE')]
+    )
+    if not entries:
+        return 0
+
+    db = get_db()
+    if db is None:
+        raise MongoUnavailable("MongoDB unavailable")
+
+    # Later entries for the same object add nothing: the current row is written once
+    object_ids = {}
+    for entry in entries:
+        object_ids.setdefault(entry.collection, {})[entry.object_id] = True
+
+    try:
+        for collection, ids in object_ids.items():
+            if collection not in MIRRORS:
+                raise ValueError(f"Unknown mirrored collection: {collection}")
+            ensure_indexes(MIRRORS[collection], db)
+            operations = build_operations(MIRRORS[collection], list(ids))
+            with mongo_call():
+                db[collection].bulk_write(operations, ordered=False)
+    except MongoUnavailable:
+        raise
+    except (PyMongoError, ValueError) as e:
+        # Rejected by the server; retried until MAX_ATTEMPTS, then left for --retry-dead
+        MongoOutboxEntry.objects.filter(pk__in=[entry.pk for entry in entries]).update(
+            attempts=F('attempts') + 1, last_error=str(e)[:2000]
+        )
+        raise
+
+    MongoOutboxEntry.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+    return len(entries)
+
+
+def retry_dead_entries():
+    """Give entries that ran out of attempts a fresh budget"""
+    return MongoOutboxEntry.objects.filter(attempts__gte=outbox_setting('MAX_ATTEMPTS')).update(attempts=0, last_error='')
+
+
+def outbox_lag():
+    """Pending entries and the age of the oldest one, i.e. how far the mirror is behind"""
+    pending = MongoOutboxEntry.objects.filter(attempts__lt=outbox_setting('MAX_ATTEMPTS'))
+    oldest = pending.order_by('id').values_list('created_at', flat=True).first()
+    return {
+        'pending': pending.count(),
+        'dead': MongoOutboxEntry.objects.filter(attempts__gte=outbox_setting('MAX_ATTEMPTS')).count(),
+        'lag_seconds': round((timezone.now() - oldest).total_seconds(), 1) if oldest else 0,
+    }
+
+
+def _missing_ids(spec, object_ids):
+    """The object ids among object_ids that have no row in SQL"""
+    pks = {}
+    for object_id in object_ids:
+        try:
+            pks[object_id] = spec.to_pk(object_id)
+        except ValidationError:
+            pks[object_id] = None
+    existing = set(spec.model.objects.filter(pk__in=[pk for pk in pks.values() if pk is not None]).values_list('pk', flat=True))
+    return [object_id for object_id, pk in pks.items() if pk not in existing]
+
+
+def resync(spec, chunk_size=1000, prune=False):
+    """
+    Stream every row of a mirrored model to MongoDB in bulk_write chunks
+    With prune, documents whose row no longer exists are deleted afterwards
+    Returns (written, pruned)
+    """
+    db = get_db()
+    if db is None:
+        raise MongoUnavailable("MongoDB unavailable")
+
+    ensure_indexes(spec, db)
+    collection = db[spec.collection]
+    # Every document written by this run is tagged; prune only looks at the rest
+    run_id = uuid.uuid4().hex if prune else None
+    written = 0
+    batch = []
+
+    def write(batch):
+        with mongo_call():
+            collection.bulk_write(batch, ordered=False)
+
+    # iterator() streams rows (a server-side cursor on Postgres) instead of loading the table
+    for instance in spec.get_queryset().iterator(chunk_size=chunk_size):
+        document = spec.document(instance)
+        if run_id:
+            document['_mirror_run'] = run_id
+        batch.append(UpdateOne({'_id': document['_id']}, {'$set': document}, upsert=True))
+        if len(batch) >= chunk_size:
+            write(batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        write(batch)
+        written += len(batch)
+
+    pruned = 0
+    if run_id:
+        # Untagged documents belong to deleted rows or were written by the outbox
+        # worker for rows created during the run; only the former are deleted
+        with mongo_call():
+            untagged = [document['_id'] for document in collection.find({'_mirror_run': {'$ne': run_id}}, {'_id': 1})]
+        for start in range(0, len(untagged), chunk_size):
+            missing = _missing_ids(spec, untagged[start:start + chunk_size])
+            if missing:
+                with mongo_call():
+                    pruned += collection.delete_many({'_id': {'$in': missing}}).deleted_count
+        with mongo_call():
+            collection.update_many({'_mirror_run': run_id}, {'$unset': {'_mirror_run': ''}})
+    return written, pruned
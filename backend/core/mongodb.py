@@ -1,8 +1,30 @@
-from pymongo import MongoClient
-from pymongo.server_api import ServerApi
-from django.conf import settings
+"""
+Lazily connected MongoDB client.
+
+Nothing touches the network at import time. The MongoClient, which owns the
+connection pool, is created on first use with the pool size and timeouts
+below and shared by the whole process. A circuit breaker counts connection
+failures: after MONGODB_BREAKER_THRESHOLD consecutive ones, callers get None
+(or MongoUnavailable) immediately for MONGODB_BREAKER_RESET seconds instead of
+waiting on server selection, then a single trial call is let through.
+
+Set MONGODB_URI=mongomock:// to use an in-memory mongomock stand-in.
+The old module attributes ``client`` and ``db`` still resolve, lazily.
+"""
+import datetime
+import json
 import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+
 from dotenv import load_dotenv
+from bson import Decimal128, ObjectId
+from pymongo import MongoClient
+from pymongo.errors import ConfigurationError, ConnectionFailure
+from pymongo.server_api import ServerApi
 
 # Load environment variables
 load_dotenv()
@@ -11,41 +33,206 @@ load_dotenv()
 MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb+srv://yashwanthpuligila548:<db_password>@cluster1.p9g3qdo.mongodb.net/?appName=Cluster1')
 MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'klh_campus_hub')
 
-# Create MongoDB client with Server API version
-try:
-    client = MongoClient(MONGODB_URI, server_api=ServerApi('1'))
-    db = client[MONGODB_DB_NAME]
-    
-    # Test connection
-    client.admin.command('ping')
-    print("✅ Pinged your deployment. You successfully connected to MongoDB!")
-    
-except Exception as e:
-    print(f"❌ MongoDB connection failed: {e}")
-    client = None
-    db = None
+# Pool and timeouts (milliseconds); the driver defaults wait 30s for a server
+MONGODB_OPTIONS = {
+    'maxPoolSize': int(os.getenv('MONGODB_MAX_POOL_SIZE', 20)),
+    'minPoolSize': int(os.getenv('MONGODB_MIN_POOL_SIZE', 0)),
+    'serverSelectionTimeoutMS': int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 3000)),
+    'connectTimeoutMS': int(os.getenv('MONGODB_CONNECT_TIMEOUT_MS', 3000)),
+    'socketTimeoutMS': int(os.getenv('MONGODB_SOCKET_TIMEOUT_MS', 10000)),
+}
+BREAKER_THRESHOLD = int(os.getenv('MONGODB_BREAKER_THRESHOLD', 3))
+BREAKER_RESET = float(os.getenv('MONGODB_BREAKER_RESET', 30))
+
+# Errors that mean MongoDB is unreachable, as opposed to a bad query
+CONNECTION_ERRORS = (ConnectionFailure, ConfigurationError)
+
+
+class MongoUnavailable(Exception):
+    """Raised when the circuit breaker is open or no client could be created"""
+
+
+class CircuitBreaker:
+    """Fail fast after repeated connection failures, retrying after a cool-down"""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_timeout=BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self.last_success = None
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let one trial call through; the rest keep failing fast until it reports back
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.last_success = time.time()
+
+    def failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+breaker = CircuitBreaker()
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _create_client():
+    if MONGODB_URI.startswith('mongomock://'):
+        import mongomock
+        return mongomock.MongoClient()
+    # Options spelled out in the URI win over the environment defaults
+    options = {key: value for key, value in MONGODB_OPTIONS.items() if f'{key.lower()}=' not in MONGODB_URI.lower()}
+    return MongoClient(MONGODB_URI, server_api=ServerApi('1'), **options)
+
+
+def get_client():
+    """Shared MongoClient, created on first use; None while MongoDB is unavailable"""
+    global _client
+    if _client is not None:
+        return _client
+    if not breaker.allow():
+        return None
+    with _client_lock:
+        if _client is None:
+            try:
+                # Only SRV/DNS lookups happen here; sockets are opened by the pool on demand
+                _client = _create_client()
+            except CONNECTION_ERRORS as e:
+                breaker.failure(e)
+                print(f"❌ MongoDB connection failed: {e}")
+                return None
+    return _client
+
+
+def get_db():
+    """Database handle, or None while MongoDB is unavailable"""
+    if breaker.state == 'open':
+        return None
+    client = get_client()
+    return client[MONGODB_DB_NAME] if client is not None else None
+
+
+@contextmanager
+def mongo_call():
+    """
+    Guard a MongoDB operation with the circuit breaker
+    Raises MongoUnavailable without touching the network while the breaker is open
+    """
+    if not breaker.allow():
+        raise MongoUnavailable(f"MongoDB unavailable: {breaker.last_error}")
+    try:
+        yield
+    except CONNECTION_ERRORS as e:
+        breaker.failure(e)
+        raise MongoUnavailable(f"MongoDB unavailable: {e}") from e
+    breaker.success()
+
+
+def ping():
+    """Round-trip to the server; returns True when MongoDB answers"""
+    client = get_client()
+    if client is None:
+        return False
+    try:
+        with mongo_call():
+            client.admin.command('ping')
+    except MongoUnavailable:
+        return False
+    return True
+
+
+def health():
+    """Connection and circuit breaker state, without touching the network"""
+    return {
+        'initialized': _client is not None,
+        'breaker': breaker.state,
+        'consecutive_failures': breaker.failures,
+        'last_error': breaker.last_error,
+        'last_success': breaker.last_success,
+        'database': MONGODB_DB_NAME,
+        'max_pool_size': MONGODB_OPTIONS['maxPoolSize'],
+    }
+
+
+def _bson_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, (ObjectId, uuid.UUID)):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return float(value.to_decimal())
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps_document(document):
+    """Plain JSON for a MongoDB document in one pass (no extended-JSON round trip)"""
+    return json.dumps(document, default=_bson_default, separators=(',', ':'))
+
+
+def __getattr__(name):
+    # Backwards compatible `from core.mongodb import client, db`, resolved on first use
+    if name == 'client':
+        return get_client()
+    if name == 'db':
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Collections
 def get_users_collection():
     """Get users collection from MongoDB"""
+    db = get_db()
     if db is not None:
         return db['users']
     return None
 
 def get_events_collection():
     """Get events collection from MongoDB"""
+    db = get_db()
     if db is not None:
         return db['events']
     return None
 
 def get_lost_found_collection():
     """Get lost & found collection from MongoDB"""
+    db = get_db()
     if db is not None:
         return db['lost_found']
     return None
 
 def get_feedback_collection():
     """Get feedback collection from MongoDB"""
+    db = get_db()
     if db is not None:
         return db['feedback']
     return None
@@ -0,0 +1,158 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are fetched with a WHERE clause on the ordering columns of the last row
+seen, e.g. (created_at, id) < (:created_at, :id), instead of OFFSET, so every
+page costs one index range scan and no COUNT(*) is issued. The cursor is an
+opaque token holding that position and the paging direction.
+
+Select it per viewset with a subclass that sets ``ordering``; the last field
+must be unique (normally id) so the position is never ambiguous.
+"""
+import base64
+import json
+from collections import OrderedDict
+from functools import cmp_to_key
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def keyset_filter(ordering, position, reverse=False):
+    """Q for rows strictly after position in the given ordering (before it if reverse)"""
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, position):
+        name = field.lstrip('-')
+        descending = field.startswith('-') != reverse
+        condition |= Q(**equal, **{f'{name}__{"lt" if descending else "gt"}': value})
+        equal[name] = value
+    return condition
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over a compound ordering such as ('-created_at', '-id')"""
+
+    ordering = ('-created_at', '-id')
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    # Used for querysets ranked by search relevance, where there is no stable keyset
+    fallback_class = PageNumberPagination
+
+    def __init__(self):
+        self.fallback = None
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            position, reverse = data['p'], bool(data.get('r'))
+        except (ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        data = json.dumps({'p': position, 'r': int(reverse)}, default=str, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(data.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_position(self, row):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return values
+
+    def compare(self, a, b):
+        for field in self.ordering:
+            name = field.lstrip('-')
+            x = a[name] if isinstance(a, dict) else getattr(a, name)
+            y = b[name] if isinstance(b, dict) else getattr(b, name)
+            if x != y:
+                result = -1 if x < y else 1
+                return -result if field.startswith('-') else result
+        return 0
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if 'search_rank' in queryset.query.extra_select:
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+        return self.paginate_streams([queryset], request, view)
+
+    def paginate_streams(self, querysets, request, view=None):
+        """
+        Paginate the merge of several querysets that share the ordering fields
+        Each one is read with its own keyset query, so no UNION is needed
+        """
+        self.request = request
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.cursor_query_param)
+        position, reverse = self.decode_cursor(request)
+        page_size = self.get_page_size(request)
+
+        ordering = list(self.ordering)
+        if reverse:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+        rows = []
+        for queryset in querysets:
+            if position is not None:
+                queryset = queryset.filter(keyset_filter(self.ordering, position, reverse))
+            rows.extend(queryset.order_by(*ordering)[:page_size + 1])
+
+        rows.sort(key=cmp_to_key(self.compare), reverse=reverse)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        # Paging backwards, the extra row tells whether anything precedes this page
+        if reverse:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        self.next_link = self.previous_link = None
+        if rows and has_next:
+            self.next_link = self.encode_cursor(self.get_position(rows[-1]), False)
+        if rows and has_previous:
+            self.previous_link = self.encode_cursor(self.get_position(rows[0]), True)
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.next_link),
+            ('previous', self.previous_link),
+            ('results', data),
+        ]))
+
+
+class CreatedAtKeysetPagination(KeysetPagination):
+    """Newest first"""
+
+    ordering = ('-created_at', '-id')
+
+
+class StartDateKeysetPagination(KeysetPagination):
+    """Earliest start date first"""
+
+    ordering = ('start_date', 'id')
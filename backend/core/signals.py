@@ -1,57 +1,28 @@
 from django.db.models.signals import post_save, post_delete
-from django.dispatch import receiver
-from accounts.models import User
-from .mongodb import get_users_collection
-from datetime import datetime
 
-@receiver(post_save, sender=User)
-def sync_user_to_mongodb(sender, instance, created, **kwargs):
-    """Sync user to MongoDB whenever a user is created or updated"""
-    try:
-        users_collection = get_users_collection()
-        if users_collection is None:
-            print("⚠️  MongoDB not connected, skipping sync")
-            return
-        
-        user_data = {
-            '_id': str(instance.id),
-            'user_id': instance.id,
-            'email': instance.email,
-            'first_name': instance.first_name,
-            'last_name': instance.last_name,
-            'role': instance.role,
-            'phone': instance.phone or '',
-            'roll_number': instance.roll_number or '',
-            'department': instance.department or '',
-            'is_active': instance.is_active,
-            'is_staff': instance.is_staff,
-            'date_joined': instance.date_joined.isoformat() if instance.date_joined else datetime.now().isoformat(),
-            'last_updated': datetime.now().isoformat(),
-        }
-        
-        # Upsert (update if exists, insert if not)
-        users_collection.update_one(
-            {'_id': str(instance.id)},
-            {'$set': user_data},
-            upsert=True
-        )
-        
-        action = "created" if created else "updated"
-        print(f"✅ User {instance.email} {action} and synced to MongoDB")
-        
-    except Exception as e:
-        print(f"❌ Error syncing user to MongoDB: {e}")
+from .mirrors import MIRRORS, get_mirror_for_model
+from .mongo_sync import enqueue
 
-@receiver(post_delete, sender=User)
-def delete_user_from_mongodb(sender, instance, **kwargs):
-    """Delete user from MongoDB when deleted from Django"""
-    try:
-        users_collection = get_users_collection()
-        if users_collection is None:
-            return
-            
-        users_collection.delete_one({'_id': str(instance.id)})
-        print(f"✅ User {instance.email} deleted from MongoDB")
-        
-    except Exception as e:
-        print(f"❌ Error deleting user from MongoDB: {e}")
+
+def queue_mirror_save(sender, instance, update_fields=None, **kwargs):
+    """Queue a mirrored row for MongoDB whenever it is created or updated"""
+    spec = get_mirror_for_model(sender)
+    # e.g. logins only save last_login, which the users mirror does not store
+    if spec is None or not spec.should_capture(update_fields):
+        return
+    
+    # Written by mongo_outbox_worker; see core.mongo_sync
+    enqueue(spec.collection, instance.pk)
+
+
+def queue_mirror_delete(sender, instance, **kwargs):
+    """Queue the removal of a deleted row from MongoDB"""
+    spec = get_mirror_for_model(sender)
+    if spec is not None:
+        enqueue(spec.collection, instance.pk)
+
+
+def connect_signals():
+    for spec in MIRRORS.values():
+        post_save.connect(queue_mirror_save, sender=spec.model_label, dispatch_uid=f'mirror_save_{spec.collection}')
+        post_delete.connect(queue_mirror_delete, sender=spec.model_label, dispatch_uid=f'mirror_delete_{spec.collection}')
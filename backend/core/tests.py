@@ -0,0 +1,245 @@
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from pymongo.errors import ServerSelectionTimeoutError
+from rest_framework.test import APITestCase
+
+from . import mongodb
+from .mirrors import MIRRORS
+from .mongo_sync import flush_batch, resync
+
+User = get_user_model()
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    """closed -> open after THRESHOLD failures -> half-open after the reset timeout -> closed or open again"""
+
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch.object(mongodb.time, 'monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = mongodb.CircuitBreaker(threshold=3, reset_timeout=30)
+
+    def fail(self, times=1):
+        for _ in range(times):
+            self.breaker.failure(ServerSelectionTimeoutError('no servers'))
+
+    def test_stays_closed_below_threshold(self):
+        self.fail(2)
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertTrue(self.breaker.allow())
+
+    def test_success_resets_failure_count(self):
+        self.fail(2)
+        self.breaker.success()
+        self.fail(2)
+        self.assertEqual(self.breaker.state, 'closed')
+
+    def test_opens_at_threshold(self):
+        self.fail(3)
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.last_error, 'no servers')
+
+    def test_half_open_lets_one_trial_through(self):
+        self.fail(3)
+        self.clock.now += 30
+        self.assertEqual(self.breaker.state, 'half-open')
+        self.assertTrue(self.breaker.allow())
+        # Further callers fail fast until the trial reports back
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.state, 'open')
+
+    def test_successful_trial_closes(self):
+        self.fail(3)
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow())
+        self.breaker.success()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertEqual(self.breaker.failures, 0)
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_trial_reopens(self):
+        self.fail(3)
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow())
+        self.fail()
+        self.assertEqual(self.breaker.state, 'open')
+        self.clock.now += 29
+        self.assertFalse(self.breaker.allow())
+
+    def test_mongo_call_records_outcome(self):
+        with mock.patch.object(mongodb, 'breaker', self.breaker):
+            for _ in range(3):
+                with self.assertRaises(mongodb.MongoUnavailable):
+                    with mongodb.mongo_call():
+                        raise ServerSelectionTimeoutError('no servers')
+            self.assertEqual(self.breaker.state, 'open')
+
+            # Open: the block is not run at all
+            body = mock.Mock()
+            with self.assertRaises(mongodb.MongoUnavailable):
+                with mongodb.mongo_call():
+                    body()
+            body.assert_not_called()
+
+            self.clock.now += 30
+            with mongodb.mongo_call():
+                body()
+            body.assert_called_once()
+            self.assertEqual(self.breaker.state, 'closed')
+
+
+class LazyClientTests(SimpleTestCase):
+    """The shared client is created on first use, against mongomock"""
+
+    def setUp(self):
+        for name, value in (
+            ('MONGODB_URI', 'mongomock://'),
+            ('_client', None),
+            ('breaker', mongodb.CircuitBreaker(threshold=2, reset_timeout=30)),
+        ):
+            patcher = mock.patch.object(mongodb, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_nothing_connects_until_first_use(self):
+        self.assertFalse(mongodb.health()['initialized'])
+
+    def test_client_is_created_once_and_shared(self):
+        with mock.patch.object(mongodb, '_create_client', wraps=mongodb._create_client) as create:
+            client = mongodb.get_client()
+            self.assertIs(mongodb.get_client(), client)
+        create.assert_called_once()
+        self.assertTrue(mongodb.health()['initialized'])
+
+    def test_database_round_trip(self):
+        self.assertTrue(mongodb.ping())
+        users = mongodb.get_users_collection()
+        users.insert_one({'email': 'student@example.com'})
+        self.assertEqual(mongodb.get_db().name, mongodb.MONGODB_DB_NAME)
+        self.assertEqual(users.count_documents({}), 1)
+
+    def test_module_attributes_resolve_lazily(self):
+        self.assertIs(mongodb.client, mongodb.get_client())
+        self.assertEqual(mongodb.db.name, mongodb.MONGODB_DB_NAME)
+
+    def test_failed_creation_trips_breaker(self):
+        error = mongodb.ConfigurationError('bad uri')
+        with mock.patch.object(mongodb, '_create_client', side_effect=error) as create, \
+                mock.patch('builtins.print'):
+            self.assertIsNone(mongodb.get_client())
+            self.assertIsNone(mongodb.get_client())
+            self.assertEqual(mongodb.breaker.state, 'open')
+            # Open: no further attempt to create a client
+            self.assertIsNone(mongodb.get_db())
+            self.assertIsNone(mongodb.get_users_collection())
+        self.assertEqual(create.call_count, 2)
+        self.assertFalse(mongodb.health()['initialized'])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'check_query_plans reads SQLite EXPLAIN QUERY PLAN output')
+class QueryPlanTests(TestCase):
+    """Every hot API query uses an index; a dropped or unusable index fails here"""
+
+    def test_hot_paths_use_indexes(self):
+        stdout, stderr = StringIO(), StringIO()
+        try:
+            call_command('check_query_plans', stdout=stdout, stderr=stderr)
+        except CommandError as e:
+            self.fail(f'{e}\n{stderr.getvalue()}')
+        self.assertIn('hot paths use indexes', stdout.getvalue())
+
+
+class ResyncTests(TestCase):
+    """A pruning resync removes documents of deleted rows and nothing else"""
+
+    def setUp(self):
+        for name, value in (
+            ('MONGODB_URI', 'mongomock://'),
+            ('_client', None),
+            ('breaker', mongodb.CircuitBreaker(threshold=2, reset_timeout=30)),
+        ):
+            patcher = mock.patch.object(mongodb, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.spec = MIRRORS['users']
+        self.users = mongodb.get_db()[self.spec.collection]
+        self.student = User.objects.create_user(email='student@example.com')
+
+    def ids(self):
+        return sorted(document['_id'] for document in self.users.find({}, {'_id': 1}))
+
+    def test_writes_every_row(self):
+        self.assertEqual(resync(self.spec), (1, 0))
+        self.assertEqual(self.users.find_one({'_id': str(self.student.pk)})['email'], 'student@example.com')
+
+    def test_prune_deletes_documents_of_deleted_rows(self):
+        self.users.insert_many([{'_id': '999999', 'email': 'gone@example.com'}, {'_id': 'not-a-pk'}])
+
+        self.assertEqual(resync(self.spec, prune=True), (1, 2))
+        self.assertEqual(self.ids(), [str(self.student.pk)])
+        self.assertIsNone(self.users.find_one({'_mirror_run': {'$exists': True}}))
+
+    def test_prune_keeps_rows_mirrored_by_the_outbox_during_the_run(self):
+        late = User.objects.create_user(email='late@example.com')
+        flush_batch()
+        scanned = User.objects.exclude(pk=late.pk).order_by('pk')
+
+        # The resync scan started before the outbox worker mirrored the new user
+        with mock.patch.object(type(self.spec), 'get_queryset', return_value=scanned):
+            self.assertEqual(resync(self.spec, chunk_size=1, prune=True), (1, 0))
+        self.assertEqual(self.ids(), sorted([str(self.student.pk), str(late.pk)]))
+
+
+class HealthEndpointTests(APITestCase):
+    """Probes get the readiness state; only admins see the snapshot behind it"""
+
+    def setUp(self):
+        self.snapshot = {
+            'sql': {'status': 'up', 'vendor': 'sqlite', 'latency_ms': 0.1, 'size_bytes': 4096},
+            'mongodb': {'status': 'down', 'database': 'campus', 'error': 'refused'},
+            'collected_at': 0, 'age_seconds': 1.0,
+        }
+        patcher = mock.patch('core.views.get_snapshot', side_effect=lambda: self.snapshot)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ready_only_reports_status(self):
+        response = self.client.get('/api/health/ready/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'degraded'})
+
+    def test_ready_fails_without_sql(self):
+        self.snapshot['sql'] = {'status': 'down', 'vendor': 'sqlite', 'error': 'disk I/O error'}
+        response = self.client.get('/api/health/ready/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'status': 'unavailable'})
+
+    def test_detail_requires_admin(self):
+        self.assertEqual(self.client.get('/api/health/').status_code, 401)
+        self.client.force_authenticate(User.objects.create_user(email='student@example.com'))
+        self.assertEqual(self.client.get('/api/health/').status_code, 403)
+
+    def test_detail_for_admin(self):
+        self.client.force_authenticate(User.objects.create_user(email='admin@example.com', role='admin'))
+        response = self.client.get('/api/health/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'degraded')
+        self.assertEqual(response.data['checks']['mongodb']['error'], 'refused')
@@ -1,8 +1,12 @@
 from django.urls import path
-from .views import index
+from .views import index, list_cache_stats, health_live, health_ready, health_detail
 
 app_name = 'core'
 
 urlpatterns = [
     path('', index, name='index'),
+    path('api/cache/stats/', list_cache_stats, name='cache-stats'),
+    path('api/health/live/', health_live, name='health-live'),
+    path('api/health/ready/', health_ready, name='health-ready'),
+    path('api/health/', health_detail, name='health-detail'),
 ]
@@ -1,6 +1,45 @@
 from django.shortcuts import render
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny
+from accounts.permissions import IsAdmin
+from .cache import cache_stats
+from .health import get_snapshot, readiness
 
 
 def index(request):
     """Render the main index page (replaces React SPA)."""
     return render(request, 'index.html')
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def list_cache_stats(request):
+    """Hit/miss counters of the list response cache (admin only)"""
+    return Response(cache_stats())
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def health_live(request):
+    """Liveness: the process answers requests; touches nothing else"""
+    return Response({'status': 'alive'})
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def health_ready(request):
+    """Readiness from the cached health snapshot (503 until the SQL database is reachable)"""
+    ready, state = readiness(get_snapshot())
+    return Response({'status': state}, status=200 if ready else 503)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def health_detail(request):
+    """Readiness with the snapshot behind it: latencies, sizes, collections, outbox lag (admin only)"""
+    snapshot = get_snapshot()
+    ready, state = readiness(snapshot)
+    return Response({'status': state, 'checks': snapshot}, status=200 if ready else 503)
@@ -7,6 +7,8 @@ class EventAdmin(admin.ModelAdmin):
     list_filter = ('category', 'status', 'start_date')
     search_fields = ('title', 'description', 'venue')
     date_hierarchy = 'start_date'
+    # Seat counter maintained by events.registration
+    readonly_fields = ('registered_count',)
 
 @admin.register(EventRegistration)
 class EventRegistrationAdmin(admin.ModelAdmin):
@@ -0,0 +1,104 @@
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.utils import timezone
+
+from events.models import Event, EventRegistration
+from events.registration import RegistrationError, register_user, unregister_user
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire concurrent registrations and cancellations at a throwaway event and '
+        'verify the capacity invariant. Creates and deletes its own users and event; '
+        'run it against a staging database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--capacity', type=int, default=50)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=32)
+        parser.add_argument('--cancel-ratio', type=float, default=0.2,
+                            help='Fraction of users that cancel after registering')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated event and users')
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        organizer = User.objects.create_user(email=f'loadtest-{tag}-organizer@example.invalid', role='faculty')
+        users = [
+            User(email=f'loadtest-{tag}-{i}@example.invalid', first_name='Load', last_name=str(i))
+            for i in range(options['users'])
+        ]
+        User.objects.bulk_create(users)
+        users = list(User.objects.filter(email__startswith=f'loadtest-{tag}-').exclude(pk=organizer.pk))
+        event = Event.objects.create(
+            title=f'Load test {tag}', description='Registration load test', category='other', venue='-',
+            start_date=timezone.now() + timedelta(days=1), end_date=timezone.now() + timedelta(days=1, hours=2),
+            max_participants=options['capacity'], organizer=organizer,
+        )
+
+        try:
+            started = time.monotonic()
+            self.run_concurrently(options['threads'], event, [
+                (register_user, user) for user in users
+            ])
+            elapsed = time.monotonic() - started
+            self.stdout.write(f"{len(users)} registrations in {elapsed:.2f}s")
+            self.check_invariant(event, options['capacity'])
+
+            cancelling = random.sample(users, int(len(users) * options['cancel_ratio']))
+            self.run_concurrently(options['threads'], event, [
+                (unregister_user, user) for user in cancelling
+            ])
+            self.stdout.write(f"{len(cancelling)} cancellations processed")
+            self.check_invariant(event, options['capacity'])
+        finally:
+            if not options['keep']:
+                event.delete()
+                User.objects.filter(email__startswith=f'loadtest-{tag}-').delete()
+
+        self.stdout.write(self.style.SUCCESS('Capacity invariant held'))
+
+    def run_concurrently(self, threads, event, calls):
+        def run(call):
+            func, user = call
+            try:
+                # SQLite rejects concurrent writers outright; retry like a client would
+                for attempt in range(50):
+                    try:
+                        return func(event, user)
+                    except OperationalError:
+                        time.sleep(0.01 * (attempt + 1))
+                raise CommandError(f'Gave up on {func.__name__} for {user.email}')
+            except RegistrationError:
+                return None
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(run, calls))
+
+    def check_invariant(self, event, capacity):
+        event.refresh_from_db()
+        registrations = EventRegistration.objects.filter(event=event)
+        registered = registrations.filter(status='registered').count()
+        waitlisted = registrations.filter(status='waitlisted').count()
+        self.stdout.write(
+            f"counter={event.registered_count} registered={registered} "
+            f"waitlisted={waitlisted} capacity={capacity}"
+        )
+
+        if registered > capacity:
+            raise CommandError(f'Event oversubscribed: {registered} > {capacity}')
+        if event.registered_count != registered:
+            raise CommandError(f'Seat counter drifted: {event.registered_count} != {registered}')
+        if waitlisted and registered < capacity:
+            raise CommandError('Free seats left while users are still waitlisted')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from events.registration import fill_from_waitlist, sync_registered_counts
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Recompute Event.registered_count from registrations and fill freed seats from waitlists'
+
+    def handle(self, *args, **options):
+        fixed = sync_registered_counts()
+        self.stdout.write(f"Corrected seat counters on {fixed} events")
+
+        promoted = 0
+        for event in Event.objects.filter(registrations__status='waitlisted').distinct():
+            promoted += len(fill_from_waitlist(event))
+        self.stdout.write(f"Promoted {promoted} waitlisted registrations")
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:32
+
+from django.db import migrations, models
+
+
+def backfill_registered_count(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    EventRegistration = apps.get_model('events', 'EventRegistration')
+    counts = EventRegistration.objects.filter(status='registered').values('event').annotate(
+        count=models.Count('pk')
+    )
+    for row in counts:
+        Event.objects.filter(pk=row['event']).update(registered_count=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='registered_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='eventregistration',
+            name='status',
+            field=models.CharField(choices=[('registered', 'Registered'), ('waitlisted', 'Waitlisted'), ('attended', 'Attended'), ('cancelled', 'Cancelled')], default='registered', max_length=20),
+        ),
+        migrations.RunPython(backfill_registered_count, migrations.RunPython.noop),
+    ]
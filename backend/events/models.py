@@ -4,6 +4,30 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 
 
+class EventQuerySet(models.QuerySet):
+    """QuerySet helpers for serializing events without per-row queries"""
+    
+    def with_registration_info(self, user=None):
+        """
+        Load the organizer and participant ids and annotate is_registered and
+        is_waitlisted (for the given user) so EventSerializer does not query
+        per event
+        """
+        registrations = EventRegistration.objects.filter(event=models.OuterRef('pk'))
+        
+        queryset = self.select_related('organizer').prefetch_related(
+            models.Prefetch('participants', queryset=User.objects.only('id'))
+        )
+        
+        if user is not None and user.is_authenticated:
+            mine = registrations.filter(user=user)
+            return queryset.annotate(
+                is_registered=models.Exists(mine.filter(status='registered')),
+                is_waitlisted=models.Exists(mine.filter(status='waitlisted')),
+            )
+        return queryset.annotate(is_registered=models.Value(False), is_waitlisted=models.Value(False))
+
+
 class Event(models.Model):
     """Model for campus events"""
     
@@ -33,6 +57,8 @@ class Event(models.Model):
     end_date = models.DateTimeField()
     image = models.ImageField(upload_to='events/', blank=True, null=True)
     max_participants = models.PositiveIntegerField(null=True, blank=True)
+    # Seats taken by 'registered' rows, maintained atomically by events.registration
+    registered_count = models.PositiveIntegerField(default=0)
     registration_deadline = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='upcoming')
     
@@ -44,12 +70,32 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = EventQuerySet.as_manager()
+    
     class Meta:
         db_table = 'events'
         ordering = ['start_date']
+        indexes = [
+            models.Index(fields=['start_date', 'id'], name='event_start_idx'),
+            models.Index(fields=['status', 'start_date', 'id'], name='event_status_start_idx'),
+            models.Index(fields=['category', 'status', 'start_date', 'id'], name='event_category_start_idx'),
+        ]
     
     def __str__(self):
         return self.title
+    
+    def save(self, *args, **kwargs):
+        # registered_count only changes through the conditional updates in
+        # events.registration; writing back the value loaded with this instance
+        # would undo seats claimed since then. Pass update_fields to set it.
+        full_update = not self._state.adding and not args and kwargs.get('update_fields') is None
+        if full_update and not kwargs.get('force_insert'):
+            skipped = {'registered_count', *self.get_deferred_fields()}
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped and field.name not in skipped
+            ]
+        super().save(*args, **kwargs)
 
 
 class EventRegistration(models.Model):
@@ -57,6 +103,7 @@ class EventRegistration(models.Model):
     
     STATUS_CHOICES = (
         ('registered', 'Registered'),
+        ('waitlisted', 'Waitlisted'),
         ('attended', 'Attended'),
         ('cancelled', 'Cancelled'),
     )
@@ -70,6 +117,11 @@ class EventRegistration(models.Model):
         db_table = 'event_registrations'
         unique_together = ('event', 'user')
         ordering = ['-registered_at']
+        indexes = [
+            # Seat counts and waitlist promotion (oldest waitlisted first)
+            models.Index(fields=['event', 'status', 'registered_at'], name='event_reg_status_idx'),
+            models.Index(fields=['user', 'status'], name='event_reg_user_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.event.title}"
@@ -0,0 +1,160 @@
+"""
+Capacity-safe event registration.
+
+Seats are claimed with a conditional UPDATE on Event.registered_count, so
+concurrent requests can never push an event past max_participants and no
+COUNT(*) over event_registrations is needed on the hot path. Registrations
+that do not get a seat are waitlisted and promoted in arrival order when a
+seat frees up.
+
+Status changes saved anywhere else (the admin, marking attendance) adjust the
+counter through the EventRegistration signals in events.signals; only
+queryset.update() and raw SQL bypass it, which sync_registration_counts repairs.
+"""
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from core.cache import invalidate
+from core.mongo_sync import enqueue as queue_mirror
+from notifications.groups import event_group
+from notifications.queue import enqueue_notification_to_user
+from notifications.utils import join_groups, leave_groups
+from .models import Event, EventRegistration
+
+
+class RegistrationError(Exception):
+    """Raised when a registration request cannot be applied"""
+
+
+def claim_seat(event_id):
+    """Atomically take a seat; returns False when the event is full"""
+    has_room = models.Q(max_participants__isnull=True) | models.Q(registered_count__lt=models.F('max_participants'))
+    claimed = Event.objects.filter(has_room, pk=event_id).update(
+        registered_count=models.F('registered_count') + 1
+    ) == 1
+    if claimed:
+        # update() skips post_save, so cached event lists and the Mongo mirror are refreshed here
+        invalidate('events')
+        queue_mirror('events', event_id)
+    return claimed
+
+
+def release_seat(event_id):
+    """Atomically give a seat back"""
+    Event.objects.filter(pk=event_id, registered_count__gt=0).update(
+        registered_count=models.F('registered_count') - 1
+    )
+    invalidate('events')
+    queue_mirror('events', event_id)
+
+
+def adjust_registered_count(event_id, delta):
+    """Apply a seat change made outside claim_seat/release_seat, e.g. an admin edit"""
+    Event.objects.filter(pk=event_id).update(
+        registered_count=Greatest(models.F('registered_count') + delta, 0)
+    )
+    invalidate('events')
+    queue_mirror('events', event_id)
+
+
+def register_user(event, user):
+    """
+    Register a user for an event
+    Returns the registration, whose status is 'registered' or 'waitlisted'
+    """
+    try:
+        with transaction.atomic():
+            registration = EventRegistration.objects.select_for_update().filter(event=event, user=user).first()
+            if registration and registration.status != 'cancelled':
+                raise RegistrationError('Already registered for this event')
+            
+            # Nobody may take a free seat ahead of people already waiting for one
+            waiting = EventRegistration.objects.filter(event=event, status='waitlisted').exists()
+            status = 'registered' if not waiting and claim_seat(event.pk) else 'waitlisted'
+            
+            if registration:
+                # Re-registering after cancelling joins the back of the queue
+                registration.status = status
+                registration.registered_at = timezone.now()
+            else:
+                registration = EventRegistration(event=event, user=user, status=status)
+            # The seat, if any, was claimed above; the save signals must not count it again
+            registration.seat_claimed = True
+            registration.save(update_fields=['status', 'registered_at'] if registration.pk else None)
+    except IntegrityError:
+        # A concurrent request for the same user won; its seat claim stands, ours rolled back
+        raise RegistrationError('Already registered for this event')
+    
+    # Registered and waitlisted users both get live updates about the event
+    join_groups(user.id, [event_group(event.pk)])
+    return registration
+
+
+def unregister_user(event, user):
+    """
+    Cancel a user's registration or waitlist entry
+    A freed seat goes straight to the head of the waitlist
+    """
+    with transaction.atomic():
+        registration = EventRegistration.objects.select_for_update().filter(
+            event=event, user=user, status__in=['registered', 'waitlisted']
+        ).first()
+        if registration is None:
+            raise RegistrationError('Not registered for this event')
+        
+        # Conditional update so two concurrent cancels release only one seat
+        cancelled = EventRegistration.objects.filter(
+            pk=registration.pk, status=registration.status
+        ).update(status='cancelled')
+        
+        if cancelled and registration.status == 'registered':
+            release_seat(event.pk)
+            fill_from_waitlist(event)
+    
+    leave_groups(user.id, [event_group(event.pk)])
+    return registration
+
+
+def fill_from_waitlist(event):
+    """Promote waitlisted registrations, oldest first, while seats are free"""
+    promoted = []
+    while True:
+        candidate = EventRegistration.objects.filter(
+            event=event, status='waitlisted'
+        ).select_related('user').order_by('registered_at', 'id').first()
+        if candidate is None or not claim_seat(event.pk):
+            break
+        
+        if EventRegistration.objects.filter(pk=candidate.pk, status='waitlisted').update(status='registered'):
+            candidate.status = 'registered'
+            promoted.append(candidate)
+            enqueue_notification_to_user(
+                candidate.user,
+                title=f"🎟️ You're in: {event.title}",
+                message=f"A seat opened up and your waitlisted registration for '{event.title}' is now confirmed.",
+                notification_type='event',
+                link=f'/events/{event.id}'
+            )
+        else:
+            # Someone else cancelled or promoted this entry first
+            release_seat(event.pk)
+    
+    return promoted
+
+
+def sync_registered_counts(events=None):
+    """Recompute registered_count from registration rows; returns the number of events fixed"""
+    events = Event.objects.all() if events is None else events
+    actual = EventRegistration.objects.filter(
+        event=models.OuterRef('pk'), status='registered'
+    ).order_by().values('event').annotate(count=models.Count('pk')).values('count')
+    
+    fixed = events.annotate(
+        actual_count=Coalesce(models.Subquery(actual, output_field=models.IntegerField()), 0)
+    ).exclude(registered_count=models.F('actual_count')).update(
+        registered_count=Coalesce(models.Subquery(actual, output_field=models.IntegerField()), 0)
+    )
+    if fixed:
+        invalidate('events')
+    return fixed
@@ -20,17 +20,29 @@ class EventSerializer(serializers.ModelSerializer):
     organizer_details = UserSerializer(source='organizer', read_only=True)
     participant_count = serializers.SerializerMethodField()
     is_registered = serializers.SerializerMethodField()
+    is_waitlisted = serializers.SerializerMethodField()
     
     class Meta:
         model = Event
         fields = '__all__'
-        read_only_fields = ('organizer', 'created_at', 'updated_at')
+        read_only_fields = ('organizer', 'registered_count', 'created_at', 'updated_at')
     
     def get_participant_count(self, obj):
-        return obj.registrations.filter(status='registered').count()
+        return obj.registered_count
     
     def get_is_registered(self, obj):
+        # Annotated by Event.objects.with_registration_info()
+        if hasattr(obj, 'is_registered'):
+            return obj.is_registered
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.registrations.filter(user=request.user, status='registered').exists()
         return False
+    
+    def get_is_waitlisted(self, obj):
+        if hasattr(obj, 'is_waitlisted'):
+            return obj.is_waitlisted
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            return obj.registrations.filter(user=request.user, status='waitlisted').exists()
+        return False
@@ -0,0 +1,44 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from core.cache import invalidate
+from .models import Event, EventRegistration
+from .registration import adjust_registered_count, fill_from_waitlist
+
+
+@receiver([post_save, post_delete], sender=Event)
+@receiver([post_save, post_delete], sender=EventRegistration)
+def invalidate_event_lists(sender, **kwargs):
+    """Cached event lists embed participants and seat counts"""
+    invalidate('events')
+
+
+def _status_saved(update_fields):
+    return update_fields is None or 'status' in update_fields
+
+
+@receiver(pre_save, sender=EventRegistration)
+def remember_registration_status(sender, instance, update_fields=None, **kwargs):
+    """Status stored before this save, for count_registration_seat"""
+    instance.previous_status = None
+    if instance.pk is not None and _status_saved(update_fields) and not getattr(instance, 'seat_claimed', False):
+        instance.previous_status = sender.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=EventRegistration)
+def count_registration_seat(sender, instance, update_fields=None, **kwargs):
+    """Keep Event.registered_count right when a status is changed outside events.registration"""
+    claimed = instance.__dict__.pop('seat_claimed', False)
+    if claimed or not _status_saved(update_fields):
+        return
+    delta = (instance.status == 'registered') - (instance.previous_status == 'registered')
+    if delta:
+        adjust_registered_count(instance.event_id, delta)
+    if delta < 0 and instance.status == 'cancelled':
+        # Same as unregistering: the freed seat goes to the waitlist
+        fill_from_waitlist(instance.event)
+
+
+@receiver(post_delete, sender=EventRegistration)
+def release_deleted_seat(sender, instance, **kwargs):
+    if instance.status == 'registered':
+        adjust_registered_count(instance.event_id, -1)
@@ -0,0 +1,329 @@
+import csv
+import io
+import json
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import Event, EventRegistration
+from .registration import RegistrationError, fill_from_waitlist, register_user, unregister_user
+from .serializers import EventSerializer
+
+User = get_user_model()
+
+
+def create_event(organizer, **fields):
+    start = timezone.now() + timedelta(days=1)
+    return Event.objects.create(
+        title='Hackathon', description='24 hours', category='technical', venue='Lab 1',
+        start_date=start, end_date=start + timedelta(days=1), organizer=organizer, **fields,
+    )
+
+
+class EventListQueryTests(APITestCase):
+    """The event list costs the same number of queries whatever the page size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(email='faculty@example.com', password='pass', role='faculty')
+        cls.students = [
+            User.objects.create_user(email=f'student{i}@example.com', password='pass') for i in range(3)
+        ]
+        start = timezone.now() + timedelta(days=1)
+        for i in range(30):
+            event = Event.objects.create(
+                title=f'Event {i}', description='Talk', category='academic', venue='Hall',
+                start_date=start + timedelta(hours=i), end_date=start + timedelta(hours=i + 1),
+                organizer=cls.organizer,
+            )
+            for student in cls.students[:i % 4]:
+                EventRegistration.objects.create(event=event, user=student)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.students[0])
+
+    def list_events(self, page_size):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/events/', {'page_size': page_size})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_small_page(self):
+        self.assertEqual(len(self.list_events(2)), 2)
+
+    def test_large_page(self):
+        events = self.list_events(30)
+        self.assertEqual(len(events), 30)
+        self.assertEqual(sum(event['is_registered'] for event in events), 22)
+
+
+class EventListCacheTests(APITestCase):
+    """Lists are only cached in a cache every process shares"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(email='faculty@example.com', password='pass', role='faculty')
+        cls.event = Event.objects.create(
+            title='Orientation', description='Welcome', category='academic', venue='Hall',
+            start_date=timezone.now() + timedelta(days=1), end_date=timezone.now() + timedelta(days=1, hours=2),
+            organizer=cls.organizer,
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.organizer)
+
+    def cache_header(self):
+        response = self.client.get('/api/events/')
+        self.assertEqual(response.status_code, 200)
+        return response['X-Cache']
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_process_local_cache_is_bypassed(self):
+        self.assertEqual(self.cache_header(), 'BYPASS')
+        self.assertEqual(self.cache_header(), 'BYPASS')
+
+    def test_shared_cache_is_used_and_invalidated(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}):
+            self.assertEqual(self.cache_header(), 'MISS')
+            self.assertEqual(self.cache_header(), 'HIT')
+            with self.captureOnCommitCallbacks(execute=True):
+                self.event.save()
+            self.assertEqual(self.cache_header(), 'MISS')
+
+
+class EventEditCapacityTests(APITestCase):
+    """Editing an event never writes back a stale seat count"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(email='faculty@example.com', password='pass', role='faculty')
+        self.students = [User.objects.create_user(email=f'student{i}@example.com', password='pass') for i in range(2)]
+        self.event = create_event(self.organizer, max_participants=1)
+
+    def registered_rows(self):
+        return EventRegistration.objects.filter(event=self.event, status='registered').count()
+
+    def test_edit_of_instance_loaded_before_a_registration(self):
+        stale = Event.objects.get(pk=self.event.pk)
+        self.assertEqual(register_user(self.event, self.students[0]).status, 'registered')
+
+        serializer = EventSerializer(stale, data={'title': 'Hackathon 2.0'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertEqual(register_user(self.event, self.students[1]).status, 'waitlisted')
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.title, 'Hackathon 2.0')
+        self.assertEqual(self.event.registered_count, 1)
+        self.assertEqual(self.registered_rows(), 1)
+
+    def test_api_edit_of_full_event(self):
+        register_user(self.event, self.students[0])
+        admin = User.objects.create_user(email='admin@example.com', password='pass', role='admin')
+        self.client.force_authenticate(admin)
+        response = self.client.patch(f'/api/events/{self.event.pk}/', {'venue': 'Lab 2'})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['registered_count'], 1)
+
+        self.assertEqual(register_user(self.event, self.students[1]).status, 'waitlisted')
+        self.assertEqual(self.registered_rows(), 1)
+
+
+class RegistrationTests(APITestCase):
+    """Seats, the waitlist and promotion in arrival order"""
+
+    def setUp(self):
+        organizer = User.objects.create_user(email='faculty@example.com', password='pass', role='faculty')
+        self.students = [User.objects.create_user(email=f'student{i}@example.com', password='pass') for i in range(4)]
+        self.event = create_event(organizer, max_participants=2)
+
+    def statuses(self):
+        return dict(EventRegistration.objects.filter(event=self.event).values_list('user__email', 'status'))
+
+    def assert_counter_matches(self):
+        self.event.refresh_from_db()
+        registered = EventRegistration.objects.filter(event=self.event, status='registered').count()
+        self.assertEqual(self.event.registered_count, registered)
+        if self.event.max_participants is not None:
+            self.assertLessEqual(registered, self.event.max_participants)
+
+    def register_all(self):
+        return [register_user(self.event, student).status for student in self.students]
+
+    def test_full_event_waitlists(self):
+        self.assertEqual(self.register_all(), ['registered', 'registered', 'waitlisted', 'waitlisted'])
+        self.assert_counter_matches()
+
+    def test_registering_twice_is_rejected(self):
+        register_user(self.event, self.students[0])
+        with self.assertRaisesMessage(RegistrationError, 'Already registered'):
+            register_user(self.event, self.students[0])
+
+    def test_unregister_promotes_oldest_waitlisted(self):
+        self.register_all()
+        unregister_user(self.event, self.students[0])
+        statuses = self.statuses()
+        self.assertEqual(statuses['student0@example.com'], 'cancelled')
+        self.assertEqual(statuses['student2@example.com'], 'registered')
+        self.assertEqual(statuses['student3@example.com'], 'waitlisted')
+        self.assert_counter_matches()
+
+    def test_leaving_the_waitlist_frees_no_seat(self):
+        self.register_all()
+        unregister_user(self.event, self.students[2])
+        self.assertEqual(self.statuses()['student3@example.com'], 'waitlisted')
+        self.assert_counter_matches()
+
+    def test_reregistering_joins_back_of_queue(self):
+        self.register_all()
+        unregister_user(self.event, self.students[0])
+        self.assertEqual(register_user(self.event, self.students[0]).status, 'waitlisted')
+
+        # The next free seat goes to student3, who was waiting before student0 came back
+        unregister_user(self.event, self.students[1])
+        statuses = self.statuses()
+        self.assertEqual(statuses['student3@example.com'], 'registered')
+        self.assertEqual(statuses['student0@example.com'], 'waitlisted')
+        self.assert_counter_matches()
+
+    def test_raised_capacity_promotes_from_waitlist(self):
+        self.register_all()
+        self.event.max_participants = 3
+        self.event.save()
+        promoted = fill_from_waitlist(self.event)
+
+        self.assertEqual([registration.user.email for registration in promoted], ['student2@example.com'])
+        self.assertEqual(self.statuses()['student3@example.com'], 'waitlisted')
+        self.assert_counter_matches()
+
+    def test_status_edits_outside_registration_adjust_counter(self):
+        self.register_all()
+        registration = EventRegistration.objects.get(event=self.event, user=self.students[0])
+        registration.status = 'attended'
+        registration.save()
+        self.assert_counter_matches()
+        self.assertEqual(self.event.registered_count, 1)
+
+        registration.status = 'registered'
+        registration.save()
+        self.assert_counter_matches()
+        self.assertEqual(self.event.registered_count, 2)
+
+    def test_cancelling_in_admin_promotes_waitlisted(self):
+        self.register_all()
+        registration = EventRegistration.objects.get(event=self.event, user=self.students[1])
+        registration.status = 'cancelled'
+        registration.save()
+        self.assertEqual(self.statuses()['student2@example.com'], 'registered')
+        self.assert_counter_matches()
+
+    def test_deleting_a_registration_frees_its_seat(self):
+        self.register_all()
+        EventRegistration.objects.get(event=self.event, user=self.students[0]).delete()
+        self.assert_counter_matches()
+        self.assertEqual(self.event.registered_count, 1)
+
+    def test_unlimited_event_never_waitlists(self):
+        self.event.max_participants = None
+        self.event.save()
+        self.assertEqual(self.register_all(), ['registered'] * 4)
+        self.assert_counter_matches()
+
+
+class ConcurrentRegistrationTests(TransactionTestCase):
+    """Parallel registrations and cancellations never oversell an event"""
+
+    capacity = 5
+
+    def setUp(self):
+        organizer = User.objects.create_user(email='faculty@example.com', password='pass', role='faculty')
+        self.students = [User.objects.create_user(email=f'student{i}@example.com') for i in range(20)]
+        self.event = create_event(organizer, max_participants=self.capacity)
+
+    def run_concurrently(self, func, users):
+        def run(user):
+            try:
+                # SQLite rejects concurrent writers outright; retry like a client would
+                for attempt in range(100):
+                    try:
+                        return func(self.event, user)
+                    except OperationalError:
+                        time.sleep(0.01 * (attempt + 1))
+                raise AssertionError(f'Gave up on {func.__name__} for {user.email}')
+            except RegistrationError:
+                return None
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            return list(pool.map(run, users))
+
+    def assert_capacity_holds(self):
+        self.event.refresh_from_db()
+        registered = EventRegistration.objects.filter(event=self.event, status='registered').count()
+        self.assertEqual(self.event.registered_count, registered)
+        self.assertLessEqual(registered, self.capacity)
+        return registered
+
+    def test_capacity_invariant(self):
+        results = self.run_concurrently(register_user, self.students)
+        self.assertEqual(sum(result.status == 'registered' for result in results), self.capacity)
+        self.assertEqual(self.assert_capacity_holds(), self.capacity)
+
+        self.run_concurrently(unregister_user, self.students[::3])
+        # Every freed seat went to the waitlist, which still has people in it
+        self.assertEqual(self.assert_capacity_holds(), self.capacity)
+
+
+class EventExportTests(APITestCase):
+    """Registration exports are for staff, filterable by status and safe to open in a spreadsheet"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(email='faculty@example.com', role='faculty')
+        cls.event = create_event(cls.organizer, max_participants=1)
+        cls.registered = User.objects.create_user(email='first@example.com', first_name='=1+1', department='CSE')
+        cls.waitlisted = User.objects.create_user(email='second@example.com', first_name='Riya', department='ECE')
+        register_user(cls.event, cls.registered)
+        register_user(cls.event, cls.waitlisted)
+
+    def setUp(self):
+        self.client.force_authenticate(self.organizer)
+
+    def export(self, **params):
+        response = self.client.get(f'/api/events/{self.event.pk}/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_lists_registrations_in_order(self):
+        rows = list(csv.DictReader(io.StringIO(self.export())))
+        self.assertEqual([row['email'] for row in rows], ['first@example.com', 'second@example.com'])
+        self.assertEqual([row['status'] for row in rows], ['registered', 'waitlisted'])
+        self.assertEqual(rows[0]['first_name'], "'=1+1")
+
+    def test_ndjson_filtered_by_registration_status(self):
+        rows = [json.loads(line) for line in self.export(output='ndjson', registration_status='waitlisted').splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['email'], 'second@example.com')
+        self.assertEqual(rows[0]['department'], 'ECE')
+
+    def test_students_are_forbidden(self):
+        self.client.force_authenticate(self.registered)
+        self.assertEqual(self.client.get(f'/api/events/{self.event.pk}/export/').status_code, 403)
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get(f'/api/events/{self.event.pk}/export/', {'output': 'json'})
+        self.assertEqual(response.status_code, 400)
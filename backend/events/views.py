@@ -2,25 +2,28 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db import models
+from django.db.models import F
 from django.utils import timezone
 from .models import Event, EventRegistration
 from .serializers import EventSerializer, EventRegistrationSerializer
-from asgiref.sync import async_to_sync
+from .registration import RegistrationError, register_user, unregister_user, fill_from_waitlist
+from search.backends import search_queryset
+from core.cache import CachedListMixin
+from core.exports import export_format, stream_export
+from core.pagination import StartDateKeysetPagination
 from accounts.permissions import IsFacultyOrAdmin, IsOwnerOrFacultyOrAdmin
-from notifications.utils import send_notification_to_all_users, send_notification_to_user
+from notifications.groups import event_group
+from notifications.utils import push_to_group
+from notifications.queue import enqueue_notification_to_all_users
 
-# Channels temporarily disabled - function stub
-def get_channel_layer():
-    return None
-
-
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(CachedListMixin, viewsets.ModelViewSet):
     """ViewSet for events - Admins can create, edit, and delete all events"""
     
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StartDateKeysetPagination
+    cache_namespace = 'events'
     
     def get_permissions(self):
         """
@@ -34,10 +37,13 @@ class EventViewSet(viewsets.ModelViewSet):
         elif self.action in ['update', 'partial_update', 'destroy']:
             # Admin can edit/delete all, faculty can edit their own
             return [IsOwnerOrFacultyOrAdmin()]
+        elif self.action == 'export':
+            # Registrations carry students' contact details
+            return [IsFacultyOrAdmin()]
         return [IsAuthenticated()]
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = Event.objects.with_registration_info(self.request.user)
         
         # Filter by category
         category = self.request.query_params.get('category', None)
@@ -49,26 +55,34 @@ class EventViewSet(viewsets.ModelViewSet):
         if status_filter:
             queryset = queryset.filter(status=status_filter)
         
-        # Search
+        # Full-text search, best matches first
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                models.Q(title__icontains=search) |
-                models.Q(description__icontains=search) |
-                models.Q(venue__icontains=search)
-            )
+            queryset = search_queryset('events', queryset, search)
         
         return queryset
     
+    def get_user_fields(self, ids):
+        """Registration flags of the requesting user for cached event lists"""
+        statuses = dict(
+            EventRegistration.objects.filter(
+                user=self.request.user, event_id__in=ids, status__in=['registered', 'waitlisted']
+            ).values_list('event_id', 'status')
+        )
+        return {
+            pk: {'is_registered': statuses.get(pk) == 'registered', 'is_waitlisted': statuses.get(pk) == 'waitlisted'}
+            for pk in ids
+        }
+    
     def perform_create(self, serializer):
-        """Create event - Faculty and Admin only, sends notification to all users"""
+        """Create event - Faculty and Admin only, queues a notification to all users"""
         event = serializer.save(organizer=self.request.user)
         
         # Send notification to all users about new event
         created_by = f"{self.request.user.first_name} {self.request.user.last_name}" if self.request.user.first_name else self.request.user.email
         role_badge = "🛡️ Admin" if self.request.user.role == 'admin' else "👨‍🏫 Faculty"
         
-        send_notification_to_all_users(
+        enqueue_notification_to_all_users(
             title=f"🎉 New Event: {event.title}",
             message=f"{role_badge} {created_by} created a new event '{event.title}' on {event.start_date.strftime('%B %d, %Y')}",
             notification_type='event',
@@ -77,14 +91,27 @@ class EventViewSet(viewsets.ModelViewSet):
         )
     
     def perform_update(self, serializer):
-        """Update event - sends notification to all users"""
+        """Update event - queues a notification to all users"""
         event = serializer.save()
         
+        # A raised capacity frees seats for the waitlist
+        fill_from_waitlist(event)
+        event.refresh_from_db(fields=['registered_count'])
+        
+        # Registered and waitlisted users' open pages update in place; the
+        # per-user flags are left out since every recipient already has their own
+        data = EventSerializer(event).data
+        push_to_group(event_group(event.id), {
+            'type': 'event',
+            'action': 'updated',
+            'data': {key: value for key, value in data.items() if key not in ('is_registered', 'is_waitlisted')}
+        })
+        
         # Send notification to all users about event update
         updated_by = f"{self.request.user.first_name} {self.request.user.last_name}" if self.request.user.first_name else self.request.user.email
         role_badge = "🛡️ Admin" if self.request.user.role == 'admin' else "👨‍🏫 Faculty"
         
-        send_notification_to_all_users(
+        enqueue_notification_to_all_users(
             title=f"📢 Event Updated: {event.title}",
             message=f"{role_badge} {updated_by} updated the event '{event.title}'. Check out the latest details!",
             notification_type='event',
@@ -92,20 +119,39 @@ class EventViewSet(viewsets.ModelViewSet):
             exclude_user=self.request.user
         )
     
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """Stream the event's registrations as CSV or NDJSON (?output=ndjson, ?registration_status=; faculty/admin)"""
+        fmt = export_format(request)
+        if fmt is None:
+            return Response(
+                {'error': 'output must be csv or ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        event = self.get_object()
+        registrations = EventRegistration.objects.filter(event=event).order_by('registered_at', 'id')
+        # ?status= already filters events in get_queryset
+        registration_status = request.query_params.get('registration_status', None)
+        if registration_status:
+            registrations = registrations.filter(status=registration_status)
+        
+        columns = [
+            'id', 'status', 'registered_at', 'user_id',
+            ('email', F('user__email')),
+            ('first_name', F('user__first_name')),
+            ('last_name', F('user__last_name')),
+            ('roll_number', F('user__roll_number')),
+            ('department', F('user__department')),
+            ('phone', F('user__phone')),
+        ]
+        return stream_export(registrations, columns, fmt, f'event-{event.id}-registrations')
+    
     @action(detail=True, methods=['post'])
     def register(self, request, pk=None):
-        """Register for an event"""
+        """Register for an event, or join its waitlist when it is full"""
         event = self.get_object()
         
-        # Check if event is full
-        if event.max_participants:
-            current_count = event.registrations.filter(status='registered').count()
-            if current_count >= event.max_participants:
-                return Response(
-                    {'error': 'Event is full'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
         # Check registration deadline
         if event.registration_deadline and timezone.now() > event.registration_deadline:
             return Response(
@@ -113,31 +159,21 @@ class EventViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if already registered
-        if event.registrations.filter(user=request.user, status='registered').exists():
+        # Seats are claimed atomically; a full event puts the user on the waitlist
+        try:
+            registration = register_user(event, request.user)
+        except RegistrationError as e:
             return Response(
-                {'error': 'Already registered for this event'},
+                {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        registration = EventRegistration.objects.create(
-            event=event,
-            user=request.user
-        )
-        
         # Notify organizer
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f'user_{event.organizer.id}',
-            {
-                'type': 'send_notification',
-                'message': {
-                    'type': 'event_registration',
-                    'action': 'created',
-                    'data': EventRegistrationSerializer(registration).data
-                }
-            }
-        )
+        push_to_group(f'user_{event.organizer.id}', {
+            'type': 'event_registration',
+            'action': 'created',
+            'data': EventRegistrationSerializer(registration).data
+        })
         
         return Response(
             EventRegistrationSerializer(registration).data,
@@ -146,25 +182,23 @@ class EventViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def unregister(self, request, pk=None):
-        """Unregister from an event"""
+        """Unregister from an event, promoting the next waitlisted user"""
         event = self.get_object()
         
         try:
-            registration = event.registrations.get(user=request.user, status='registered')
-            registration.status = 'cancelled'
-            registration.save()
-            
-            return Response({'message': 'Successfully unregistered'})
-        except EventRegistration.DoesNotExist:
+            unregister_user(event, request.user)
+        except RegistrationError as e:
             return Response(
-                {'error': 'Not registered for this event'},
+                {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        return Response({'message': 'Successfully unregistered'})
     
     @action(detail=False, methods=['get'])
     def my_events(self, request):
         """Get events organized by current user"""
-        events = self.queryset.filter(organizer=request.user)
+        events = Event.objects.with_registration_info(request.user).filter(organizer=request.user)
         serializer = self.get_serializer(events, many=True)
         return Response(serializer.data)
     
@@ -174,7 +208,7 @@ class EventViewSet(viewsets.ModelViewSet):
         registrations = EventRegistration.objects.filter(
             user=request.user,
             status='registered'
-        ).select_related('event')
-        events = [reg.event for reg in registrations]
+        ).values('event')
+        events = Event.objects.with_registration_info(request.user).filter(pk__in=registrations)
         serializer = self.get_serializer(events, many=True)
         return Response(serializer.data)
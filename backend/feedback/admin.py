@@ -1,9 +1,9 @@
 from django.contrib import admin
-from .models import Feedback, FeedbackResponse
+from .models import Feedback, FeedbackResponse, FeedbackCluster
 
 @admin.register(Feedback)
 class FeedbackAdmin(admin.ModelAdmin):
-    list_display = ('title', 'category', 'priority', 'status', 'is_anonymous', 'submitted_by', 'created_at')
+    list_display = ('title', 'category', 'priority', 'status', 'is_anonymous', 'submitted_by', 'cluster', 'created_at')
     list_filter = ('category', 'priority', 'status', 'is_anonymous', 'created_at')
     search_fields = ('title', 'description')
     date_hierarchy = 'created_at'
@@ -13,3 +13,8 @@ class FeedbackResponseAdmin(admin.ModelAdmin):
     list_display = ('feedback', 'responder', 'created_at')
     list_filter = ('created_at',)
     search_fields = ('feedback__title', 'message')
+
+@admin.register(FeedbackCluster)
+class FeedbackClusterAdmin(admin.ModelAdmin):
+    list_display = ('id', 'representative', 'created_at', 'updated_at')
+    date_hierarchy = 'created_at'
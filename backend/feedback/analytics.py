@@ -0,0 +1,265 @@
+"""
+Pre-aggregated feedback analytics.
+
+Dashboards read three small tables instead of scanning feedback:
+
+- FeedbackDailyStat: feedback created and resolved per day, category and
+  priority, plus the summed resolution time
+- FeedbackResolutionBucket: a histogram of resolution times per day,
+  category and priority (buckets in BUCKET_HOURS), so percentiles and SLA
+  compliance over any date range come from summed bucket counts
+- FeedbackBacklog: open feedback per category, priority and assignee
+
+Each feedback row contributes to a few cells of these tables depending on its
+state. The views snapshot a row before changing it and apply the difference
+of the before/after contributions in the same transaction (``track`` and
+``record_changes``), so a status change, reassignment or deletion costs a
+handful of single-row updates. Deleting a user moves their backlog rows to
+the unassigned ones, as their feedback's assigned_to is set to NULL.
+``python manage.py rebuild_feedback_stats`` recomputes everything from the
+feedback table after changes that bypass the views (admin edits, raw SQL).
+"""
+import bisect
+from collections import Counter, defaultdict, namedtuple
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Feedback, FeedbackBacklog, FeedbackDailyStat, FeedbackResolutionBucket
+
+User = get_user_model()
+
+# Upper bounds of the resolution time buckets; the last bucket is open ended
+BUCKET_HOURS = (1, 2, 4, 8, 12, 24, 48, 72, 120, 168, 336, 720)
+
+# Resolution targets per priority; each is one of BUCKET_HOURS
+SLA_HOURS = {
+    'urgent': 24,
+    'high': 72,
+    'medium': 168,
+    'low': 336,
+}
+
+STATE_FIELDS = ('status', 'category', 'priority', 'assigned_to_id', 'created_at', 'resolved_at')
+
+FeedbackState = namedtuple('FeedbackState', STATE_FIELDS)
+
+TABLES = {
+    'daily': (FeedbackDailyStat, ('date', 'category', 'priority')),
+    'bucket': (FeedbackResolutionBucket, ('date', 'category', 'priority', 'bucket')),
+    'backlog': (FeedbackBacklog, ('category', 'priority', 'assigned_to_id')),
+}
+
+
+def bucket_for(seconds):
+    return bisect.bisect_left(BUCKET_HOURS, seconds / 3600)
+
+
+def snapshot(feedback):
+    """The fields of a feedback row that analytics depend on (None for no row)"""
+    if feedback is None or feedback.pk is None:
+        return None
+    return FeedbackState(*(getattr(feedback, field) for field in STATE_FIELDS))
+
+
+def contributions(state):
+    """Counter of {(table, key, field): amount} a feedback row in this state adds"""
+    counts = Counter()
+    if state is None:
+        return counts
+
+    counts['daily', (timezone.localdate(state.created_at), state.category, state.priority), 'created'] += 1
+    if state.status in Feedback.OPEN_STATUSES:
+        counts['backlog', (state.category, state.priority, state.assigned_to_id), 'open_count'] += 1
+    elif state.resolved_at is not None:
+        seconds = max(0, int((state.resolved_at - state.created_at).total_seconds()))
+        day = timezone.localdate(state.resolved_at)
+        counts['daily', (day, state.category, state.priority), 'resolved'] += 1
+        counts['daily', (day, state.category, state.priority), 'resolution_seconds'] += seconds
+        counts['bucket', (day, state.category, state.priority, bucket_for(seconds)), 'count'] += 1
+    return counts
+
+
+def _increment(table, key, deltas):
+    model, key_fields = TABLES[table]
+    lookup = dict(zip(key_fields, key))
+    changes = {field: Greatest(models.F(field) + delta, 0) for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **{field: max(delta, 0) for field, delta in deltas.items()})
+    except IntegrityError:
+        # Created concurrently
+        model.objects.filter(**lookup).update(**changes)
+
+
+def record_changes(changes):
+    """Apply [(before, after)] state pairs to the aggregate tables; call inside the transaction that changed the rows"""
+    total = Counter()
+    for before, after in changes:
+        total.update(contributions(after))
+        total.subtract(contributions(before))
+
+    cells = defaultdict(dict)
+    for (table, key, field), delta in total.items():
+        if delta:
+            cells[table, key][field] = delta
+    for (table, key), deltas in cells.items():
+        _increment(table, key, deltas)
+
+
+def release_assignee(user_id):
+    """Move a user's backlog to the unassigned rows; called before the user is deleted and their feedback unassigned"""
+    rows = FeedbackBacklog.objects.filter(assigned_to_id=user_id)
+    for category, priority, open_count in rows.values_list('category', 'priority', 'open_count'):
+        if open_count:
+            _increment('backlog', (category, priority, None), {'open_count': open_count})
+    rows.delete()
+
+
+@contextmanager
+def track(feedback):
+    """Record the analytics effect of the changes made to feedback inside the block"""
+    before = snapshot(feedback)
+    yield
+    record_changes([(before, snapshot(feedback))])
+
+
+def rebuild():
+    """Recompute every aggregate row from the feedback table; returns the number of feedback rows read"""
+    total = Counter()
+    read = 0
+    for values in Feedback.objects.values_list(*STATE_FIELDS).iterator(chunk_size=2000):
+        total.update(contributions(FeedbackState(*values)))
+        read += 1
+
+    rows = defaultdict(lambda: defaultdict(dict))
+    for (table, key, field), amount in total.items():
+        rows[table][key][field] = amount
+
+    with transaction.atomic():
+        for table, (model, key_fields) in TABLES.items():
+            model.objects.all().delete()
+            model.objects.bulk_create(
+                [model(**dict(zip(key_fields, key)), **fields) for key, fields in rows[table].items()],
+                batch_size=500,
+            )
+    return read
+
+
+def _percentile(histogram, fraction):
+    """Upper bound in hours of the bucket holding the given fraction (None: over the last bound)"""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= fraction * total:
+            return BUCKET_HOURS[bucket] if bucket < len(BUCKET_HOURS) else None
+    return None
+
+
+def summary(days=30, category=None, priority=None):
+    """Dashboard figures for the last `days` days, read from the aggregate tables only"""
+    until = timezone.localdate()
+    since = until - timedelta(days=days - 1)
+    filters = {}
+    if category:
+        filters['category'] = category
+    if priority:
+        filters['priority'] = priority
+
+    daily_rows = FeedbackDailyStat.objects.filter(date__gte=since, date__lte=until, **filters)
+    daily = list(
+        daily_rows.values('date').annotate(
+            created_count=models.Sum('created'), resolved_count=models.Sum('resolved'),
+        ).order_by('date')
+    )
+    totals = daily_rows.aggregate(
+        created_count=models.Sum('created'),
+        resolved_count=models.Sum('resolved'),
+        seconds=models.Sum('resolution_seconds'),
+    )
+    created, resolved = totals['created_count'] or 0, totals['resolved_count'] or 0
+
+    # Histogram over the whole range, and per priority for SLA compliance
+    histogram = Counter()
+    per_priority = defaultdict(Counter)
+    buckets = FeedbackResolutionBucket.objects.filter(date__gte=since, date__lte=until, **filters)
+    for row in buckets.values('priority', 'bucket').annotate(total=models.Sum('count')).order_by():
+        histogram[row['bucket']] += row['total']
+        per_priority[row['priority']][row['bucket']] += row['total']
+
+    sla = {}
+    for level, hours in SLA_HOURS.items():
+        counts = per_priority.get(level)
+        if not counts:
+            continue
+        within = sum(count for bucket, count in counts.items() if bucket < len(BUCKET_HOURS) and BUCKET_HOURS[bucket] <= hours)
+        sla[level] = {
+            'target_hours': hours,
+            'resolved': sum(counts.values()),
+            'within_target': round(within / sum(counts.values()), 3),
+        }
+
+    by_category = [
+        {
+            'category': row['category'],
+            'created': row['created_count'],
+            'resolved': row['resolved_count'],
+            'mean_resolution_hours': round(row['seconds'] / row['resolved_count'] / 3600, 1) if row['resolved_count'] else None,
+        }
+        for row in daily_rows.values('category').annotate(
+            created_count=models.Sum('created'),
+            resolved_count=models.Sum('resolved'),
+            seconds=models.Sum('resolution_seconds'),
+        ).order_by('category')
+    ]
+
+    # The backlog is current state, not limited to the date range
+    open_by_category, open_by_priority, open_by_assignee = Counter(), Counter(), Counter()
+    for row in FeedbackBacklog.objects.filter(open_count__gt=0, **filters).values(
+            'category', 'priority', 'assigned_to_id', 'open_count'):
+        open_by_category[row['category']] += row['open_count']
+        open_by_priority[row['priority']] += row['open_count']
+        open_by_assignee[row['assigned_to_id']] += row['open_count']
+    assignees = User.objects.in_bulk([user_id for user_id in open_by_assignee if user_id is not None])
+    backlog = [
+        {
+            'user_id': user_id,
+            'name': assignees[user_id].get_full_name() or assignees[user_id].email if user_id in assignees else None,
+            'open': count,
+        }
+        for user_id, count in open_by_assignee.most_common()
+    ]
+
+    return {
+        'from': since,
+        'to': until,
+        'created': created,
+        'resolved': resolved,
+        'resolution_hours': {
+            'mean': round(totals['seconds'] / resolved / 3600, 1) if resolved else None,
+            'p50': _percentile(histogram, 0.5),
+            'p90': _percentile(histogram, 0.9),
+            'p95': _percentile(histogram, 0.95),
+        },
+        'sla': sla,
+        'daily': [
+            {'date': row['date'], 'created': row['created_count'], 'resolved': row['resolved_count']}
+            for row in daily
+        ],
+        'by_category': by_category,
+        'open': {
+            'total': sum(open_by_category.values()),
+            'by_category': dict(open_by_category),
+            'by_priority': dict(open_by_priority),
+        },
+        'backlog': backlog,
+    }
@@ -0,0 +1,139 @@
+"""
+Near-duplicate feedback clustering.
+
+Every open feedback row gets a MinHash signature of the set of words in its
+title + description, cut into BANDS bands of ROWS values. Each
+band is hashed into a FeedbackBand bucket, so rows that agree on all values of
+any band (locality sensitive hashing) are found with an indexed lookup
+instead of comparing against every open row. Candidates are then confirmed
+on the exact Jaccard similarity of their word sets. Word pairs are left out
+on purpose: grievances are short and the same complaint is worded in any order.
+
+New feedback joins the cluster of its most similar open candidate of the same
+category, or starts one with it. Closed and resolved rows leave the index, so
+a fresh complaint about an old, fixed problem starts a new cluster.
+"""
+import hashlib
+import random
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Feedback, FeedbackBand, FeedbackCluster
+from .routing import OPEN_STATUSES, tokenize
+
+NUM_PERM = 60
+BANDS = 20
+ROWS = NUM_PERM // BANDS
+# Word sets at least this similar are near-duplicates; with 20 bands of 3 rows
+# a pair at 0.5 shares a bucket with probability 0.93 (0.99 at 0.6)
+THRESHOLD = 0.5
+CANDIDATE_POOL = 50
+
+STOPWORDS = {
+    'the', 'and', 'for', 'not', 'are', 'was', 'our', 'has', 'have', 'this', 'that', 'with',
+    'from', 'been', 'very', 'there', 'please', 'since', 'any', 'all', 'its', 'but',
+}
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240917)
+# (a, b) of the universal hash functions; fixed so signatures are stable across processes
+PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+
+def shingles(feedback):
+    return {word for word in tokenize(f'{feedback.title} {feedback.description}') if word not in STOPWORDS}
+
+
+def signature(shingle_set):
+    hashes = [_hash(shingle) for shingle in shingle_set]
+    return [min((a * value + b) % _PRIME for value in hashes) for a, b in PERMUTATIONS]
+
+
+def band_buckets(values):
+    """One bucket key per band of a signature"""
+    return [
+        hashlib.blake2b(repr(values[band * ROWS:(band + 1) * ROWS]).encode(), digest_size=8).hexdigest()
+        for band in range(BANDS)
+    ]
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def index_feedback(feedback):
+    """(Re)build the LSH buckets of a feedback row; closed rows leave the index"""
+    FeedbackBand.objects.filter(feedback=feedback).delete()
+    shingle_set = shingles(feedback)
+    if feedback.status not in OPEN_STATUSES or not shingle_set:
+        return
+
+    FeedbackBand.objects.bulk_create([
+        FeedbackBand(feedback=feedback, band=band, bucket=bucket, category=feedback.category)
+        for band, bucket in enumerate(band_buckets(signature(shingle_set)))
+    ])
+
+
+def find_duplicates(feedback):
+    """Return [(candidate, similarity)] for open near-duplicates, most similar first"""
+    buckets = FeedbackBand.objects.filter(feedback=feedback).values_list('band', 'bucket')
+    condition = Q()
+    for band, bucket in buckets:
+        condition |= Q(band=band, bucket=bucket)
+    if not condition:
+        return []
+
+    # Rows sharing more buckets are likelier to be similar, so they are checked first
+    candidate_ids = list(
+        FeedbackBand.objects.filter(condition, category=feedback.category)
+        .exclude(feedback=feedback)
+        .values_list('feedback_id').annotate(shared=Count('id'))
+        .order_by('-shared').values_list('feedback_id', flat=True)[:CANDIDATE_POOL]
+    )
+    ours = shingles(feedback)
+    results = []
+    for candidate in Feedback.objects.filter(pk__in=candidate_ids, status__in=OPEN_STATUSES).only(
+            'id', 'title', 'description', 'cluster_id'):
+        similarity = jaccard(ours, shingles(candidate))
+        if similarity >= THRESHOLD:
+            results.append((candidate, similarity))
+    results.sort(key=lambda result: (-result[1], result[0].pk))
+    return results
+
+
+def cluster_feedback(feedback):
+    """Put an unclustered open feedback row into its near-duplicates' cluster; returns the cluster or None"""
+    if feedback.cluster_id is not None or feedback.status not in OPEN_STATUSES:
+        return None
+    duplicates = find_duplicates(feedback)
+    if not duplicates:
+        return None
+
+    best = duplicates[0][0]
+    # Plain updates: clustering must not re-run the save signals it is called from
+    with transaction.atomic():
+        if best.cluster_id is not None:
+            cluster = FeedbackCluster.objects.get(pk=best.cluster_id)
+            cluster.save(update_fields=['updated_at'])
+        else:
+            cluster = FeedbackCluster.objects.create(representative=best)
+            Feedback.objects.filter(pk=best.pk).update(cluster=cluster)
+        Feedback.objects.filter(pk=feedback.pk).update(cluster=cluster)
+    feedback.cluster = cluster
+    return cluster
+
+
+def replace_representative(cluster_id):
+    """Promote the oldest remaining member after the representative was deleted"""
+    member = Feedback.objects.filter(cluster_id=cluster_id).order_by('created_at', 'id').first()
+    if member is None:
+        FeedbackCluster.objects.filter(pk=cluster_id).delete()
+    else:
+        FeedbackCluster.objects.filter(pk=cluster_id).update(representative=member)
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from feedback.clustering import cluster_feedback, index_feedback
+from feedback.models import Feedback, FeedbackBand
+from feedback.routing import OPEN_STATUSES
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the near-duplicate index of open feedback and cluster rows that are not clustered yet'
+
+    def handle(self, *args, **options):
+        FeedbackBand.objects.all().delete()
+        open_feedback = Feedback.objects.filter(status__in=OPEN_STATUSES).order_by('created_at', 'id')
+
+        indexed = clustered = 0
+        # Oldest first, so each row is compared with everything submitted before it
+        for feedback in open_feedback.iterator(chunk_size=500):
+            index_feedback(feedback)
+            indexed += 1
+            if cluster_feedback(feedback) is not None:
+                clustered += 1
+        self.stdout.write(f"Indexed {indexed} open feedback rows, {clustered} joined a cluster")
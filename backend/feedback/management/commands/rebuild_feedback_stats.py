@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from feedback.analytics import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the feedback analytics aggregates (daily stats, resolution histogram, backlog) from the feedback rows'
+
+    def handle(self, *args, **options):
+        read = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt feedback analytics from {read} feedback rows"))
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('representative', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='feedback.feedback')),
+            ],
+            options={
+                'db_table': 'feedback_clusters',
+                'ordering': ['-updated_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='cluster',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='members', to='feedback.feedbackcluster'),
+        ),
+        migrations.CreateModel(
+            name='FeedbackBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.CharField(max_length=16)),
+                ('category', models.CharField(choices=[('academic', 'Academic'), ('infrastructure', 'Infrastructure'), ('faculty', 'Faculty'), ('administration', 'Administration'), ('hostel', 'Hostel'), ('library', 'Library'), ('cafeteria', 'Cafeteria'), ('transport', 'Transport'), ('other', 'Other')], max_length=20)),
+                ('feedback', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='feedback.feedback')),
+            ],
+            options={
+                'db_table': 'feedback_bands',
+                'indexes': [models.Index(fields=['band', 'bucket', 'category'], name='feedback_band_bucket_idx')],
+                'unique_together': {('feedback', 'band')},
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_resolved_at(apps, schema_editor):
+    # Best guess for feedback done before resolved_at existed: its last change
+    Feedback = apps.get_model('feedback', 'Feedback')
+    Feedback.objects.filter(status__in=('resolved', 'closed')).update(resolved_at=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('feedback', '0003_near_duplicate_clusters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_resolved_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='FeedbackResolutionBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('category', models.CharField(choices=[('academic', 'Academic'), ('infrastructure', 'Infrastructure'), ('faculty', 'Faculty'), ('administration', 'Administration'), ('hostel', 'Hostel'), ('library', 'Library'), ('cafeteria', 'Cafeteria'), ('transport', 'Transport'), ('other', 'Other')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')], max_length=10)),
+                ('bucket', models.PositiveSmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'feedback_resolution_buckets',
+                'unique_together': {('date', 'category', 'priority', 'bucket')},
+            },
+        ),
+        migrations.CreateModel(
+            name='FeedbackDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('category', models.CharField(choices=[('academic', 'Academic'), ('infrastructure', 'Infrastructure'), ('faculty', 'Faculty'), ('administration', 'Administration'), ('hostel', 'Hostel'), ('library', 'Library'), ('cafeteria', 'Cafeteria'), ('transport', 'Transport'), ('other', 'Other')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')], max_length=10)),
+                ('created', models.IntegerField(default=0)),
+                ('resolved', models.IntegerField(default=0)),
+                ('resolution_seconds', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'feedback_daily_stats',
+                'unique_together': {('date', 'category', 'priority')},
+            },
+        ),
+        migrations.CreateModel(
+            name='FeedbackBacklog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('academic', 'Academic'), ('infrastructure', 'Infrastructure'), ('faculty', 'Faculty'), ('administration', 'Administration'), ('hostel', 'Hostel'), ('library', 'Library'), ('cafeteria', 'Cafeteria'), ('transport', 'Transport'), ('other', 'Other')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')], max_length=10)),
+                ('open_count', models.IntegerField(default=0)),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'feedback_backlog',
+                'unique_together': {('category', 'priority', 'assigned_to')},
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def merge_unassigned_duplicates(apps, schema_editor):
+    # unique_together let several unassigned rows share a category and priority
+    FeedbackBacklog = apps.get_model('feedback', 'FeedbackBacklog')
+    unassigned = FeedbackBacklog.objects.filter(assigned_to__isnull=True)
+    duplicates = unassigned.values('category', 'priority').annotate(
+        rows=models.Count('id'), total=models.Sum('open_count'), keep=models.Min('id'),
+    ).filter(rows__gt=1)
+    for row in duplicates:
+        cell = unassigned.filter(category=row['category'], priority=row['priority'])
+        cell.exclude(pk=row['keep']).delete()
+        cell.filter(pk=row['keep']).update(open_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('feedback', '0004_analytics_aggregates'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='feedbackbacklog',
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name='feedbackbacklog',
+            name='assigned_to',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='feedbackbacklog',
+            constraint=models.UniqueConstraint(condition=models.Q(('assigned_to__isnull', False)), fields=('category', 'priority', 'assigned_to'), name='feedback_backlog_assigned_uniq'),
+        ),
+        migrations.RunPython(merge_unassigned_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='feedbackbacklog',
+            constraint=models.UniqueConstraint(condition=models.Q(('assigned_to__isnull', True)), fields=('category', 'priority'), name='feedback_backlog_unassigned_uniq'),
+        ),
+    ]
@@ -1,9 +1,47 @@
 from django.db import models
+from django.db.models.functions import Coalesce, RowNumber
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
 
+class FeedbackQuerySet(models.QuerySet):
+    """QuerySet helpers for serializing feedback without per-row queries"""
+    
+    def with_details(self):
+        """Load both users and every response with its responder (FeedbackSerializer)"""
+        return self.select_related('submitted_by', 'assigned_to').prefetch_related(
+            models.Prefetch('responses', queryset=FeedbackResponse.objects.select_related('responder'))
+        )
+    
+    def with_summary(self):
+        """
+        Load both users, annotate response_count and fetch the latest response
+        of every row in one query (FeedbackListSerializer)
+        """
+        response_count = FeedbackResponse.objects.filter(feedback=models.OuterRef('pk')).order_by().values(
+            'feedback'
+        ).annotate(count=models.Count('pk')).values('count')
+        
+        # Rank responses per feedback so one query fetches the latest of every row
+        latest_responses = FeedbackResponse.objects.select_related('responder').annotate(
+            rank=models.Window(
+                expression=RowNumber(),
+                partition_by=[models.F('feedback')],
+                order_by=[models.F('created_at').desc(), models.F('id').desc()],
+            )
+        ).filter(rank=1)
+        
+        return self.select_related('submitted_by', 'assigned_to').prefetch_related(
+            models.Prefetch('responses', queryset=latest_responses, to_attr='last_response_list'),
+        ).annotate(
+            response_count=Coalesce(
+                models.Subquery(response_count, output_field=models.IntegerField()), 0
+            )
+        )
+
+
 class Feedback(models.Model):
     """Model for feedback and grievances"""
     
@@ -26,6 +64,9 @@ class Feedback(models.Model):
         ('closed', 'Closed'),
     )
     
+    # Still waiting for an answer; resolved and closed feedback is done
+    OPEN_STATUSES = ('pending', 'under_review')
+    
     PRIORITY_CHOICES = (
         ('low', 'Low'),
         ('medium', 'Medium'),
@@ -44,17 +85,39 @@ class Feedback(models.Model):
     # Relationships
     submitted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='submitted_feedback')
     assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_feedback')
+    # Near-duplicates of this feedback; see feedback.clustering
+    cluster = models.ForeignKey('FeedbackCluster', on_delete=models.SET_NULL, null=True, blank=True, related_name='members')
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set when the feedback is resolved or closed, cleared when it is reopened
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    
+    objects = FeedbackQuerySet.as_manager()
     
     class Meta:
         db_table = 'feedback'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='feedback_created_idx'),
+            models.Index(fields=['submitted_by', 'created_at'], name='feedback_submitter_idx'),
+            models.Index(fields=['status', 'priority', 'category', 'created_at'], name='feedback_filter_idx'),
+        ]
     
     def __str__(self):
         return self.title
+    
+    def save(self, *args, **kwargs):
+        # Stamped here so every path (views, admin) records when feedback was done
+        if self.status in self.OPEN_STATUSES:
+            self.resolved_at = None
+        elif self.resolved_at is None:
+            self.resolved_at = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'resolved_at'}
+        super().save(*args, **kwargs)
 
 
 class FeedbackResponse(models.Model):
@@ -71,3 +134,105 @@ class FeedbackResponse(models.Model):
     
     def __str__(self):
         return f"Response to {self.feedback.title}"
+
+
+class FeedbackCluster(models.Model):
+    """Near-duplicate feedback that can be answered together"""
+    
+    # Shown in place of the whole cluster in collapsed lists
+    representative = models.ForeignKey(Feedback, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'feedback_clusters'
+        ordering = ['-updated_at']
+    
+    def __str__(self):
+        return f"Cluster {self.pk}"
+
+
+class FeedbackBand(models.Model):
+    """LSH bucket of one band of an open feedback row's MinHash signature"""
+    
+    feedback = models.ForeignKey(Feedback, on_delete=models.CASCADE, related_name='bands')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.CharField(max_length=16)
+    # Copied from the feedback so candidate lookups never join the feedback table
+    category = models.CharField(max_length=20, choices=Feedback.CATEGORY_CHOICES)
+    
+    class Meta:
+        db_table = 'feedback_bands'
+        unique_together = ('feedback', 'band')
+        indexes = [
+            models.Index(fields=['band', 'bucket', 'category'], name='feedback_band_bucket_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.band}:{self.bucket} -> {self.feedback_id}"
+
+
+class FeedbackDailyStat(models.Model):
+    """Feedback submitted and resolved per day, category and priority (see feedback.analytics)"""
+    
+    date = models.DateField()
+    category = models.CharField(max_length=20, choices=Feedback.CATEGORY_CHOICES)
+    priority = models.CharField(max_length=10, choices=Feedback.PRIORITY_CHOICES)
+    created = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+    # Sum of created -> resolved durations of the feedback resolved that day
+    resolution_seconds = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'feedback_daily_stats'
+        unique_together = ('date', 'category', 'priority')
+    
+    def __str__(self):
+        return f"{self.date} {self.category}/{self.priority}"
+
+
+class FeedbackResolutionBucket(models.Model):
+    """Histogram of resolution times per day, category and priority"""
+    
+    date = models.DateField()
+    category = models.CharField(max_length=20, choices=Feedback.CATEGORY_CHOICES)
+    priority = models.CharField(max_length=10, choices=Feedback.PRIORITY_CHOICES)
+    # Index into feedback.analytics.BUCKET_HOURS
+    bucket = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'feedback_resolution_buckets'
+        unique_together = ('date', 'category', 'priority', 'bucket')
+    
+    def __str__(self):
+        return f"{self.date} {self.category}/{self.priority} #{self.bucket}: {self.count}"
+
+
+class FeedbackBacklog(models.Model):
+    """Open feedback per category, priority and assignee (null: unassigned)"""
+    
+    category = models.CharField(max_length=20, choices=Feedback.CATEGORY_CHOICES)
+    priority = models.CharField(max_length=10, choices=Feedback.PRIORITY_CHOICES)
+    # A deleted user's counts are merged into the unassigned rows first (feedback.signals)
+    assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    open_count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'feedback_backlog'
+        # NULLs never compare equal in a unique index, so unassigned rows need their own constraint
+        constraints = [
+            models.UniqueConstraint(
+                fields=['category', 'priority', 'assigned_to'],
+                condition=models.Q(assigned_to__isnull=False),
+                name='feedback_backlog_assigned_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['category', 'priority'],
+                condition=models.Q(assigned_to__isnull=True),
+                name='feedback_backlog_unassigned_uniq',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.category}/{self.priority} -> {self.assigned_to_id}: {self.open_count}"
@@ -0,0 +1,328 @@
+"""
+Automatic feedback triage.
+
+New feedback gets a priority and an assignee before it is saved.
+
+Priority: keyword rules (harassment, fire, broken, exam, ...) and a per
+category default give a floor; a multinomial naive Bayes classifier trained on
+handled feedback (resolved/closed rows, whose priority staff have had the
+chance to correct) can raise it when it is confident. The submitter's own
+choice is only kept when neither has anything to say, and never as 'urgent'.
+Requests only read the last trained classifier; once it is older than
+FEEDBACK_ROUTING['RETRAIN_INTERVAL'] seconds a background thread retrains it,
+so no submission waits for training.
+
+Assignee: the eligible faculty/admin user with the fewest open (pending or
+under review) assigned feedback. Loads live in an in-memory LoadIndex per
+process, built with one aggregate query and then kept current by the
+post_save/post_delete signals of Feedback and User. Writes that bypass
+signals (queryset.update(), other processes) are picked up by rebuilding the
+index every FEEDBACK_ROUTING['REBUILD_INTERVAL'] seconds. With several worker
+processes each one balances on its own view, so until the next rebuild two
+workers can hand feedback to the same person; lower REBUILD_INTERVAL where
+tighter balancing matters.
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from .models import Feedback
+
+User = get_user_model()
+
+ROUTING_DEFAULTS = {
+    'ENABLED': True,
+    # Below this many handled rows the classifier is not used
+    'MIN_TRAINING_ROWS': 30,
+    'MAX_TRAINING_ROWS': 5000,
+    'RETRAIN_INTERVAL': 3600,
+    'MIN_CONFIDENCE': 0.6,
+    'REBUILD_INTERVAL': 300,
+}
+
+PRIORITIES = ('low', 'medium', 'high', 'urgent')
+OPEN_STATUSES = Feedback.OPEN_STATUSES
+STAFF_ROLES = ('faculty', 'admin')
+
+# Complaints about faculty are not routed to faculty
+CATEGORY_ROLES = {
+    'faculty': ('admin',),
+}
+
+CATEGORY_PRIORITY = {
+    'hostel': 'medium',
+    'infrastructure': 'medium',
+    'transport': 'medium',
+    'academic': 'medium',
+    'faculty': 'medium',
+    'administration': 'medium',
+    'library': 'low',
+    'cafeteria': 'low',
+    'other': 'low',
+}
+
+KEYWORD_PRIORITY = {
+    'urgent': {
+        'harassment', 'harass', 'harassed', 'ragging', 'assault', 'abuse', 'violence', 'threat',
+        'threatened', 'unsafe', 'fire', 'smoke', 'injury', 'injured', 'emergency', 'medical',
+        'suicide', 'electrocution', 'shock', 'collapse', 'poisoning',
+    },
+    'high': {
+        'broken', 'leak', 'leaking', 'outage', 'flood', 'flooding', 'exam', 'examination', 'deadline',
+        'fee', 'scholarship', 'theft', 'stolen', 'discrimination', 'bribe', 'water', 'electricity',
+        'power', 'toilet', 'sick', 'unhygienic', 'insect', 'grade', 'marks', 'attendance',
+    },
+    'low': {
+        'suggestion', 'suggest', 'idea', 'feature', 'improve', 'improvement', 'appreciate',
+        'thanks', 'request', 'nice',
+    },
+}
+
+TOKEN_RE = re.compile(r'[a-z]+')
+
+
+def routing_setting(name):
+    """Read a FEEDBACK_ROUTING setting, falling back to ROUTING_DEFAULTS"""
+    return getattr(settings, 'FEEDBACK_ROUTING', {}).get(name, ROUTING_DEFAULTS[name])
+
+
+def _level(priority):
+    return PRIORITIES.index(priority)
+
+
+def tokenize(text):
+    words = TOKEN_RE.findall((text or '').lower())
+    # Cheap plural folding so 'fees' matches 'fee'
+    return [word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+            for word in words if len(word) > 2]
+
+
+def keyword_priority(tokens):
+    """Highest priority whose keywords occur in tokens, or None"""
+    present = set(tokens)
+    for priority in ('urgent', 'high', 'low'):
+        if present & KEYWORD_PRIORITY[priority]:
+            return priority
+    return None
+
+
+class NaiveBayesClassifier:
+    """Multinomial naive Bayes over word counts with Laplace smoothing"""
+
+    def __init__(self):
+        self.priors = {}
+        self.likelihoods = {}
+        self.unseen = {}
+        self.size = 0
+
+    def fit(self, documents, labels):
+        counts = defaultdict(Counter)
+        documents_per_label = Counter(labels)
+        for tokens, label in zip(documents, labels):
+            counts[label].update(tokens)
+        vocabulary = {token for counter in counts.values() for token in counter}
+
+        self.size = len(labels)
+        for label, counter in counts.items():
+            total = sum(counter.values()) + len(vocabulary)
+            self.priors[label] = math.log(documents_per_label[label] / self.size)
+            self.likelihoods[label] = {token: math.log((count + 1) / total) for token, count in counter.items()}
+            self.unseen[label] = math.log(1 / total)
+        return self
+
+    def predict_proba(self, tokens):
+        """{label: probability} for a tokenized document"""
+        scores = {
+            label: prior + sum(self.likelihoods[label].get(token, self.unseen[label]) for token in tokens)
+            for label, prior in self.priors.items()
+        }
+        top = max(scores.values())
+        weights = {label: math.exp(score - top) for label, score in scores.items()}
+        total = sum(weights.values())
+        return {label: weight / total for label, weight in weights.items()}
+
+    def predict(self, tokens):
+        """(label, confidence) of the most probable label"""
+        probabilities = self.predict_proba(tokens)
+        label = max(probabilities, key=probabilities.get)
+        return label, probabilities[label]
+
+
+_classifier = None
+_trained_at = None
+_trainer = None
+_classifier_lock = threading.Lock()
+
+
+def _classifier_expired():
+    return _trained_at is None or time.monotonic() - _trained_at > routing_setting('RETRAIN_INTERVAL')
+
+
+def train_classifier():
+    """Fit a classifier on the latest handled feedback (None if there is too little)"""
+    rows = list(
+        Feedback.objects.filter(status__in=('resolved', 'closed'))
+        .order_by('-updated_at')
+        .values_list('title', 'description', 'priority')[:routing_setting('MAX_TRAINING_ROWS')]
+    )
+    if len(rows) < routing_setting('MIN_TRAINING_ROWS') or len({row[2] for row in rows}) < 2:
+        return None
+    return NaiveBayesClassifier().fit(
+        [tokenize(f'{title} {description}') for title, description, _ in rows],
+        [priority for _, _, priority in rows],
+    )
+
+
+def refresh_classifier():
+    """Train now and publish the result to this process"""
+    global _classifier, _trained_at
+    try:
+        _classifier = train_classifier()
+    finally:
+        # A failed run is retried after RETRAIN_INTERVAL, not on every request
+        _trained_at = time.monotonic()
+    return _classifier
+
+
+def _train():
+    try:
+        refresh_classifier()
+    except Exception as e:
+        print(f"❌ Feedback classifier training failed: {e}")
+    finally:
+        # The trainer thread holds its own connection
+        connection.close()
+
+
+def _training():
+    return _trainer is not None and _trainer.is_alive()
+
+
+def get_classifier():
+    """
+    This process's last trained classifier (None until the first training
+    finished); starts a background retrain once it is RETRAIN_INTERVAL old
+    """
+    global _trainer
+    if _classifier_expired() and not _training():
+        with _classifier_lock:
+            if _classifier_expired() and not _training():
+                _trainer = threading.Thread(target=_train, name='feedback-classifier', daemon=True)
+                _trainer.start()
+    return _classifier
+
+
+def reset_classifier():
+    """Retrain in the background on the next prediction"""
+    global _trained_at
+    _trained_at = None
+
+
+def score_priority(title, description, category, requested=None):
+    """Return (priority, details) for new feedback"""
+    tokens = tokenize(f'{title} {description}')
+    keyword = keyword_priority(tokens)
+    details = {'keyword': keyword, 'category': CATEGORY_PRIORITY.get(category, 'medium'), 'model': None}
+
+    if keyword is not None:
+        priority = keyword
+    else:
+        priority = details['category']
+
+    classifier = get_classifier()
+    if classifier is not None and tokens:
+        label, confidence = classifier.predict(tokens)
+        details['model'] = {'priority': label, 'confidence': round(confidence, 3)}
+        if confidence >= routing_setting('MIN_CONFIDENCE') and _level(label) > _level(priority):
+            priority = label
+
+    # The submitter's pick only counts when nothing else spoke up, and cannot claim urgent
+    if keyword is None and details['model'] is None and requested in PRIORITIES:
+        priority = max(priority, min(requested, 'high', key=_level), key=_level)
+    details['priority'] = priority
+    return priority, details
+
+
+class LoadIndex:
+    """Open assigned feedback per staff user, kept in memory"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.staff = None
+        self.assignments = {}
+        self.loads = Counter()
+        self.built_at = None
+
+    def rebuild(self):
+        staff = dict(User.objects.filter(role__in=STAFF_ROLES, is_active=True).values_list('id', 'role'))
+        assignments = dict(
+            Feedback.objects.filter(status__in=OPEN_STATUSES, assigned_to__isnull=False)
+            .values_list('id', 'assigned_to_id')
+        )
+        with self.lock:
+            self.staff = staff
+            self.assignments = assignments
+            self.loads = Counter(assignments.values())
+            self.built_at = time.monotonic()
+
+    def ensure(self):
+        if self.built_at is None or time.monotonic() - self.built_at > routing_setting('REBUILD_INTERVAL'):
+            self.rebuild()
+
+    def track_feedback(self, feedback_id, assignee_id, is_open):
+        """Record the current assignee of a feedback row (None when closed or deleted)"""
+        with self.lock:
+            if self.staff is None:
+                return
+            previous = self.assignments.pop(feedback_id, None)
+            if previous is not None:
+                self.loads[previous] -= 1
+            if assignee_id is not None and is_open:
+                self.assignments[feedback_id] = assignee_id
+                self.loads[assignee_id] += 1
+
+    def track_user(self, user_id, role, is_active):
+        with self.lock:
+            if self.staff is None:
+                return
+            if is_active and role in STAFF_ROLES:
+                self.staff[user_id] = role
+            else:
+                self.staff.pop(user_id, None)
+
+    def pick(self, roles, exclude=None):
+        """Least loaded active user with one of roles (lowest id on ties), or None"""
+        self.ensure()
+        with self.lock:
+            candidates = [user_id for user_id, role in self.staff.items() if role in roles and user_id != exclude]
+            if not candidates:
+                return None
+            return min(candidates, key=lambda user_id: (self.loads[user_id], user_id))
+
+    def snapshot(self):
+        self.ensure()
+        with self.lock:
+            return {user_id: self.loads[user_id] for user_id in self.staff}
+
+
+load_index = LoadIndex()
+
+
+def route(title, description, category, requested_priority=None, submitted_by=None):
+    """
+    Return {'priority', 'assigned_to_id', 'details'} for new feedback, or
+    None when routing is disabled
+    """
+    if not routing_setting('ENABLED'):
+        return None
+
+    priority, details = score_priority(title, description, category, requested_priority)
+    roles = CATEGORY_ROLES.get(category, STAFF_ROLES)
+    assignee_id = load_index.pick(roles, exclude=submitted_by.id if submitted_by else None)
+    return {'priority': priority, 'assigned_to_id': assignee_id, 'details': details}
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Feedback, FeedbackResponse
+from .models import Feedback, FeedbackResponse, FeedbackCluster
 from accounts.serializers import UserSerializer
 
 
@@ -14,17 +14,8 @@ class FeedbackResponseSerializer(serializers.ModelSerializer):
         read_only_fields = ('responder', 'created_at')
 
 
-class FeedbackSerializer(serializers.ModelSerializer):
-    """Serializer for feedback"""
-    
-    submitted_by_details = UserSerializer(source='submitted_by', read_only=True)
-    assigned_to_details = UserSerializer(source='assigned_to', read_only=True)
-    responses = FeedbackResponseSerializer(many=True, read_only=True)
-    
-    class Meta:
-        model = Feedback
-        fields = '__all__'
-        read_only_fields = ('submitted_by', 'created_at', 'updated_at')
+class AnonymousSubmitterMixin:
+    """Hide the submitter of anonymous feedback"""
     
     def to_representation(self, instance):
         representation = super().to_representation(instance)
@@ -35,3 +26,65 @@ class FeedbackSerializer(serializers.ModelSerializer):
             representation['submitted_by_details'] = None
         
         return representation
+
+
+class FeedbackSerializer(AnonymousSubmitterMixin, serializers.ModelSerializer):
+    """Serializer for feedback"""
+    
+    submitted_by_details = UserSerializer(source='submitted_by', read_only=True)
+    assigned_to_details = UserSerializer(source='assigned_to', read_only=True)
+    responses = FeedbackResponseSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = Feedback
+        fields = '__all__'
+        # cluster is maintained by feedback.clustering, resolved_at by Feedback.save()
+        read_only_fields = ('submitted_by', 'cluster', 'created_at', 'updated_at', 'resolved_at')
+
+
+class FeedbackListSerializer(AnonymousSubmitterMixin, serializers.ModelSerializer):
+    """Compact feedback for lists: response count and latest response instead of the thread"""
+    
+    submitted_by_details = UserSerializer(source='submitted_by', read_only=True)
+    assigned_to_details = UserSerializer(source='assigned_to', read_only=True)
+    response_count = serializers.SerializerMethodField()
+    last_response = serializers.SerializerMethodField()
+    cluster_size = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Feedback
+        fields = ('id', 'title', 'category', 'priority', 'status', 'is_anonymous',
+                  'submitted_by', 'submitted_by_details', 'assigned_to', 'assigned_to_details',
+                  'response_count', 'last_response', 'cluster', 'cluster_size', 'created_at', 'updated_at')
+        read_only_fields = fields
+    
+    def get_response_count(self, obj):
+        # Annotated by Feedback.objects.with_summary()
+        if hasattr(obj, 'response_count'):
+            return obj.response_count
+        return obj.responses.count()
+    
+    def get_last_response(self, obj):
+        if hasattr(obj, 'last_response_list'):
+            response = obj.last_response_list[0] if obj.last_response_list else None
+        else:
+            response = obj.responses.select_related('responder').order_by('-created_at', '-id').first()
+        return FeedbackResponseSerializer(response).data if response else None
+    
+    def get_cluster_size(self, obj):
+        # Only annotated on collapsed lists (?collapse=true)
+        return getattr(obj, 'cluster_size', None)
+
+
+class FeedbackClusterSerializer(serializers.ModelSerializer):
+    """Serializer for near-duplicate feedback clusters"""
+    
+    title = serializers.CharField(source='representative.title', read_only=True, default=None)
+    category = serializers.CharField(source='representative.category', read_only=True, default=None)
+    size = serializers.IntegerField(read_only=True)
+    open_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = FeedbackCluster
+        fields = ('id', 'representative', 'title', 'category', 'size', 'open_count', 'created_at', 'updated_at')
+        read_only_fields = fields
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from .analytics import release_assignee
+from .clustering import cluster_feedback, index_feedback, replace_representative
+from .models import Feedback, FeedbackCluster
+from .routing import OPEN_STATUSES, load_index
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Feedback)
+def track_feedback_load(sender, instance, **kwargs):
+    """Keep the routing load index in step with assignments and status changes"""
+    load_index.track_feedback(instance.pk, instance.assigned_to_id, instance.status in OPEN_STATUSES)
+
+
+@receiver(post_delete, sender=Feedback)
+def untrack_feedback_load(sender, instance, **kwargs):
+    load_index.track_feedback(instance.pk, None, False)
+
+
+@receiver(post_save, sender=Feedback)
+def update_duplicate_index(sender, instance, update_fields=None, **kwargs):
+    """Keep the LSH buckets in step with the text and status, and cluster new near-duplicates"""
+    if update_fields and not {'title', 'description', 'category', 'status'} & set(update_fields):
+        return
+    index_feedback(instance)
+    cluster_feedback(instance)
+
+
+@receiver(post_delete, sender=Feedback)
+def reassign_cluster_representative(sender, instance, **kwargs):
+    if instance.cluster_id and FeedbackCluster.objects.filter(pk=instance.cluster_id, representative__isnull=True).exists():
+        replace_representative(instance.cluster_id)
+
+
+@receiver(post_save, sender=User)
+def track_staff(sender, instance, **kwargs):
+    """Role changes and deactivation add or remove routing candidates"""
+    load_index.track_user(instance.pk, instance.role, instance.is_active)
+
+
+@receiver(post_delete, sender=User)
+def untrack_staff(sender, instance, **kwargs):
+    load_index.track_user(instance.pk, None, False)
+
+
+@receiver(pre_delete, sender=User)
+def release_backlog(sender, instance, **kwargs):
+    """The user's open feedback is about to become unassigned; keep the backlog aggregate in step"""
+    release_assignee(instance.pk)
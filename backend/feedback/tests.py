@@ -0,0 +1,319 @@
+import csv
+import io
+import json
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APITestCase
+
+from . import analytics, routing
+from .models import Feedback, FeedbackBacklog, FeedbackCluster, FeedbackResponse
+from .routing import LoadIndex, NaiveBayesClassifier, load_index, route, score_priority
+
+User = get_user_model()
+
+
+class FeedbackListQueryTests(APITestCase):
+    """The feedback list costs the same number of queries whatever the page size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = User.objects.create_user(email='faculty@example.com', password='pass', role='faculty')
+        students = [User.objects.create_user(email=f'student{i}@example.com', password='pass') for i in range(3)]
+        for i in range(30):
+            feedback = Feedback.objects.create(
+                title=f'Feedback {i}', description=f'Description number {i}', category='other',
+                submitted_by=students[i % 3], assigned_to=cls.faculty if i % 2 else None,
+                is_anonymous=i % 5 == 0,
+            )
+            for j in range(i % 3):
+                FeedbackResponse.objects.create(feedback=feedback, responder=cls.faculty, message=f'Reply {j}')
+
+    def setUp(self):
+        self.client.force_authenticate(self.faculty)
+
+    def list_feedback(self, page_size):
+        # count, page, and the prefetch of each row's latest response
+        with mock.patch.object(PageNumberPagination, 'page_size', page_size), self.assertNumQueries(3):
+            response = self.client.get('/api/feedback/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 30)
+        return response.data['results']
+
+    def test_small_page(self):
+        self.assertEqual(len(self.list_feedback(2)), 2)
+
+    def test_large_page(self):
+        results = self.list_feedback(30)
+        self.assertEqual(len(results), 30)
+        self.assertEqual(sum(row['response_count'] for row in results), 30)
+        self.assertEqual(sum(row['last_response'] is not None for row in results), 20)
+
+
+class FeedbackBacklogTests(TestCase):
+    """Open feedback per assignee survives the assignee being deleted"""
+
+    def setUp(self):
+        self.faculty = User.objects.create_user(email='faculty@example.com', password='pass', role='faculty')
+        for i in range(5):
+            Feedback.objects.create(
+                title=f'Feedback {i}', description='Broken projector', category='infrastructure', priority='high',
+                assigned_to=self.faculty if i < 3 else None,
+            )
+        analytics.rebuild()
+
+    def backlog(self):
+        return dict(
+            FeedbackBacklog.objects.filter(category='infrastructure', priority='high').values_list('assigned_to_id', 'open_count')
+        )
+
+    def test_one_unassigned_row_per_cell(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            FeedbackBacklog.objects.create(category='infrastructure', priority='high', open_count=1)
+
+    def test_deleted_assignee_counts_move_to_unassigned(self):
+        self.assertEqual(self.backlog(), {None: 2, self.faculty.pk: 3})
+        self.faculty.delete()
+        self.assertEqual(self.backlog(), {None: 5})
+
+        analytics.rebuild()
+        self.assertEqual(self.backlog(), {None: 5})
+
+
+class FeedbackUpdateTests(APITestCase):
+    """Fields maintained by the server cannot be written through the API"""
+
+    def test_cluster_and_resolved_at_are_read_only(self):
+        admin = User.objects.create_user(email='admin@example.com', password='pass', role='admin')
+        feedback = Feedback.objects.create(title='Wifi down', description='No wifi in block A', category='other')
+        cluster = FeedbackCluster.objects.create(representative=feedback)
+        self.client.force_authenticate(admin)
+
+        response = self.client.patch(f'/api/feedback/{feedback.pk}/', {
+            'cluster': cluster.pk, 'resolved_at': '2020-01-01T00:00:00Z', 'status': 'under_review',
+        })
+        self.assertEqual(response.status_code, 200, response.content)
+        feedback.refresh_from_db()
+        self.assertIsNone(feedback.cluster_id)
+        self.assertIsNone(feedback.resolved_at)
+        self.assertEqual(feedback.status, 'under_review')
+
+
+def fitted_classifier(examples):
+    """Classifier trained on {text: priority}"""
+    texts = list(examples)
+    return NaiveBayesClassifier().fit([routing.tokenize(text) for text in texts], [examples[text] for text in texts])
+
+
+@mock.patch.object(routing, 'get_classifier', return_value=None)
+class PriorityScoringTests(TestCase):
+    """Keyword rules and category defaults set the floor, the classifier may raise it"""
+
+    def test_keyword_beats_category_default(self, get_classifier):
+        priority, details = score_priority('Harassment near the hostel', 'Seniors keep harassing us', 'hostel')
+        self.assertEqual(priority, 'urgent')
+        self.assertEqual(details['keyword'], 'urgent')
+        self.assertEqual(details['category'], 'medium')
+
+    def test_category_default_without_keywords(self, get_classifier):
+        self.assertEqual(score_priority('Menu', 'Same menu every day', 'cafeteria')[0], 'low')
+        self.assertEqual(score_priority('Bus timing', 'Bus leaves before class ends', 'transport')[0], 'medium')
+
+    def test_requested_priority_only_without_other_signals(self, get_classifier):
+        self.assertEqual(score_priority('Menu', 'Same menu every day', 'cafeteria', 'high')[0], 'high')
+        self.assertEqual(score_priority('Menu', 'Same menu every day', 'cafeteria', 'urgent')[0], 'high')
+        self.assertEqual(score_priority('Bus timing', 'Bus leaves early', 'transport', 'low')[0], 'medium')
+        # A keyword match wins over the submitter's pick
+        self.assertEqual(score_priority('Suggestion', 'An idea for the menu', 'cafeteria', 'high')[0], 'low')
+
+    def test_confident_classifier_raises_priority(self, get_classifier):
+        get_classifier.return_value = fitted_classifier({'wifi is slow': 'high', 'menu is bland': 'low'})
+
+        priority, details = score_priority('Wifi', 'The wifi is slow', 'other', 'low')
+
+        self.assertEqual(priority, 'high')
+        self.assertEqual(details['model']['priority'], 'high')
+
+    def test_classifier_never_lowers_priority(self, get_classifier):
+        get_classifier.return_value = fitted_classifier({'fire drill': 'low', 'menu is bland': 'high'})
+
+        self.assertEqual(score_priority('Fire', 'Fire drill alarm', 'other')[0], 'urgent')
+
+
+class ClassifierTrainingTests(TestCase):
+    """Training runs in a background thread; callers get the last trained classifier"""
+
+    def setUp(self):
+        patcher = mock.patch.multiple(routing, _classifier=None, _trained_at=None, _trainer=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_requests_do_not_wait_for_training(self):
+        previous, trained = NaiveBayesClassifier(), NaiveBayesClassifier()
+        routing._classifier = previous
+        release = threading.Event()
+
+        def train():
+            release.wait(5)
+            return trained
+
+        with mock.patch.object(routing, 'train_classifier', side_effect=train) as train_classifier:
+            self.assertIs(routing.get_classifier(), previous)
+            self.assertIs(routing.get_classifier(), previous)
+            release.set()
+            routing._trainer.join()
+            self.assertIs(routing.get_classifier(), trained)
+        train_classifier.assert_called_once()
+
+    def test_too_little_history_trains_nothing(self):
+        self.assertIsNone(routing.refresh_classifier())
+        self.assertIsNotNone(routing._trained_at)
+
+
+class LoadIndexTests(TestCase):
+    """The least loaded eligible staff member gets the next feedback"""
+
+    def setUp(self):
+        self.faculty = [User.objects.create_user(email=f'faculty{i}@example.com', role='faculty') for i in range(2)]
+        self.admin = User.objects.create_user(email='admin@example.com', role='admin')
+        User.objects.create_user(email='inactive@example.com', role='faculty', is_active=False)
+        User.objects.create_user(email='student@example.com')
+        for assignee, status in [(self.faculty[0], 'under_review'), (self.faculty[0], 'pending'),
+                                 (self.faculty[1], 'under_review'), (self.faculty[1], 'resolved'),
+                                 (self.faculty[1], 'closed')]:
+            Feedback.objects.create(title='Broken fan', description='Fan is broken', category='hostel',
+                                    assigned_to=assignee, status=status)
+        self.index = LoadIndex()
+        self.index.rebuild()
+
+    def test_counts_open_feedback_of_active_staff(self):
+        self.assertEqual(self.index.snapshot(), {self.faculty[0].pk: 2, self.faculty[1].pk: 1, self.admin.pk: 0})
+
+    def test_picks_least_loaded(self):
+        self.assertEqual(self.index.pick(('faculty',)), self.faculty[1].pk)
+        self.assertEqual(self.index.pick(('faculty', 'admin')), self.admin.pk)
+
+    def test_ties_go_to_the_lowest_id(self):
+        self.index.track_feedback(1000, self.faculty[1].pk, True)
+        self.assertEqual(self.index.pick(('faculty',)), self.faculty[0].pk)
+
+    def test_tracks_new_and_closed_assignments(self):
+        self.index.track_feedback(1000, self.faculty[1].pk, True)
+        self.index.track_feedback(1001, self.faculty[1].pk, True)
+        self.assertEqual(self.index.pick(('faculty',)), self.faculty[0].pk)
+
+        self.index.track_feedback(1001, self.faculty[1].pk, False)
+        self.assertEqual(self.index.snapshot()[self.faculty[1].pk], 2)
+
+    def test_excluded_and_removed_users_are_skipped(self):
+        self.assertEqual(self.index.pick(('faculty',), exclude=self.faculty[1].pk), self.faculty[0].pk)
+        self.index.track_user(self.faculty[1].pk, 'faculty', False)
+        self.assertEqual(self.index.pick(('faculty',)), self.faculty[0].pk)
+        self.assertIsNone(self.index.pick(('faculty',), exclude=self.faculty[0].pk))
+
+
+@mock.patch.object(routing, 'get_classifier', return_value=None)
+class RouteTests(APITestCase):
+    """New feedback is prioritised and assigned on submission"""
+
+    def setUp(self):
+        self.faculty = User.objects.create_user(email='faculty@example.com', role='faculty')
+        self.admin = User.objects.create_user(email='admin@example.com', role='admin')
+        self.student = User.objects.create_user(email='student@example.com')
+        Feedback.objects.create(title='Broken fan', description='Fan is broken', category='hostel',
+                                assigned_to=self.admin, status='under_review')
+        load_index.rebuild()
+
+    def test_assigns_least_loaded_staff(self, get_classifier):
+        result = route('Leaking tap', 'Tap in block B is leaking', 'hostel', 'low', self.student)
+        self.assertEqual(result['assigned_to_id'], self.faculty.pk)
+        self.assertEqual(result['priority'], 'high')
+
+    def test_faculty_complaints_go_to_admins(self, get_classifier):
+        result = route('Late lectures', 'Lectures start late', 'faculty', submitted_by=self.student)
+        self.assertEqual(result['assigned_to_id'], self.admin.pk)
+
+    def test_submitter_is_not_assigned_own_feedback(self, get_classifier):
+        result = route('Projector', 'Projector in room 5 flickers', 'infrastructure', submitted_by=self.faculty)
+        self.assertEqual(result['assigned_to_id'], self.admin.pk)
+
+    @override_settings(FEEDBACK_ROUTING={'ENABLED': False})
+    def test_disabled(self, get_classifier):
+        self.assertIsNone(route('Leaking tap', 'Tap is leaking', 'hostel', submitted_by=self.student))
+
+    def test_submission_is_routed(self, get_classifier):
+        self.client.force_authenticate(self.student)
+        response = self.client.post('/api/feedback/', {
+            'title': 'Water outage', 'description': 'No water in hostel block C', 'category': 'hostel', 'priority': 'low',
+        })
+        self.assertEqual(response.status_code, 201, response.content)
+
+        feedback = Feedback.objects.get(pk=response.data['id'])
+        self.assertEqual(feedback.assigned_to, self.faculty)
+        self.assertEqual(feedback.status, 'under_review')
+        self.assertEqual(feedback.priority, 'high')
+        self.assertEqual(load_index.snapshot()[self.faculty.pk], 1)
+
+
+class FeedbackExportTests(APITestCase):
+    """Exports hide anonymous submitters and cannot smuggle spreadsheet formulas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = User.objects.create_user(email='faculty@example.com', role='faculty')
+        cls.student = User.objects.create_user(email='student@example.com', department='@SUM(A1:A9)')
+        cls.anonymous = Feedback.objects.create(
+            title='Harassment in block D', description='Reported anonymously', category='hostel',
+            submitted_by=cls.student, is_anonymous=True,
+        )
+        cls.signed = Feedback.objects.create(
+            title='=HYPERLINK("http://example.com")', description='+1 for longer library hours', category='library',
+            submitted_by=cls.student,
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.faculty)
+
+    def export(self, **params):
+        response = self.client.get('/api/feedback/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def csv_rows(self, **params):
+        return {int(row['id']): row for row in csv.DictReader(io.StringIO(self.export(**params)))}
+
+    def ndjson_rows(self):
+        return {row['id']: row for row in map(json.loads, self.export(output='ndjson').splitlines())}
+
+    def test_anonymous_submitter_is_blank_in_csv(self):
+        rows = self.csv_rows()
+        self.assertEqual(rows[self.anonymous.pk]['submitted_by_email'], '')
+        self.assertEqual(rows[self.anonymous.pk]['submitted_by_department'], '')
+        self.assertEqual(rows[self.signed.pk]['submitted_by_email'], 'student@example.com')
+
+    def test_anonymous_submitter_is_blank_in_ndjson(self):
+        rows = self.ndjson_rows()
+        self.assertIsNone(rows[self.anonymous.pk]['submitted_by_email'])
+        self.assertIsNone(rows[self.anonymous.pk]['submitted_by_department'])
+        self.assertEqual(rows[self.signed.pk]['submitted_by_department'], '@SUM(A1:A9)')
+
+    def test_formula_cells_are_escaped_in_csv(self):
+        row = self.csv_rows()[self.signed.pk]
+        self.assertEqual(row['title'], f"'{self.signed.title}")
+        self.assertEqual(row['description'], f"'{self.signed.description}")
+        self.assertEqual(row['submitted_by_department'], "'@SUM(A1:A9)")
+
+    def test_list_filters_apply(self):
+        self.assertEqual(list(self.csv_rows(category='library')), [self.signed.pk])
+
+    def test_students_are_forbidden(self):
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.client.get('/api/feedback/export/').status_code, 403)
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get('/api/feedback/export/', {'output': 'xlsx'})
+        self.assertEqual(response.status_code, 400)
@@ -1,8 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import FeedbackViewSet
+from .views import FeedbackViewSet, FeedbackClusterViewSet
 
 router = DefaultRouter()
+# Registered first: the feedback detail route would otherwise take 'clusters' as an id
+router.register(r'clusters', FeedbackClusterViewSet, basename='feedback-cluster')
 router.register(r'', FeedbackViewSet, basename='feedback')
 
 urlpatterns = [
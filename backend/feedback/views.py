@@ -2,17 +2,22 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db import models
-from .models import Feedback, FeedbackResponse
-from .serializers import FeedbackSerializer, FeedbackResponseSerializer
-from asgiref.sync import async_to_sync
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import Feedback, FeedbackResponse, FeedbackCluster, FeedbackBand
+from .serializers import (
+    FeedbackSerializer, FeedbackListSerializer, FeedbackResponseSerializer, FeedbackClusterSerializer
+)
+from core.exports import export_format, stream_export
+from core.mongo_sync import enqueue_many as queue_mirrors
+from notifications.queue import enqueue_notification_to_user, enqueue_notification_to_users
+from notifications.utils import push_to_group
+from . import analytics
+from .routing import OPEN_STATUSES, get_classifier, load_index, route
 from accounts.permissions import IsFacultyOrAdmin, IsOwnerOrAdmin
 
-# Channels temporarily disabled - function stub
-def get_channel_layer():
-    return None
-
-
 class FeedbackViewSet(viewsets.ModelViewSet):
     """ViewSet for feedback - Admins can view, edit, and respond to all feedback"""
     
@@ -28,15 +33,37 @@ class FeedbackViewSet(viewsets.ModelViewSet):
         """
         if self.action in ['update', 'partial_update', 'destroy']:
             return [IsOwnerOrAdmin()]
+        if self.action == 'export':
+            return [IsFacultyOrAdmin()]
         return [IsAuthenticated()]
     
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return FeedbackListSerializer
+        return FeedbackSerializer
+    
     def get_queryset(self):
         user = self.request.user
         queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.with_summary()
+        elif self.action != 'export':
+            queryset = queryset.with_details()
         
         # Admin and faculty can see all feedback
         if user.role in ['admin', 'faculty']:
-            pass
+            # One row per near-duplicate cluster (its representative) plus unclustered feedback
+            if self.request.query_params.get('collapse') == 'true':
+                cluster_size = Feedback.objects.filter(cluster=models.OuterRef('cluster')).order_by().values(
+                    'cluster'
+                ).annotate(count=models.Count('pk')).values('count')
+                queryset = queryset.filter(
+                    models.Q(cluster__isnull=True) | models.Q(cluster__representative=models.F('pk'))
+                ).annotate(cluster_size=models.Subquery(cluster_size, output_field=models.IntegerField()))
+            
+            cluster = self.request.query_params.get('cluster', None)
+            if cluster:
+                queryset = queryset.filter(cluster=cluster)
         else:
             # Students can only see their own feedback
             queryset = queryset.filter(submitted_by=user)
@@ -59,25 +86,116 @@ class FeedbackViewSet(viewsets.ModelViewSet):
         return queryset
     
     def perform_create(self, serializer):
-        # Set submitted_by to current user if not anonymous
-        if not serializer.validated_data.get('is_anonymous', False):
-            feedback = serializer.save(submitted_by=self.request.user)
-        else:
-            feedback = serializer.save()
+        data = serializer.validated_data
+        extra = {}
+        
+        # Score priority and pick the least loaded eligible staff member
+        routing = route(data['title'], data['description'], data['category'],
+                        data.get('priority'), self.request.user)
+        if routing is not None:
+            extra['priority'] = routing['priority']
+            if routing['assigned_to_id']:
+                extra['assigned_to_id'] = routing['assigned_to_id']
+                extra['status'] = 'under_review'
+        
+        with transaction.atomic():
+            # Set submitted_by to current user if not anonymous
+            if not data.get('is_anonymous', False):
+                feedback = serializer.save(submitted_by=self.request.user, **extra)
+            else:
+                feedback = serializer.save(**extra)
+            analytics.record_changes([(None, analytics.snapshot(feedback))])
+        
+        if feedback.assigned_to_id:
+            enqueue_notification_to_user(
+                feedback.assigned_to,
+                title=f"📋 Feedback assigned: {feedback.title}",
+                message=f"New {feedback.get_category_display().lower()} feedback was routed to you ({feedback.priority} priority)",
+                notification_type='feedback',
+                link=f'/feedback/{feedback.id}'
+            )
         
         # Notify admins
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            'admin_notifications',
-            {
-                'type': 'send_notification',
-                'message': {
-                    'type': 'feedback',
-                    'action': 'created',
-                    'data': FeedbackSerializer(feedback).data
-                }
-            }
-        )
+        push_to_group('admin_notifications', {
+            'type': 'feedback',
+            'action': 'created',
+            'data': FeedbackSerializer(feedback).data
+        })
+    
+    def perform_update(self, serializer):
+        with transaction.atomic(), analytics.track(serializer.instance):
+            serializer.save()
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            before = analytics.snapshot(instance)
+            instance.delete()
+            analytics.record_changes([(before, None)])
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every matching feedback row as CSV or NDJSON (?output=ndjson; faculty/admin)"""
+        fmt = export_format(request)
+        if fmt is None:
+            return Response(
+                {'error': 'output must be csv or ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Anonymous submitters are blanked in SQL, so they never leave the database
+        def unless_anonymous(field):
+            return Case(When(is_anonymous=True, then=Value(None)), default=F(field))
+        
+        columns = [
+            'id', 'title', 'description', 'category', 'priority', 'status', 'is_anonymous',
+            ('submitted_by_email', unless_anonymous('submitted_by__email')),
+            ('submitted_by_department', unless_anonymous('submitted_by__department')),
+            ('assigned_to_email', F('assigned_to__email')),
+            'cluster_id',
+            'created_at', 'updated_at', 'resolved_at',
+        ]
+        return stream_export(self.filter_queryset(self.get_queryset()), columns, fmt, 'feedback')
+    
+    @action(detail=False, methods=['get'], url_path='analytics')
+    def analytics_summary(self, request):
+        """Volumes, resolution times, SLA compliance and backlog from the daily aggregates (admin only)"""
+        if request.user.role != 'admin':
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            days = max(1, min(int(request.query_params.get('days', 30)), 366))
+        except ValueError:
+            return Response(
+                {'error': 'days must be a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(analytics.summary(
+            days,
+            category=request.query_params.get('category'),
+            priority=request.query_params.get('priority'),
+        ))
+    
+    @action(detail=False, methods=['get'])
+    def routing(self, request):
+        """Open assigned feedback per staff member and classifier state (admin only)"""
+        if request.user.role != 'admin':
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        classifier = get_classifier()
+        return Response({
+            'loads': [
+                {'user_id': user_id, 'open_feedback': load}
+                for user_id, load in sorted(load_index.snapshot().items())
+            ],
+            'classifier': {'trained_on': classifier.size} if classifier else None,
+        })
     
     @action(detail=True, methods=['post'])
     def respond(self, request, pk=None):
@@ -99,23 +217,17 @@ class FeedbackViewSet(viewsets.ModelViewSet):
         # Update feedback status if provided
         new_status = request.data.get('status')
         if new_status:
-            feedback.status = new_status
-            feedback.save()
+            with transaction.atomic(), analytics.track(feedback):
+                feedback.status = new_status
+                feedback.save()
         
         # Notify submitter if not anonymous
         if feedback.submitted_by:
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f'user_{feedback.submitted_by.id}',
-                {
-                    'type': 'send_notification',
-                    'message': {
-                        'type': 'feedback_response',
-                        'action': 'created',
-                        'data': FeedbackResponseSerializer(response).data
-                    }
-                }
-            )
+            push_to_group(f'user_{feedback.submitted_by.id}', {
+                'type': 'feedback_response',
+                'action': 'created',
+                'data': FeedbackResponseSerializer(response).data
+            })
         
         return Response(
             FeedbackResponseSerializer(response).data,
@@ -139,23 +251,17 @@ class FeedbackViewSet(viewsets.ModelViewSet):
             User = get_user_model()
             try:
                 assigned_user = User.objects.get(id=assigned_to_id)
-                feedback.assigned_to = assigned_user
-                feedback.status = 'under_review'
-                feedback.save()
+                with transaction.atomic(), analytics.track(feedback):
+                    feedback.assigned_to = assigned_user
+                    feedback.status = 'under_review'
+                    feedback.save()
                 
                 # Notify assigned user
-                channel_layer = get_channel_layer()
-                async_to_sync(channel_layer.group_send)(
-                    f'user_{assigned_user.id}',
-                    {
-                        'type': 'send_notification',
-                        'message': {
-                            'type': 'feedback',
-                            'action': 'assigned',
-                            'data': FeedbackSerializer(feedback).data
-                        }
-                    }
-                )
+                push_to_group(f'user_{assigned_user.id}', {
+                    'type': 'feedback',
+                    'action': 'assigned',
+                    'data': FeedbackSerializer(feedback).data
+                })
                 
                 return Response(FeedbackSerializer(feedback).data)
             except User.DoesNotExist:
@@ -168,3 +274,113 @@ class FeedbackViewSet(viewsets.ModelViewSet):
             {'error': 'assigned_to field is required'},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+
+class FeedbackClusterViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for near-duplicate feedback clusters - faculty/admin answer a whole cluster at once"""
+    
+    serializer_class = FeedbackClusterSerializer
+    permission_classes = [IsFacultyOrAdmin]
+    
+    def get_queryset(self):
+        queryset = FeedbackCluster.objects.select_related('representative').annotate(
+            size=models.Count('members'),
+            open_count=models.Count('members', filter=models.Q(members__status__in=OPEN_STATUSES)),
+        )
+        
+        # Clusters with nothing left to answer are hidden unless asked for
+        if self.request.query_params.get('include_closed') != 'true':
+            queryset = queryset.filter(open_count__gt=0)
+        
+        # Filter by category
+        category = self.request.query_params.get('category', None)
+        if category:
+            queryset = queryset.filter(representative__category=category)
+        
+        return queryset.order_by('-open_count', '-updated_at')
+    
+    @action(detail=True, methods=['get'])
+    def members(self, request, pk=None):
+        """Feedback in the cluster"""
+        cluster = self.get_object()
+        queryset = Feedback.objects.filter(cluster=cluster).with_summary()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(FeedbackListSerializer(page, many=True).data)
+        return Response(FeedbackListSerializer(queryset, many=True).data)
+    
+    @action(detail=True, methods=['post'])
+    def respond(self, request, pk=None):
+        """
+        Add the same response to every open feedback in the cluster
+        (every member with include_closed=true) and optionally set their status
+        """
+        cluster = self.get_object()
+        message = request.data.get('message', '')
+        if not message:
+            return Response(
+                {'error': 'message field is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        new_status = request.data.get('status')
+        if new_status and new_status not in dict(Feedback.STATUS_CHOICES):
+            return Response(
+                {'error': f'Invalid status: {new_status}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        targets = Feedback.objects.filter(cluster=cluster)
+        if str(request.data.get('include_closed', '')).lower() != 'true':
+            targets = targets.filter(status__in=OPEN_STATUSES)
+        rows = list(targets.values_list('id', 'submitted_by_id', 'is_anonymous', *analytics.STATE_FIELDS))
+        ids = [row[0] for row in rows]
+        states = [analytics.FeedbackState(*row[3:]) for row in rows]
+        
+        with transaction.atomic():
+            FeedbackResponse.objects.bulk_create([
+                FeedbackResponse(feedback_id=feedback_id, responder=request.user, message=message)
+                for feedback_id in ids
+            ])
+            
+            # Bulk updates skip the save signals, so do their work here
+            if new_status:
+                now = timezone.now()
+                if new_status in OPEN_STATUSES:
+                    resolved_at = None
+                else:
+                    # Rows that were already done keep their original resolution time
+                    resolved_at = Coalesce('resolved_at', Value(now))
+                Feedback.objects.filter(pk__in=ids).update(status=new_status, resolved_at=resolved_at, updated_at=now)
+                if new_status not in OPEN_STATUSES:
+                    FeedbackBand.objects.filter(feedback_id__in=ids).delete()
+                queue_mirrors('feedback', ids)
+                analytics.record_changes([
+                    (state, state._replace(
+                        status=new_status,
+                        resolved_at=None if new_status in OPEN_STATUSES else state.resolved_at or now,
+                    ))
+                    for state in states
+                ])
+            
+            # Notify submitters of feedback that is not anonymous
+            submitters = {submitter for _, submitter, anonymous, *_ in rows if submitter and not anonymous}
+            if submitters:
+                enqueue_notification_to_users(
+                    submitters,
+                    title="💬 Response to your feedback",
+                    message=message,
+                    notification_type='feedback',
+                    link='/feedback'
+                )
+            cluster.save(update_fields=['updated_at'])
+        
+        if new_status:
+            for feedback_id, state in zip(ids, states):
+                load_index.track_feedback(feedback_id, state.assigned_to_id, new_status in OPEN_STATUSES)
+        
+        return Response({
+            'cluster': cluster.id,
+            'responded': len(ids),
+            'status': new_status,
+        }, status=status.HTTP_201_CREATED)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import LostFoundItem, Claim
+from .models import LostFoundItem, Claim, ItemMatch
 
 @admin.register(LostFoundItem)
 class LostFoundItemAdmin(admin.ModelAdmin):
@@ -13,3 +13,8 @@ class ClaimAdmin(admin.ModelAdmin):
     list_display = ('item', 'claimer', 'status', 'created_at')
     list_filter = ('status', 'created_at')
     search_fields = ('item__title', 'claimer__email', 'description')
+
+@admin.register(ItemMatch)
+class ItemMatchAdmin(admin.ModelAdmin):
+    list_display = ('item', 'candidate', 'score', 'created_at')
+    search_fields = ('item__title', 'candidate__title')
@@ -0,0 +1,118 @@
+"""
+Perceptual image hashing for lost & found photos.
+
+Each photo gets a 64-bit difference hash (dHash): the image is shrunk to a
+9x8 grayscale thumbnail and every bit records whether a pixel is brighter
+than its right-hand neighbour. Resized, recompressed or slightly re-lit copies
+of a photo end up a few bits apart.
+
+Hashes are stored as four 16-bit chunks, each with its own index (multi-index
+hashing). If two hashes differ in at most r bits, at least one chunk differs in
+at most r // 4 bits, so a search only has to look up the chunk values within
+that radius and verify the few rows it gets back, instead of scanning every
+hash.
+"""
+from itertools import combinations
+
+from PIL import Image
+
+from .models import ImageHash
+
+HASH_BITS = 64
+CHUNKS = 4
+CHUNK_BITS = HASH_BITS // CHUNKS
+DEFAULT_MAX_DISTANCE = 10
+MAX_DISTANCE = 15
+
+
+def dhash(source):
+    """64-bit difference hash of an image file path or file object"""
+    with Image.open(source) as image:
+        # Let JPEG decode at a reduced scale; we only need 9x8 pixels
+        image.draft('L', (64, 64))
+        pixels = list(image.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left, right = pixels[row * 9 + col], pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def split_chunks(value):
+    """Split a 64-bit hash into CHUNKS integers, most significant first"""
+    mask = (1 << CHUNK_BITS) - 1
+    return [(value >> (CHUNK_BITS * (CHUNKS - 1 - i))) & mask for i in range(CHUNKS)]
+
+
+def chunk_neighbours(chunk, radius):
+    """Every CHUNK_BITS-bit value within radius bits of chunk"""
+    values = {chunk}
+    for distance in range(1, radius + 1):
+        for bits in combinations(range(CHUNK_BITS), distance):
+            flipped = chunk
+            for bit in bits:
+                flipped ^= 1 << bit
+            values.add(flipped)
+    return values
+
+
+def hash_fields(value):
+    fields = {'hash': f'{value:016x}'}
+    for i, chunk in enumerate(split_chunks(value)):
+        fields[f'chunk{i}'] = chunk
+    return fields
+
+
+def store_hash(item, value):
+    """Create or replace the stored hash of an item's current image"""
+    return ImageHash.objects.update_or_create(
+        item=item, defaults={'image_name': item.image.name, **hash_fields(value)}
+    )[0]
+
+
+def index_image(item):
+    """Hash the item's image if it changed since it was last hashed"""
+    if not item.image:
+        ImageHash.objects.filter(item=item).delete()
+        return None
+
+    existing = ImageHash.objects.filter(item=item).first()
+    if existing and existing.image_name == item.image.name:
+        return existing
+
+    item.image.open('rb')
+    try:
+        value = dhash(item.image)
+    finally:
+        item.image.close()
+    return store_hash(item, value)
+
+
+def find_similar(value, max_distance=DEFAULT_MAX_DISTANCE, queryset=None):
+    """
+    Return [(item_id, distance)] for stored hashes within max_distance bits
+    Pass a queryset of ImageHash to restrict the candidates (e.g. by item type)
+    """
+    max_distance = max(0, min(max_distance, MAX_DISTANCE))
+    radius = max_distance // CHUNKS
+    if queryset is None:
+        queryset = ImageHash.objects.all()
+
+    candidates = set()
+    for i, chunk in enumerate(split_chunks(value)):
+        rows = queryset.filter(**{f'chunk{i}__in': chunk_neighbours(chunk, radius)})
+        candidates.update(rows.values_list('item_id', 'hash'))
+
+    results = []
+    for item_id, stored in candidates:
+        distance = hamming(value, int(stored, 16))
+        if distance <= max_distance:
+            results.append((item_id, distance))
+    results.sort(key=lambda result: (result[1], result[0]))
+    return results
@@ -0,0 +1,65 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from lost_found.image_hash import dhash, store_hash
+from lost_found.models import ImageHash, LostFoundItem
+
+
+def hash_file(job):
+    """Runs in a worker process: returns (item_id, hash or None, error)"""
+    item_id, path = job
+    try:
+        return item_id, dhash(path), ''
+    except (OSError, ValueError) as e:
+        return item_id, None, str(e)
+
+
+class Command(BaseCommand):
+    help = 'Compute perceptual hashes for lost & found photos that have none (or all with --force)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Images handed to each worker at a time')
+        parser.add_argument('--force', action='store_true', help='Rehash images that already have a hash')
+
+    def handle(self, *args, **options):
+        items = LostFoundItem.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['force']:
+            items = items.filter(image_hash__isnull=True)
+        items = {item.pk: item for item in items.only('id', 'image')}
+
+        jobs = []
+        for item in items.values():
+            try:
+                jobs.append((item.pk, item.image.path))
+            except NotImplementedError:
+                # Remote storage without local paths; hash in this process instead
+                jobs.append((item.pk, None))
+
+        local_jobs = [job for job in jobs if job[1] is not None]
+        hashed = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for item_id, value, error in pool.map(hash_file, local_jobs, chunksize=max(1, options['chunk_size'])):
+                if value is None:
+                    failed += 1
+                    self.stderr.write(f"❌ Item {item_id}: {error}")
+                    continue
+                store_hash(items[item_id], value)
+                hashed += 1
+
+        for item_id, path in jobs:
+            if path is not None:
+                continue
+            item = items[item_id]
+            try:
+                with item.image.open('rb') as image:
+                    store_hash(item, dhash(image))
+                hashed += 1
+            except (OSError, ValueError) as e:
+                failed += 1
+                self.stderr.write(f"❌ Item {item_id}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Hashed {hashed} images ({failed} failed); {ImageHash.objects.count()} hashes indexed"
+        ))
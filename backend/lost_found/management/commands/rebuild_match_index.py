@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from lost_found.matching import find_matches, index_item
+from lost_found.models import ItemToken, LostFoundItem
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the lost & found matching index and optionally rescore every active item'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rescore', action='store_true', help='Recompute stored matches after indexing')
+
+    def handle(self, *args, **options):
+        ItemToken.objects.all().delete()
+        active = LostFoundItem.objects.filter(status='active')
+
+        indexed = 0
+        for item in active.iterator(chunk_size=500):
+            index_item(item)
+            indexed += 1
+        self.stdout.write(f"Indexed {indexed} active items")
+
+        if options['rescore']:
+            matched = sum(1 for item in active.iterator(chunk_size=500) if find_matches(item))
+            self.stdout.write(f"{matched} items have at least one match")
@@ -0,0 +1,176 @@
+"""
+Automatic lost <-> found matching.
+
+Active items are tokenized into the ItemToken inverted index (title and
+description tokens plus 'loc:'-prefixed location tokens). When an item is
+reported, candidates of the opposite type are found through the postings of
+its own tokens only, so the work grows with the number of items sharing a
+word rather than with the number of active items. Candidates are then scored
+on TF-IDF cosine similarity, category, date proximity and location overlap.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import LostFoundItem, ItemToken, ItemMatch
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'i', 'in', 'is',
+    'it', 'its', 'lost', 'found', 'my', 'near', 'of', 'on', 'or', 'the', 'this', 'to', 'was',
+    'with', 'someone', 'item', 'please', 'left',
+}
+
+WEIGHTS = {
+    'text': 0.5,
+    'category': 0.2,
+    'date': 0.15,
+    'location': 0.15,
+}
+
+DATE_WINDOW_DAYS = 30
+CANDIDATE_POOL = 50
+MAX_MATCHES = 5
+MIN_SCORE = 0.3
+
+
+def _normalize(word):
+    # Cheap plural folding so 'keys' matches 'key'
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    return [
+        _normalize(word) for word in TOKEN_RE.findall((text or '').lower())
+        if len(word) > 1 and word not in STOPWORDS
+    ]
+
+
+def location_tokens(item):
+    return {f'loc:{token}' for token in tokenize(item.location)}
+
+
+def item_terms(item):
+    """Term frequencies used for the inverted index"""
+    terms = Counter(tokenize(f'{item.title} {item.description}'))
+    for token in location_tokens(item):
+        terms[token] += 1
+    return terms
+
+
+def _unit(terms):
+    norm = math.sqrt(sum(value * value for value in terms.values())) or 1.0
+    return {token: value / norm for token, value in terms.items()}
+
+
+def index_item(item):
+    """(Re)build the postings of an item; inactive items leave the index"""
+    ItemToken.objects.filter(item=item).delete()
+    if item.status != 'active':
+        return
+
+    ItemToken.objects.bulk_create([
+        ItemToken(item=item, token=token[:60], weight=weight, item_type=item.item_type)
+        for token, weight in _unit(item_terms(item)).items()
+    ])
+
+
+def _opposite(item_type):
+    return 'found' if item_type == 'lost' else 'lost'
+
+
+def _idf(tokens, item_type):
+    """Smoothed inverse document frequency over active items of item_type"""
+    total = LostFoundItem.objects.filter(item_type=item_type, status='active').count()
+    frequencies = dict(
+        ItemToken.objects.filter(token__in=tokens, item_type=item_type)
+        .values_list('token').annotate(df=Count('id')).order_by()
+    )
+    return {token: math.log((total + 1) / (frequencies.get(token, 0) + 1)) + 1 for token in tokens}
+
+
+def _date_score(item, candidate):
+    delta = abs((item.date_lost_found - candidate.date_lost_found).days)
+    lost, found = (item, candidate) if item.item_type == 'lost' else (candidate, item)
+    # Something cannot be found well before it was lost
+    if (lost.date_lost_found - found.date_lost_found).days > 1:
+        return 0.0
+    return max(0.0, 1 - delta / DATE_WINDOW_DAYS)
+
+
+def _location_score(item, candidate):
+    ours, theirs = location_tokens(item), location_tokens(candidate)
+    if not ours or not theirs:
+        return 0.0
+    return len(ours & theirs) / len(ours | theirs)
+
+
+def score_candidates(item):
+    """Return [(candidate, score, details)] for the best counterpart items"""
+    terms = item_terms(item)
+    if not terms:
+        return []
+
+    target_type = _opposite(item.item_type)
+    idf = _idf(list(terms), target_type)
+    query = _unit({token: tf * idf[token] for token, tf in terms.items()})
+
+    # Stage 1: accumulate scores from the postings of our own tokens only
+    rough = defaultdict(float)
+    postings = ItemToken.objects.filter(token__in=list(terms), item_type=target_type).exclude(item=item)
+    for candidate_id, token, weight in postings.values_list('item_id', 'token', 'weight'):
+        rough[candidate_id] += query[token] * weight * idf[token]
+    if not rough:
+        return []
+    pool = sorted(rough, key=rough.get, reverse=True)[:CANDIDATE_POOL]
+
+    # Stage 2: exact TF-IDF cosine for the short-listed candidates
+    candidate_terms = defaultdict(dict)
+    for candidate_id, token, weight in ItemToken.objects.filter(item_id__in=pool).values_list('item_id', 'token', 'weight'):
+        candidate_terms[candidate_id][token] = weight
+    extra_tokens = {token for terms_ in candidate_terms.values() for token in terms_} - set(idf)
+    if extra_tokens:
+        idf.update(_idf(list(extra_tokens), target_type))
+
+    results = []
+    candidates = LostFoundItem.objects.filter(pk__in=pool, status='active').select_related('reported_by')
+    for candidate in candidates:
+        vector = _unit({token: weight * idf[token] for token, weight in candidate_terms[candidate.pk].items()})
+        details = {
+            'text': sum(query[token] * vector.get(token, 0.0) for token in query),
+            'category': 1.0 if candidate.category == item.category else 0.0,
+            'date': _date_score(item, candidate),
+            'location': _location_score(item, candidate),
+        }
+        score = sum(WEIGHTS[key] * value for key, value in details.items())
+        if score >= MIN_SCORE:
+            results.append((candidate, score, {key: round(value, 3) for key, value in details.items()}))
+
+    results.sort(key=lambda result: result[1], reverse=True)
+    return results[:MAX_MATCHES]
+
+
+def find_matches(item):
+    """Score counterparts for an item and store the top matches in both directions"""
+    results = score_candidates(item)
+    rows = []
+    for candidate, score, details in results:
+        rows.append(ItemMatch(item=item, candidate=candidate, score=score, details=details))
+        rows.append(ItemMatch(item=candidate, candidate=item, score=score, details=details))
+
+    with transaction.atomic():
+        # Drop both directions: a counterpart that no longer matches must not
+        # keep pointing back at this item
+        ItemMatch.objects.filter(Q(item=item) | Q(candidate=item)).delete()
+        if rows:
+            ItemMatch.objects.bulk_create(
+                rows, update_conflicts=True,
+                unique_fields=['item', 'candidate'], update_fields=['score', 'details'],
+            )
+    return results
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lost_found', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=60)),
+                ('weight', models.FloatField()),
+                ('item_type', models.CharField(choices=[('lost', 'Lost'), ('found', 'Found')], max_length=10)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='lost_found.lostfounditem')),
+            ],
+            options={
+                'db_table': 'lost_found_tokens',
+                'indexes': [models.Index(fields=['token', 'item_type'], name='lf_token_type_idx')],
+                'unique_together': {('item', 'token')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ItemMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('details', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matched_by', to='lost_found.lostfounditem')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='lost_found.lostfounditem')),
+            ],
+            options={
+                'db_table': 'lost_found_matches',
+                'ordering': ['-score'],
+                'unique_together': {('item', 'candidate')},
+            },
+        ),
+    ]
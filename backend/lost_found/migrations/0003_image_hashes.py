@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lost_found', '0002_matching_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageHash',
+            fields=[
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='image_hash', serialize=False, to='lost_found.lostfounditem')),
+                ('image_name', models.CharField(max_length=255)),
+                ('hash', models.CharField(max_length=16)),
+                ('chunk0', models.PositiveIntegerField(db_index=True)),
+                ('chunk1', models.PositiveIntegerField(db_index=True)),
+                ('chunk2', models.PositiveIntegerField(db_index=True)),
+                ('chunk3', models.PositiveIntegerField(db_index=True)),
+            ],
+            options={
+                'db_table': 'lost_found_image_hashes',
+            },
+        ),
+    ]
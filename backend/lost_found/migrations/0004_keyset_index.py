@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lost_found', '0003_image_hashes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lostfounditem',
+            index=models.Index(fields=['created_at', 'id'], name='lf_item_created_idx'),
+        ),
+    ]
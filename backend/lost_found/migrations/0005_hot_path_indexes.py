@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lost_found', '0004_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='claim',
+            index=models.Index(fields=['created_at'], name='claim_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='claim',
+            index=models.Index(fields=['claimer', 'created_at'], name='claim_claimer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='claim',
+            index=models.Index(fields=['item', 'status'], name='claim_item_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lostfounditem',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='lf_item_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lostfounditem',
+            index=models.Index(fields=['item_type', 'status', 'created_at', 'id'], name='lf_item_type_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lostfounditem',
+            index=models.Index(fields=['item_type', 'status', 'category', 'created_at'], name='lf_item_filter_idx'),
+        ),
+    ]
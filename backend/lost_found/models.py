@@ -48,6 +48,12 @@ class LostFoundItem(models.Model):
     class Meta:
         db_table = 'lost_found_items'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='lf_item_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='lf_item_status_idx'),
+            models.Index(fields=['item_type', 'status', 'created_at', 'id'], name='lf_item_type_status_idx'),
+            models.Index(fields=['item_type', 'status', 'category', 'created_at'], name='lf_item_filter_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_item_type_display()}: {self.title}"
@@ -74,6 +80,69 @@ class Claim(models.Model):
     class Meta:
         db_table = 'claims'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='claim_created_idx'),
+            models.Index(fields=['claimer', 'created_at'], name='claim_claimer_idx'),
+            models.Index(fields=['item', 'status'], name='claim_item_status_idx'),
+        ]
     
     def __str__(self):
         return f"Claim for {self.item.title} by {self.claimer.email}"
+
+
+class ItemToken(models.Model):
+    """Inverted index posting: a token of an active lost/found item"""
+    
+    item = models.ForeignKey(LostFoundItem, on_delete=models.CASCADE, related_name='tokens')
+    token = models.CharField(max_length=60)
+    # L2-normalised term frequency within the item
+    weight = models.FloatField()
+    # Copied from the item so candidate lookups never join lost_found_items
+    item_type = models.CharField(max_length=10, choices=LostFoundItem.ITEM_TYPE_CHOICES)
+    
+    class Meta:
+        db_table = 'lost_found_tokens'
+        unique_together = ('item', 'token')
+        indexes = [
+            models.Index(fields=['token', 'item_type'], name='lf_token_type_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.token} -> {self.item_id}"
+
+
+class ItemMatch(models.Model):
+    """Scored candidate pairing between a lost item and a found item"""
+    
+    item = models.ForeignKey(LostFoundItem, on_delete=models.CASCADE, related_name='matches')
+    candidate = models.ForeignKey(LostFoundItem, on_delete=models.CASCADE, related_name='matched_by')
+    score = models.FloatField()
+    details = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'lost_found_matches'
+        unique_together = ('item', 'candidate')
+        ordering = ['-score']
+    
+    def __str__(self):
+        return f"{self.item.title} ~ {self.candidate.title} ({self.score:.2f})"
+
+
+class ImageHash(models.Model):
+    """64-bit dHash of an item photo, split into four 16-bit chunks for multi-index lookups"""
+    
+    item = models.OneToOneField(LostFoundItem, on_delete=models.CASCADE, primary_key=True, related_name='image_hash')
+    # Storage name of the image the hash was computed from
+    image_name = models.CharField(max_length=255)
+    hash = models.CharField(max_length=16)
+    chunk0 = models.PositiveIntegerField(db_index=True)
+    chunk1 = models.PositiveIntegerField(db_index=True)
+    chunk2 = models.PositiveIntegerField(db_index=True)
+    chunk3 = models.PositiveIntegerField(db_index=True)
+    
+    class Meta:
+        db_table = 'lost_found_image_hashes'
+    
+    def __str__(self):
+        return f"{self.hash} -> {self.item_id}"
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import LostFoundItem, Claim
+from .models import LostFoundItem, Claim, ItemMatch
 from accounts.serializers import UserSerializer
 
 
@@ -25,3 +25,13 @@ class ClaimSerializer(serializers.ModelSerializer):
         model = Claim
         fields = '__all__'
         read_only_fields = ('claimer', 'status', 'created_at', 'updated_at')
+
+
+class ItemMatchSerializer(serializers.ModelSerializer):
+    """Serializer for suggested lost/found matches"""
+    
+    candidate_details = LostFoundItemSerializer(source='candidate', read_only=True)
+    
+    class Meta:
+        model = ItemMatch
+        fields = ('id', 'candidate', 'candidate_details', 'score', 'details', 'created_at')
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.cache import invalidate
+from .models import LostFoundItem
+from .matching import index_item
+from .image_hash import index_image
+
+
+@receiver(post_save, sender=LostFoundItem)
+def update_match_index(sender, instance, **kwargs):
+    """Keep the matching inverted index in step with the item's text and status"""
+    index_item(instance)
+
+
+@receiver(post_save, sender=LostFoundItem)
+def update_image_hash(sender, instance, **kwargs):
+    """Hash newly uploaded photos for visual similarity search"""
+    try:
+        index_image(instance)
+    except (OSError, ValueError) as e:
+        # Unreadable or non-image upload; the item itself is still saved
+        print(f"❌ Image hash error for item {instance.pk}: {e}")
+
+
+@receiver([post_save, post_delete], sender=LostFoundItem)
+def invalidate_item_lists(sender, **kwargs):
+    """Cached item lists change with every report and status update"""
+    invalidate('lost_found')
@@ -0,0 +1,163 @@
+import io
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from .matching import MIN_SCORE, find_matches, score_candidates
+from .models import ImageHash, ItemMatch, LostFoundItem
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def gradient_png(name, reverse=False):
+    """Horizontal gray gradient; reverse flips it so the hashes are far apart"""
+    image = Image.new('L', (90, 80))
+    for x in range(90):
+        shade = 255 - x * 2 if reverse else x * 2
+        for y in range(80):
+            image.putpixel((x, y), shade)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class SimilarItemsTests(APITestCase):
+    """Visual similarity lookups from a lost item and from a found item"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='student@example.com', password='pass', first_name='Sam')
+        self.client.force_authenticate(self.user)
+        self.lost = self.create_item('lost', gradient_png('lost.png'))
+        self.found = self.create_item('found', gradient_png('found.png'))
+        self.other = self.create_item('found', gradient_png('other.png', reverse=True))
+
+    def create_item(self, item_type, image):
+        return LostFoundItem.objects.create(
+            item_type=item_type, title='Black backpack', description='Backpack with a laptop',
+            category='accessories', location='Library', date_lost_found=date.today(),
+            image=image, reported_by=self.user,
+        )
+
+    def similar(self, item, **params):
+        response = self.client.get(f'/api/lost-found/items/{item.pk}/similar/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [result['item']['id'] for result in response.data]
+
+    def test_images_are_hashed(self):
+        self.assertEqual(ImageHash.objects.count(), 3)
+
+    def test_lost_item_matches_found_items_by_default(self):
+        self.assertEqual(self.similar(self.lost), [self.found.pk])
+
+    def test_found_item_matches_lost_items_by_default(self):
+        self.assertEqual(self.similar(self.found), [self.lost.pk])
+
+    def test_lost_to_found_with_match_type(self):
+        self.assertEqual(self.similar(self.lost, match_type='found'), [self.found.pk])
+
+    def test_found_to_lost_with_match_type(self):
+        self.assertEqual(self.similar(self.found, match_type='lost'), [self.lost.pk])
+
+
+class MatchingTests(APITestCase):
+    """Text, category, date and location scoring between lost and found reports"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='student@example.com', first_name='Sam')
+        self.client.force_authenticate(self.user)
+        self.lost = self.create_item('lost', 'Black backpack', 'Black backpack with a laptop and blue notebooks')
+        self.found = self.create_item('found', 'Black backpack', 'Backpack with a laptop inside')
+
+    def create_item(self, item_type, title, description, category='accessories', location='Main library',
+                    days_ago=0):
+        return LostFoundItem.objects.create(
+            item_type=item_type, title=title, description=description, category=category,
+            location=location, date_lost_found=date.today() - timedelta(days=days_ago), reported_by=self.user,
+        )
+
+    def matched_ids(self, item, refresh=False):
+        response = self.client.get(f'/api/lost-found/items/{item.pk}/matches/', {'refresh': 'true'} if refresh else {})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [match['candidate'] for match in response.data]
+
+    def test_scores_text_category_date_and_location(self):
+        [(candidate, score, details)] = score_candidates(self.lost)
+
+        self.assertEqual(candidate, self.found)
+        self.assertGreater(details['text'], 0.5)
+        self.assertEqual(details['category'], 1.0)
+        self.assertEqual(details['date'], 1.0)
+        self.assertEqual(details['location'], 1.0)
+        self.assertGreater(score, 0.8)
+
+    def test_closer_counterpart_ranks_first(self):
+        far = self.create_item('found', 'Black backpack', 'Backpack with a laptop inside', location='Gym', days_ago=20)
+
+        ranked = [candidate for candidate, score, details in score_candidates(self.lost)]
+
+        self.assertEqual(ranked, [self.found, far])
+
+    def test_found_before_lost_scores_no_date_credit(self):
+        earlier = self.create_item('found', 'Black backpack', 'Backpack with a laptop inside', days_ago=10)
+
+        details = {candidate: details for candidate, score, details in score_candidates(self.lost)}
+
+        self.assertEqual(details[earlier]['date'], 0.0)
+
+    def test_weak_counterparts_fall_below_threshold(self):
+        weak = self.create_item(
+            'lost', 'Laptop charger', 'White charger cable', category='electronics', location='Cafeteria', days_ago=25,
+        )
+
+        results = score_candidates(weak)
+
+        self.assertNotIn(self.found, [candidate for candidate, score, details in results])
+        self.assertTrue(all(score >= MIN_SCORE for candidate, score, details in results))
+
+    def test_same_type_items_are_never_matched(self):
+        self.create_item('lost', 'Black backpack', 'Black backpack with a laptop')
+
+        self.assertEqual([candidate for candidate, score, details in score_candidates(self.lost)], [self.found])
+
+    def test_matches_are_stored_in_both_directions(self):
+        find_matches(self.lost)
+
+        self.assertEqual(self.matched_ids(self.lost), [self.found.pk])
+        self.assertEqual(self.matched_ids(self.found), [self.lost.pk])
+
+    def test_rematch_after_edit_drops_stale_matches_on_both_sides(self):
+        find_matches(self.lost)
+
+        # Edit as an admin: IsOwnerOrAdmin checks created_by, which items do not have
+        self.client.force_authenticate(User.objects.create_user(email='admin@example.com', role='admin'))
+        response = self.client.patch(f'/api/lost-found/items/{self.lost.pk}/', {
+            'title': 'Silver umbrella', 'description': 'Folding umbrella', 'category': 'other', 'location': 'Gym',
+        })
+        self.assertEqual(response.status_code, 200, response.content)
+
+        self.assertEqual(self.matched_ids(self.lost, refresh=True), [])
+        self.assertEqual(self.matched_ids(self.found), [])
+        self.assertFalse(ItemMatch.objects.exists())
+
+    def test_rematch_keeps_counterparts_that_still_match(self):
+        find_matches(self.lost)
+        other = self.create_item('lost', 'Black backpack', 'Black backpack with a laptop charger')
+        find_matches(other)
+
+        find_matches(self.lost)
+
+        self.assertCountEqual(self.matched_ids(self.found), [self.lost.pk, other.pk])
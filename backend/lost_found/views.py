@@ -3,23 +3,26 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import models
-from .models import LostFoundItem, Claim
-from .serializers import LostFoundItemSerializer, ClaimSerializer
-from asgiref.sync import async_to_sync
-from accounts.permissions import IsOwnerOrAdmin
-from notifications.utils import send_notification_to_all_users
+from .models import LostFoundItem, Claim, ImageHash
+from .serializers import LostFoundItemSerializer, ClaimSerializer, ItemMatchSerializer
+from .matching import find_matches
+from .image_hash import DEFAULT_MAX_DISTANCE, dhash, find_similar
+from search.backends import search_queryset
+from core.cache import CachedListMixin
+from core.exports import export_format, stream_export
+from core.pagination import CreatedAtKeysetPagination
+from accounts.permissions import IsFacultyOrAdmin, IsOwnerOrAdmin
+from notifications.utils import push_to_group
+from notifications.queue import enqueue_notification_to_all_users, enqueue_notification_to_user
 
-# Channels temporarily disabled - function stub
-def get_channel_layer():
-    return None
-
-
-class LostFoundItemViewSet(viewsets.ModelViewSet):
+class LostFoundItemViewSet(CachedListMixin, viewsets.ModelViewSet):
     """ViewSet for lost/found items - Admins can edit and delete all items"""
     
     queryset = LostFoundItem.objects.all()
     serializer_class = LostFoundItemSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
+    cache_namespace = 'lost_found'
     
     def get_permissions(self):
         """
@@ -28,6 +31,8 @@ class LostFoundItemViewSet(viewsets.ModelViewSet):
         """
         if self.action in ['update', 'partial_update', 'destroy']:
             return [IsOwnerOrAdmin()]
+        if self.action == 'export':
+            return [IsFacultyOrAdmin()]
         return [IsAuthenticated()]
     
     def get_queryset(self):
@@ -48,32 +53,58 @@ class LostFoundItemViewSet(viewsets.ModelViewSet):
         if category:
             queryset = queryset.filter(category=category)
         
-        # Search
+        # Full-text search, best matches first
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                models.Q(title__icontains=search) |
-                models.Q(description__icontains=search) |
-                models.Q(location__icontains=search)
-            )
+            queryset = search_queryset('lost_found', queryset, search)
         
         return queryset
     
     def perform_create(self, serializer):
-        """Create lost/found item - sends notification to all users"""
+        """Create lost/found item - queues a notification to all users"""
         item = serializer.save(reported_by=self.request.user)
         
         # Send notification to all users about new lost/found item
         created_by = f"{self.request.user.first_name} {self.request.user.last_name}" if self.request.user.first_name else self.request.user.email
         item_type_emoji = "🔍" if item.item_type == 'lost' else "✅"
         
-        send_notification_to_all_users(
+        enqueue_notification_to_all_users(
             title=f"{item_type_emoji} {item.item_type.title()}: {item.title}",
             message=f"{created_by} reported a {item.item_type} item: {item.title} at {item.location}",
             notification_type='lost_found',
             link=f'/lost-found/{item.id}',
             exclude_user=self.request.user
         )
+        
+        # Suggest likely counterparts to the reporter
+        matches = find_matches(item)
+        if matches:
+            best, score, details = matches[0]
+            enqueue_notification_to_user(
+                self.request.user,
+                title=f"🔗 Possible match for {item.title}",
+                message=f"We found {len(matches)} possible match(es) for your {item.item_type} item, best: '{best.title}' at {best.location}",
+                notification_type='lost_found',
+                link=f'/lost-found/{item.id}'
+            )
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every matching item as CSV or NDJSON (?output=ndjson, same filters as the list; faculty/admin)"""
+        fmt = export_format(request)
+        if fmt is None:
+            return Response(
+                {'error': 'output must be csv or ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        columns = [
+            'id', 'item_type', 'title', 'description', 'category', 'location', 'date_lost_found', 'status',
+            ('reported_by_email', models.F('reported_by__email')),
+            ('claimed_by_email', models.F('claimed_by__email')),
+            'image', 'created_at', 'updated_at',
+        ]
+        return stream_export(self.filter_queryset(self.get_queryset()), columns, fmt, 'lost-found')
     
     @action(detail=True, methods=['post'])
     def claim(self, request, pk=None):
@@ -93,21 +124,81 @@ class LostFoundItemViewSet(viewsets.ModelViewSet):
         )
         
         # Notify item reporter
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f'user_{item.reported_by.id}',
-            {
-                'type': 'send_notification',
-                'message': {
-                    'type': 'claim',
-                    'action': 'created',
-                    'data': ClaimSerializer(claim).data
-                }
-            }
-        )
+        push_to_group(f'user_{item.reported_by.id}', {
+            'type': 'claim',
+            'action': 'created',
+            'data': ClaimSerializer(claim).data
+        })
         
         return Response(ClaimSerializer(claim).data, status=status.HTTP_201_CREATED)
     
+    @action(detail=True, methods=['get'])
+    def matches(self, request, pk=None):
+        """Get suggested counterpart items (pass refresh=true to rescore)"""
+        item = self.get_object()
+        
+        if request.query_params.get('refresh') in ('1', 'true'):
+            find_matches(item)
+        
+        matches = item.matches.filter(candidate__status='active').select_related(
+            'candidate__reported_by', 'candidate__claimed_by'
+        )
+        serializer = ItemMatchSerializer(matches, many=True)
+        return Response(serializer.data)
+    
+    def similar_items_response(self, value, item_type=None, exclude=None):
+        """Active items whose photo hash is within ?distance= bits of value, closest first"""
+        try:
+            max_distance = int(self.request.query_params.get('distance', DEFAULT_MAX_DISTANCE))
+        except ValueError:
+            return Response({'error': 'distance must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        hashes = ImageHash.objects.filter(item__status='active')
+        if item_type:
+            hashes = hashes.filter(item__item_type=item_type)
+        if exclude is not None:
+            hashes = hashes.exclude(item=exclude)
+        
+        results = find_similar(value, max_distance, hashes)[:20]
+        items = LostFoundItem.objects.select_related('reported_by', 'claimed_by').in_bulk(
+            [item_id for item_id, distance in results]
+        )
+        context = self.get_serializer_context()
+        return Response([
+            {'distance': distance, 'item': LostFoundItemSerializer(items[item_id], context=context).data}
+            for item_id, distance in results if item_id in items
+        ])
+    
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """Get items with visually similar photos (found items for a lost item and vice versa)"""
+        item = self.get_object()
+        
+        image_hash = ImageHash.objects.filter(item=item).first()
+        if image_hash is None:
+            return Response(
+                {'error': 'This item has no photo to compare'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Not ?type=, which get_queryset() applies to the source item itself
+        item_type = request.query_params.get('match_type', 'found' if item.item_type == 'lost' else 'lost')
+        return self.similar_items_response(int(image_hash.hash, 16), item_type=item_type, exclude=item)
+    
+    @action(detail=False, methods=['post'])
+    def search_by_image(self, request):
+        """Find items that look like an uploaded photo (defaults to found items)"""
+        image = request.FILES.get('image')
+        if image is None:
+            return Response({'error': 'Upload a photo as "image"'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            value = dhash(image)
+        except (OSError, ValueError):
+            return Response({'error': 'Could not read the uploaded image'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return self.similar_items_response(value, item_type=request.query_params.get('type', 'found'))
+    
     @action(detail=False, methods=['get'])
     def my_items(self, request):
         """Get items reported by current user"""
@@ -130,9 +221,10 @@ class ClaimViewSet(viewsets.ModelViewSet):
             return super().get_queryset()
         
         # Show claims made by user or claims for user's items
+        # (item ids come from a subquery so both sides of the OR can use an index)
         return self.queryset.filter(
             models.Q(claimer=user) | 
-            models.Q(item__reported_by=user)
+            models.Q(item__in=LostFoundItem.objects.filter(reported_by=user).values('pk'))
         )
     
     @action(detail=True, methods=['post'])
@@ -155,18 +247,11 @@ class ClaimViewSet(viewsets.ModelViewSet):
         claim.item.save()
         
         # Notify claimer
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f'user_{claim.claimer.id}',
-            {
-                'type': 'send_notification',
-                'message': {
-                    'type': 'claim',
-                    'action': 'approved',
-                    'data': ClaimSerializer(claim).data
-                }
-            }
-        )
+        push_to_group(f'user_{claim.claimer.id}', {
+            'type': 'claim',
+            'action': 'approved',
+            'data': ClaimSerializer(claim).data
+        })
         
         return Response(ClaimSerializer(claim).data)
     
@@ -185,17 +270,10 @@ class ClaimViewSet(viewsets.ModelViewSet):
         claim.save()
         
         # Notify claimer
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f'user_{claim.claimer.id}',
-            {
-                'type': 'send_notification',
-                'message': {
-                    'type': 'claim',
-                    'action': 'rejected',
-                    'data': ClaimSerializer(claim).data
-                }
-            }
-        )
+        push_to_group(f'user_{claim.claimer.id}', {
+            'type': 'claim',
+            'action': 'rejected',
+            'data': ClaimSerializer(claim).data
+        })
         
         return Response(ClaimSerializer(claim).data)
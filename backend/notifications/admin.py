@@ -1,8 +1,25 @@
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, BroadcastNotification, NotificationJob, NotificationCounter
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('user', 'notification_type', 'title', 'is_read', 'created_at')
     list_filter = ('notification_type', 'is_read', 'created_at')
     search_fields = ('user__email', 'title', 'message')
+
+@admin.register(BroadcastNotification)
+class BroadcastNotificationAdmin(admin.ModelAdmin):
+    list_display = ('title', 'notification_type', 'audience', 'audience_value', 'created_by', 'created_at')
+    list_filter = ('notification_type', 'audience', 'created_at')
+    search_fields = ('title', 'message', 'audience_value')
+
+@admin.register(NotificationJob)
+class NotificationJobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'status', 'attempts', 'run_after', 'created_at')
+    list_filter = ('status', 'task')
+    readonly_fields = ('last_error', 'locked_by', 'locked_at', 'created_at', 'updated_at')
+
+@admin.register(NotificationCounter)
+class NotificationCounterAdmin(admin.ModelAdmin):
+    list_display = ('user', 'unread')
+    search_fields = ('user__email',)
@@ -1,6 +1,14 @@
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.contrib.auth import get_user_model
 import json
+from urllib.parse import parse_qs
+
+from .counters import get_unread_count
+from .delivery import FrameBatcher, record, save_stats, socket_setting
+from .groups import groups_for_user
+
+User = get_user_model()
 
 
 class NotificationConsumer(AsyncJsonWebsocketConsumer):
@@ -8,50 +16,52 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
     
     async def connect(self):
         self.user = self.scope['user']
+        self.joined_groups = set()
+        self.batcher = None
         
         if self.user.is_anonymous:
             await self.close()
             return
         
-        # Join user-specific group
-        self.user_group_name = f'user_{self.user.id}'
-        await self.channel_layer.group_add(
-            self.user_group_name,
-            self.channel_name
-        )
+        # Join the user, campus, role, department, club and event groups
+        await self.join(await database_sync_to_async(groups_for_user)(self.user))
         
-        # Join campus-wide notifications group
-        await self.channel_layer.group_add(
-            'campus_notifications',
-            self.channel_name
-        )
+        await self.accept()
         
-        # Join admin notifications if admin/faculty
-        if self.user.role in ['admin', 'faculty']:
-            await self.channel_layer.group_add(
-                'admin_notifications',
-                self.channel_name
-            )
+        # ?batch=1 coalesces bursts into batch frames (?window=<ms> overrides the window)
+        params = parse_qs(self.scope.get('query_string', b'').decode())
+        if params.get('batch', ['0'])[0] in ('1', 'true'):
+            self.batcher = FrameBatcher(self.send_json, window=self.get_window(params))
         
-        await self.accept()
+        # Start the badge from the current count; later changes are pushed
+        await self.send_unread_count()
     
     async def disconnect(self, close_code):
-        # Leave groups
-        await self.channel_layer.group_discard(
-            self.user_group_name,
-            self.channel_name
-        )
-        
-        await self.channel_layer.group_discard(
-            'campus_notifications',
-            self.channel_name
-        )
+        if self.batcher is not None:
+            self.batcher.close()
+        await save_stats(force=True)
         
-        if self.user.role in ['admin', 'faculty']:
-            await self.channel_layer.group_discard(
-                'admin_notifications',
-                self.channel_name
-            )
+        # Leave groups
+        await self.leave(list(self.joined_groups))
+    
+    def get_window(self, params):
+        try:
+            window = int(params['window'][0]) / 1000
+        except (KeyError, ValueError):
+            return None
+        return min(max(window, 0), socket_setting('MAX_WINDOW'))
+    
+    async def join(self, groups):
+        for group in groups:
+            if group not in self.joined_groups:
+                await self.channel_layer.group_add(group, self.channel_name)
+                self.joined_groups.add(group)
+    
+    async def leave(self, groups):
+        for group in groups:
+            if group in self.joined_groups:
+                await self.channel_layer.group_discard(group, self.channel_name)
+                self.joined_groups.discard(group)
     
     async def receive_json(self, content):
         """Receive message from WebSocket"""
@@ -59,7 +69,35 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
         
         if message_type == 'ping':
             await self.send_json({'type': 'pong'})
+        elif message_type == 'get_unread_count':
+            await self.send_unread_count()
+    
+    async def send_unread_count(self):
+        count = await database_sync_to_async(get_unread_count)(self.user)
+        await self.send_json({'type': 'unread_count', 'count': count})
     
     async def send_notification(self, event):
         """Send notification to WebSocket"""
+        record('received')
+        if self.batcher is not None:
+            self.batcher.add(event['message'])
+            return
+        
+        record('delivered')
+        record('frames')
         await self.send_json(event['message'])
+        await save_stats()
+    
+    async def join_groups(self, event):
+        """Server-side membership change, e.g. the user joined a club"""
+        await self.join(event['groups'])
+    
+    async def leave_groups(self, event):
+        await self.leave(event['groups'])
+    
+    async def refresh_groups(self, event):
+        """Role or department changed; recompute every group"""
+        self.user = await database_sync_to_async(User.objects.get)(pk=self.user.pk)
+        groups = set(await database_sync_to_async(groups_for_user)(self.user))
+        await self.leave(list(self.joined_groups - groups))
+        await self.join(groups)
@@ -0,0 +1,102 @@
+"""
+Denormalized unread notification counts.
+
+NotificationCounter holds each user's number of unread personal
+notifications. It is adjusted in the same transaction as the change that
+caused it, so reading it is a primary-key lookup instead of a COUNT(*).
+Broadcast unread counts are cached per user; creating a broadcast bumps the
+'broadcasts' cache version (core.cache), which retires every user's entry.
+They are counted on every read when the cache is per process (LocMemCache),
+since broadcasts created by the notification worker could not retire them.
+``python manage.py reconcile_unread_counters`` repairs any drift in bulk.
+"""
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Greatest
+
+from core.cache import get_version, invalidate, is_shared
+from .models import Notification, NotificationCounter, BroadcastNotification
+
+BROADCAST_UNREAD_KEY = 'notif:broadcast_unread:{user_id}'
+BROADCAST_UNREAD_TIMEOUT = 3600
+
+
+def count_unread(user_id):
+    return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def adjust_unread(user_id, delta):
+    """Add delta to a user's unread counter; call inside the transaction that changed the rows"""
+    if not delta:
+        return
+    updated = NotificationCounter.objects.filter(user_id=user_id).update(
+        unread=Greatest(models.F('unread') + delta, 0)
+    )
+    if not updated:
+        # First change for this user: the recount already includes it
+        NotificationCounter.objects.get_or_create(user_id=user_id, defaults={'unread': count_unread(user_id)})
+
+
+def get_personal_unread_count(user):
+    unread = NotificationCounter.objects.filter(user_id=user.pk).values_list('unread', flat=True).first()
+    if unread is None:
+        unread = NotificationCounter.objects.get_or_create(
+            user_id=user.pk, defaults={'unread': count_unread(user.pk)}
+        )[0].unread
+    return unread
+
+
+def get_broadcast_unread_count(user):
+    if not is_shared():
+        return BroadcastNotification.objects.unread_for_user(user).count()
+
+    key = BROADCAST_UNREAD_KEY.format(user_id=user.pk)
+    version = get_version('broadcasts')
+    cached = cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    count = BroadcastNotification.objects.unread_for_user(user).count()
+    cache.set(key, (version, count), BROADCAST_UNREAD_TIMEOUT)
+    return count
+
+
+def get_unread_count(user):
+    """Unread personal plus broadcast notifications"""
+    return get_personal_unread_count(user) + get_broadcast_unread_count(user)
+
+
+def broadcasts_changed():
+    """Retire every user's cached broadcast count (new or deleted broadcast)"""
+    invalidate('broadcasts')
+
+
+def broadcast_reads_changed(user_id):
+    """Drop one user's cached broadcast count after they read broadcasts"""
+    transaction.on_commit(lambda: cache.delete(BROADCAST_UNREAD_KEY.format(user_id=user_id)))
+
+
+def reconcile_unread_counters():
+    """Recompute every counter from the notification rows; returns the number of counters fixed"""
+    actual = Notification.objects.filter(
+        user=models.OuterRef('user'), is_read=False
+    ).order_by().values('user').annotate(count=models.Count('pk')).values('count')
+    actual_count = Coalesce(models.Subquery(actual, output_field=models.IntegerField()), 0)
+
+    with transaction.atomic():
+        # Users with unread notifications but no counter row yet
+        missing = (
+            Notification.objects.filter(is_read=False)
+            .exclude(user__notification_counter__isnull=False)
+            .values('user').annotate(count=models.Count('pk')).order_by()
+        )
+        created = NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=row['user'], unread=row['count']) for row in missing],
+            ignore_conflicts=True,
+        )
+        fixed = NotificationCounter.objects.annotate(actual=actual_count).exclude(
+            unread=models.F('actual')
+        ).update(unread=actual_count)
+
+    broadcasts_changed()
+    return len(created) + fixed
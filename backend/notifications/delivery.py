@@ -0,0 +1,148 @@
+"""
+Batched delivery of notification frames to a socket.
+
+A socket that connects with ``?batch=1`` gets a FrameBatcher: messages
+arriving within BATCH_WINDOW seconds are sent as one
+{"type": "batch", "messages": [...]} frame. A newer message about the same
+object replaces the pending one (unread_delta values are summed so badges
+stay right): stored notifications match on source and id, other pushes on
+type and link. Only one frame is in flight per socket; while a slow
+client drains it, messages queue up to MAX_PENDING and the oldest are dropped
+beyond that, reported to the client as "dropped" so it can refetch.
+
+Delivery counters are kept per process and added to the cache every few
+seconds, so socket_stats() covers every worker sharing the cache.
+"""
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from itertools import count
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+SOCKET_DEFAULTS = {
+    'BATCH_WINDOW': 0.25,
+    'MAX_WINDOW': 5.0,
+    'MAX_BATCH': 50,
+    'MAX_PENDING': 200,
+}
+
+STATS_KEY = 'notif:socket:stats:{kind}'
+STAT_KINDS = ('received', 'delivered', 'coalesced', 'dropped', 'frames')
+STATS_FLUSH_INTERVAL = 5.0
+
+_stats = Counter()
+_stats_flushed_at = time.monotonic()
+
+
+def socket_setting(name):
+    """Read a NOTIFICATION_SOCKET setting, falling back to SOCKET_DEFAULTS"""
+    return getattr(settings, 'NOTIFICATION_SOCKET', {}).get(name, SOCKET_DEFAULTS[name])
+
+
+def record(kind, amount=1):
+    _stats[kind] += amount
+
+
+def stats_due():
+    return bool(_stats) and time.monotonic() - _stats_flushed_at >= STATS_FLUSH_INTERVAL
+
+
+def flush_stats():
+    """Add this process's counters to the shared totals"""
+    global _stats_flushed_at
+    _stats_flushed_at = time.monotonic()
+    pending = dict(_stats)
+    _stats.clear()
+    for kind, amount in pending.items():
+        key = STATS_KEY.format(kind=kind)
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            # Missing key; add() does nothing if another process created it meanwhile
+            if not cache.add(key, amount, timeout=None):
+                cache.incr(key, amount)
+
+
+async def save_stats(force=False):
+    if force or stats_due():
+        await sync_to_async(flush_stats)()
+
+
+def socket_stats():
+    """Messages handed to sockets versus frames actually written"""
+    stats = {kind: cache.get(STATS_KEY.format(kind=kind), 0) for kind in STAT_KINDS}
+    stats['messages_per_frame'] = round(stats['delivered'] / stats['frames'], 2) if stats['frames'] else None
+    return stats
+
+
+class FrameBatcher:
+    """Coalesces the notification messages of one socket into batch frames"""
+
+    def __init__(self, send, window=None, max_batch=None, max_pending=None):
+        self.send = send
+        self.window = socket_setting('BATCH_WINDOW') if window is None else window
+        self.max_batch = max_batch or socket_setting('MAX_BATCH')
+        self.max_pending = max_pending or socket_setting('MAX_PENDING')
+        self.pending = OrderedDict()
+        self.dropped = 0
+        self.task = None
+        self.unique = count()
+
+    def key(self, message):
+        if message.get('type') == 'unread_count':
+            # Only the latest count matters
+            return ('unread_count',)
+        if message.get('id') is not None and message.get('source'):
+            # A stored notification; two notifications sharing a link are still two notifications
+            return (message.get('type'), message['source'], message['id'])
+        if message.get('link'):
+            return (message.get('type'), message['link'])
+        return ('unique', next(self.unique))
+
+    def add(self, message):
+        key = self.key(message)
+        previous = self.pending.pop(key, None)
+        if previous is not None:
+            record('coalesced')
+            if previous.get('unread_delta') or message.get('unread_delta'):
+                message = dict(message, unread_delta=previous.get('unread_delta', 0) + message.get('unread_delta', 0))
+        self.pending[key] = message
+
+        # Backpressure: the client is not keeping up, so forget the oldest messages
+        while len(self.pending) > self.max_pending:
+            self.pending.popitem(last=False)
+            self.dropped += 1
+            record('dropped')
+
+        if self.task is None:
+            self.task = asyncio.ensure_future(self.run())
+
+    async def run(self):
+        try:
+            await asyncio.sleep(self.window)
+            # Messages that arrive while a frame is being written wait for the next one
+            while self.pending:
+                await self.flush()
+        finally:
+            self.task = None
+
+    async def flush(self):
+        messages = []
+        while self.pending and len(messages) < self.max_batch:
+            messages.append(self.pending.popitem(last=False)[1])
+        frame = {'type': 'batch', 'messages': messages}
+        if self.dropped:
+            frame['dropped'] = self.dropped
+            self.dropped = 0
+        record('delivered', len(messages))
+        record('frames')
+        await self.send(frame)
+        await save_stats()
+
+    def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
@@ -0,0 +1,72 @@
+"""
+Channel layer groups a notification socket belongs to.
+
+Besides its user's group, a socket joins the campus-wide group, the group of
+its role and department, and one group per active club membership and
+upcoming event registration, so a push only reaches the sockets that care
+about it. Membership changes made while a socket is open are sent to the
+user's group as control frames (join_groups / leave_groups / refresh_groups)
+that the consumer applies to its own channel.
+"""
+import hashlib
+import re
+
+from django.utils import timezone
+
+CAMPUS_GROUP = 'campus_notifications'
+ADMIN_GROUP = 'admin_notifications'
+STAFF_ROLES = ('admin', 'faculty')
+
+INVALID_CHARS_RE = re.compile(r'[^a-z0-9\-_.]+')
+
+
+def user_group(user_id):
+    return f'user_{user_id}'
+
+
+def role_group(role):
+    return f'role_{role}'
+
+
+def department_group(department):
+    # Group names are ASCII only; the digest keeps distinct departments apart
+    slug = INVALID_CHARS_RE.sub('_', department.lower())[:40]
+    digest = hashlib.md5(department.encode()).hexdigest()[:8]
+    return f'dept_{slug}_{digest}'
+
+
+def club_group(club_id):
+    return f'club_{club_id}'
+
+
+def event_group(event_id):
+    return f'event_{event_id}'
+
+
+def broadcast_group(audience, audience_value=None):
+    """Group reaching the audience of a BroadcastNotification"""
+    if audience == 'role':
+        return role_group(audience_value)
+    if audience == 'department':
+        return department_group(audience_value)
+    return CAMPUS_GROUP
+
+
+def groups_for_user(user):
+    """Every group a socket of this user should be in"""
+    from clubs.models import ClubMembership
+    from events.models import EventRegistration
+
+    groups = [user_group(user.id), CAMPUS_GROUP, role_group(user.role)]
+    if user.department:
+        groups.append(department_group(user.department))
+    if user.role in STAFF_ROLES:
+        groups.append(ADMIN_GROUP)
+
+    club_ids = ClubMembership.objects.filter(user=user, status='active').values_list('club_id', flat=True)
+    groups.extend(club_group(club_id) for club_id in club_ids)
+    event_ids = EventRegistration.objects.filter(
+        user=user, status__in=['registered', 'waitlisted'], event__end_date__gte=timezone.now()
+    ).values_list('event_id', flat=True)
+    groups.extend(event_group(event_id) for event_id in event_ids)
+    return groups
@@ -0,0 +1,142 @@
+"""
+Channel layer shared through the primary database.
+
+InMemoryChannelLayer only reaches sockets held by its own process, so a
+notification pushed by the notification worker or by another ASGI worker
+never arrives. DatabaseChannelLayer keeps messages and group memberships in
+two tables instead. Every consumer channel of a process shares one inbox
+('specific.<process>!'), and a single poller per process reads that inbox
+with one indexed query per poll interval, however many sockets are open.
+
+It needs no broker and suits a few workers on one database; switch to
+channels_redis.core.RedisChannelLayer for larger deployments.
+"""
+import asyncio
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from channels.layers import BaseChannelLayer
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ChannelMessage, ChannelGroupMembership
+
+# Expired rows are purged every this many polls
+CLEANUP_EVERY = 300
+
+
+class DatabaseChannelLayer(BaseChannelLayer):
+    """Channel layer storing messages in ChannelMessage rows"""
+
+    extensions = ['groups', 'flush']
+
+    def __init__(self, expiry=60, group_expiry=86400, capacity=100, channel_capacity=None,
+                 poll_interval=0.2, batch_size=200):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        self.group_expiry = group_expiry
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.client_prefix = uuid.uuid4().hex
+        self.receive_buffer = {}
+        self.poller = None
+
+    # Database access (run in a thread)
+
+    def _store(self, channels, message):
+        expires_at = timezone.now() + timedelta(seconds=self.expiry)
+        ChannelMessage.objects.bulk_create([
+            ChannelMessage(channel=channel, inbox=self.non_local_name(channel), payload=message, expires_at=expires_at)
+            for channel in channels
+        ], batch_size=500)
+
+    def _group_send(self, group, message):
+        channels = ChannelGroupMembership.objects.filter(group=group, expires_at__gt=timezone.now())
+        self._store(channels.values_list('channel', flat=True), message)
+
+    def _fetch(self, inboxes):
+        """Take the oldest pending messages addressed to the given inboxes"""
+        with transaction.atomic():
+            rows = list(
+                ChannelMessage.objects.filter(inbox__in=inboxes, expires_at__gt=timezone.now())
+                .order_by('id').values_list('id', 'channel', 'payload')[:self.batch_size]
+            )
+            if rows:
+                ChannelMessage.objects.filter(id__in=[row[0] for row in rows]).delete()
+        return rows
+
+    def _purge_expired(self):
+        now = timezone.now()
+        ChannelMessage.objects.filter(expires_at__lte=now).delete()
+        ChannelGroupMembership.objects.filter(expires_at__lte=now).delete()
+
+    # Channel layer API
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        await sync_to_async(self._store)([channel], message)
+
+    async def new_channel(self, prefix='specific.'):
+        return f'{prefix}{self.client_prefix}!{uuid.uuid4().hex}'
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        queue = self.receive_buffer.setdefault(channel, asyncio.Queue())
+        if self.poller is None or self.poller.done():
+            self.poller = asyncio.ensure_future(self._poll())
+        try:
+            return await queue.get()
+        except asyncio.CancelledError:
+            # The consumer has gone away; stop buffering for it
+            self.receive_buffer.pop(channel, None)
+            raise
+
+    async def _poll(self):
+        polls = 0
+        while self.receive_buffer:
+            inboxes = {self.non_local_name(channel) for channel in self.receive_buffer}
+            try:
+                rows = await database_sync_to_async(self._fetch)(list(inboxes))
+                polls += 1
+                if polls % CLEANUP_EVERY == 0:
+                    await database_sync_to_async(self._purge_expired)()
+            except Exception as e:
+                print(f"❌ Channel layer poll failed: {e}")
+                rows = []
+
+            for _, channel, message in rows:
+                queue = self.receive_buffer.get(channel)
+                if queue is not None:
+                    queue.put_nowait(message)
+            if len(rows) < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def group_add(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        await sync_to_async(ChannelGroupMembership.objects.update_or_create)(
+            group=group, channel=channel,
+            defaults={'expires_at': timezone.now() + timedelta(seconds=self.group_expiry)},
+        )
+
+    async def group_discard(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        await sync_to_async(ChannelGroupMembership.objects.filter(group=group, channel=channel).delete)()
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "message is not a dict"
+        assert self.valid_group_name(group), "Group name not valid"
+        await sync_to_async(self._group_send)(group, message)
+
+    async def flush(self):
+        self.receive_buffer = {}
+        await sync_to_async(ChannelMessage.objects.all().delete)()
+        await sync_to_async(ChannelGroupMembership.objects.all().delete)()
+
+    async def close(self):
+        if self.poller is not None:
+            self.poller.cancel()
+            self.poller = None
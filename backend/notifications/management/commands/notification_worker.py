@@ -0,0 +1,58 @@
+import time
+
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from notifications.queue import (
+    make_worker_id,
+    process_batch,
+    queue_setting,
+    release_stale_jobs,
+    retry_dead_jobs,
+)
+
+
+class Command(BaseCommand):
+    help = 'Drain the notification outbox in batches (runs until interrupted)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Jobs claimed per batch')
+        parser.add_argument('--interval', type=float, default=None, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Drain due jobs once and exit')
+        parser.add_argument('--retry-dead', action='store_true', help='Requeue dead-lettered jobs before starting')
+
+    def handle(self, *args, **options):
+        # Pushes go through the channel layer; an in-process one never reaches the ASGI server's sockets
+        if isinstance(get_channel_layer(), InMemoryChannelLayer):
+            raise CommandError(
+                "The channel layer is InMemoryChannelLayer, so notifications pushed by this worker "
+                "would never reach a WebSocket. Set CHANNEL_LAYER_BACKEND to "
+                "notifications.layers.DatabaseChannelLayer or channels_redis.core.RedisChannelLayer, "
+                "or NOTIFICATION_QUEUE_EAGER=True to deliver inline without a worker."
+            )
+
+        worker_id = make_worker_id()
+        batch_size = options['batch_size'] or queue_setting('BATCH_SIZE')
+        interval = options['interval'] if options['interval'] is not None else queue_setting('POLL_INTERVAL')
+
+        if options['retry_dead']:
+            count = retry_dead_jobs()
+            self.stdout.write(f"Requeued {count} dead jobs")
+
+        self.stdout.write(f"Notification worker {worker_id} started")
+        try:
+            while True:
+                close_old_connections()
+                release_stale_jobs()
+                succeeded, failed = process_batch(worker_id, batch_size)
+
+                if succeeded or failed:
+                    self.stdout.write(f"Processed {succeeded} jobs, {failed} failed")
+
+                if succeeded + failed < batch_size:
+                    if options['once']:
+                        break
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write("Notification worker stopped")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from notifications.counters import reconcile_unread_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-user unread notification counters from the notification rows'
+
+    def handle(self, *args, **options):
+        fixed = reconcile_unread_counters()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled unread counters ({fixed} fixed)"))
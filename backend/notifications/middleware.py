@@ -0,0 +1,61 @@
+"""
+JWT authentication for WebSocket connections.
+
+Browsers cannot set an Authorization header on a WebSocket handshake, so the
+access token is read from the ``token`` query parameter
+(ws://host/ws/notifications/?token=<access>); an ``Authorization: Bearer``
+header is honoured for other clients. Without a token the session user set by
+AuthMiddlewareStack is kept.
+"""
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+
+@database_sync_to_async
+def get_user_for_token(raw_token):
+    """Active user for a valid access token, AnonymousUser otherwise"""
+    try:
+        token = AccessToken(raw_token)
+    except TokenError:
+        return AnonymousUser()
+    user = User.objects.filter(**{api_settings.USER_ID_FIELD: token.get(api_settings.USER_ID_CLAIM)}).first()
+    if user is None or not user.is_active:
+        return AnonymousUser()
+    return user
+
+
+def get_raw_token(scope):
+    token = parse_qs(scope.get('query_string', b'').decode()).get('token')
+    if token:
+        return token[0]
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            parts = value.decode().split()
+            if len(parts) == 2 and parts[0].lower() == 'bearer':
+                return parts[1]
+    return None
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Populate scope['user'] from a simplejwt access token"""
+
+    async def __call__(self, scope, receive, send):
+        raw_token = get_raw_token(scope)
+        if raw_token:
+            scope = dict(scope, user=await get_user_for_token(raw_token))
+        return await super().__call__(scope, receive, send)
+
+
+def JWTAuthMiddlewareStack(inner):
+    """Session auth first, then a token (if any) overrides the user"""
+    return AuthMiddlewareStack(JWTAuthMiddleware(inner))
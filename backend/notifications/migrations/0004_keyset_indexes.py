@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_jobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='broadcastnotification',
+            index=models.Index(fields=['created_at', 'id'], name='broadcast_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='notif_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:50
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0006_unread_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(max_length=100)),
+                ('inbox', models.CharField(max_length=100)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'channel_messages',
+                'indexes': [models.Index(fields=['inbox', 'id'], name='channel_msg_inbox_idx'), models.Index(fields=['expires_at'], name='channel_msg_expires_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChannelGroupMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group', models.CharField(max_length=100)),
+                ('channel', models.CharField(max_length=100)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'channel_group_memberships',
+                'indexes': [models.Index(fields=['expires_at'], name='channel_group_expires_idx')],
+                'unique_together': {('group', 'channel')},
+            },
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -26,6 +28,177 @@ class Notification(models.Model):
     class Meta:
         db_table = 'notifications'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='notif_user_created_idx'),
+            # Only unread rows; keeps the unread count and mark_all_read off the read backlog
+            models.Index(fields=['user', 'created_at'], name='notif_user_unread_idx', condition=models.Q(is_read=False)),
+        ]
     
     def __str__(self):
         return f"{self.user.email}: {self.title}"
+
+
+class BroadcastNotificationQuerySet(models.QuerySet):
+    """QuerySet helpers for resolving broadcast audiences"""
+    
+    def for_user(self, user):
+        """Broadcasts addressed to the given user since they joined"""
+        audience = models.Q(audience='all') | models.Q(audience='role', audience_value=user.role)
+        if user.department:
+            audience |= models.Q(audience='department', audience_value=user.department)
+        
+        return self.filter(audience, created_at__gte=user.date_joined).exclude(created_by=user)
+    
+    def unread_for_user(self, user):
+        """Broadcasts for the user that are neither receipted nor below their watermark"""
+        queryset = self.for_user(user).exclude(receipts__user=user)
+        watermark = NotificationWatermark.objects.filter(user=user).values_list('read_until', flat=True).first()
+        if watermark:
+            queryset = queryset.filter(created_at__gt=watermark)
+        return queryset
+
+
+class BroadcastNotification(models.Model):
+    """
+    Model for notifications addressed to an audience instead of a single user.
+    One row is stored per announcement; read state lives in BroadcastReceipt
+    and NotificationWatermark.
+    """
+    
+    AUDIENCE_CHOICES = (
+        ('all', 'All Users'),
+        ('role', 'Role'),
+        ('department', 'Department'),
+    )
+    
+    notification_type = models.CharField(max_length=20, choices=Notification.TYPE_CHOICES)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    link = models.CharField(max_length=500, blank=True, null=True)
+    audience = models.CharField(max_length=20, choices=AUDIENCE_CHOICES, default='all')
+    audience_value = models.CharField(max_length=100, blank=True, null=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='sent_broadcasts')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    objects = BroadcastNotificationQuerySet.as_manager()
+    
+    class Meta:
+        db_table = 'broadcast_notifications'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='broadcast_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"[{self.audience}] {self.title}"
+
+
+class BroadcastReceipt(models.Model):
+    """Model for a user's read receipt on a single broadcast notification"""
+    
+    broadcast = models.ForeignKey(BroadcastNotification, on_delete=models.CASCADE, related_name='receipts')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='broadcast_receipts')
+    read_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'broadcast_receipts'
+        unique_together = ('broadcast', 'user')
+    
+    def __str__(self):
+        return f"{self.user.email} read {self.broadcast.title}"
+
+
+class NotificationWatermark(models.Model):
+    """Model marking every broadcast created up to read_until as read for a user"""
+    
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='notification_watermark')
+    read_until = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'notification_watermarks'
+    
+    def __str__(self):
+        return f"{self.user.email}: {self.read_until}"
+
+
+class NotificationCounter(models.Model):
+    """Model holding a user's number of unread personal notifications"""
+    
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='notification_counter')
+    unread = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'notification_counters'
+    
+    def __str__(self):
+        return f"{self.user.email}: {self.unread} unread"
+
+
+class NotificationJob(models.Model):
+    """Outbox entry for notification work drained by the notification_worker command"""
+    
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('dead', 'Dead'),
+    )
+    
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'notification_jobs'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='notif_job_status_run_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.task} [{self.status}]"
+
+
+class ChannelMessage(models.Model):
+    """Message in flight through DatabaseChannelLayer, deleted once received"""
+    
+    channel = models.CharField(max_length=100)
+    # Non-local part of the channel name; a process polls all of its channels through one inbox
+    inbox = models.CharField(max_length=100)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'channel_messages'
+        indexes = [
+            models.Index(fields=['inbox', 'id'], name='channel_msg_inbox_idx'),
+            models.Index(fields=['expires_at'], name='channel_msg_expires_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.channel} #{self.id}"
+
+
+class ChannelGroupMembership(models.Model):
+    """Channel subscribed to a DatabaseChannelLayer group"""
+    
+    group = models.CharField(max_length=100)
+    channel = models.CharField(max_length=100)
+    expires_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'channel_group_memberships'
+        unique_together = ('group', 'channel')
+        indexes = [
+            models.Index(fields=['expires_at'], name='channel_group_expires_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.group}: {self.channel}"
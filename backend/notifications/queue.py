@@ -0,0 +1,232 @@
+"""
+Durable outbox for notification dispatch.
+
+Views enqueue a NotificationJob inside their own transaction and return
+immediately; ``python manage.py notification_worker`` drains the table in
+batches with retry, exponential backoff and a dead-letter state. Only the
+primary database is used, so SQLite and Postgres both work without a broker.
+"""
+import os
+import socket
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .models import NotificationJob
+from .utils import (
+    send_notification_to_all_users,
+    send_notification_to_user,
+    send_notification_to_role,
+    send_notification_to_department,
+)
+
+User = get_user_model()
+
+QUEUE_DEFAULTS = {
+    'BATCH_SIZE': 50,
+    'POLL_INTERVAL': 1.0,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_BASE': 5,
+    'BACKOFF_MAX': 600,
+    'LOCK_TIMEOUT': 300,
+    'EAGER': False,
+}
+
+TASKS = {}
+
+
+def queue_setting(name):
+    """Read a NOTIFICATION_QUEUE setting, falling back to QUEUE_DEFAULTS"""
+    return getattr(settings, 'NOTIFICATION_QUEUE', {}).get(name, QUEUE_DEFAULTS[name])
+
+
+def task(name):
+    """Register a function as a queue task under the given name"""
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(task_name, **payload):
+    """
+    Store a job in the outbox
+    Payload values must be JSON-serializable (pass ids, not model instances)
+    """
+    if task_name not in TASKS:
+        raise ValueError(f"Unknown notification task: {task_name}")
+
+    if queue_setting('EAGER'):
+        TASKS[task_name](**payload)
+        return None
+
+    return NotificationJob.objects.create(
+        task=task_name,
+        payload=payload,
+        max_attempts=queue_setting('MAX_ATTEMPTS'),
+    )
+
+
+def _get_user(user_id):
+    if user_id is None:
+        return None
+    return User.objects.filter(pk=user_id).first()
+
+
+@task('notify_all_users')
+def _notify_all_users(title, message, notification_type='general', link=None, exclude_user_id=None):
+    send_notification_to_all_users(title, message, notification_type, link, exclude_user=_get_user(exclude_user_id))
+
+
+@task('notify_user')
+def _notify_user(user_id, title, message, notification_type='general', link=None):
+    user = _get_user(user_id)
+    if user is not None:
+        send_notification_to_user(user, title, message, notification_type, link)
+
+
+@task('notify_users')
+def _notify_users(user_ids, title, message, notification_type='general', link=None):
+    for user in User.objects.filter(pk__in=user_ids):
+        send_notification_to_user(user, title, message, notification_type, link)
+
+
+@task('notify_role')
+def _notify_role(role, title, message, notification_type='general', link=None, exclude_user_id=None):
+    send_notification_to_role(role, title, message, notification_type, link, exclude_user=_get_user(exclude_user_id))
+
+
+@task('notify_department')
+def _notify_department(department, title, message, notification_type='general', link=None, exclude_user_id=None):
+    send_notification_to_department(department, title, message, notification_type, link, exclude_user=_get_user(exclude_user_id))
+
+
+def enqueue_notification_to_all_users(title, message, notification_type='general', link=None, exclude_user=None):
+    """Queue send_notification_to_all_users"""
+    return enqueue(
+        'notify_all_users', title=title, message=message, notification_type=notification_type,
+        link=link, exclude_user_id=exclude_user.id if exclude_user else None
+    )
+
+
+def enqueue_notification_to_user(user, title, message, notification_type='general', link=None):
+    """Queue send_notification_to_user"""
+    return enqueue(
+        'notify_user', user_id=user.id, title=title, message=message,
+        notification_type=notification_type, link=link
+    )
+
+
+def enqueue_notification_to_users(user_ids, title, message, notification_type='general', link=None):
+    """Queue send_notification_to_user for many users as one job"""
+    return enqueue(
+        'notify_users', user_ids=list(user_ids), title=title, message=message,
+        notification_type=notification_type, link=link
+    )
+
+
+def enqueue_notification_to_role(role, title, message, notification_type='general', link=None, exclude_user=None):
+    """Queue send_notification_to_role"""
+    return enqueue(
+        'notify_role', role=role, title=title, message=message, notification_type=notification_type,
+        link=link, exclude_user_id=exclude_user.id if exclude_user else None
+    )
+
+
+def enqueue_notification_to_department(department, title, message, notification_type='general', link=None, exclude_user=None):
+    """Queue send_notification_to_department"""
+    return enqueue(
+        'notify_department', department=department, title=title, message=message,
+        notification_type=notification_type, link=link,
+        exclude_user_id=exclude_user.id if exclude_user else None
+    )
+
+
+def make_worker_id():
+    """Identifier recorded on claimed jobs so a worker only processes its own claims"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def release_stale_jobs():
+    """Return jobs locked by a crashed worker to the pending state"""
+    cutoff = timezone.now() - timedelta(seconds=queue_setting('LOCK_TIMEOUT'))
+    return NotificationJob.objects.filter(status='processing', locked_at__lt=cutoff).update(
+        status='pending', locked_by='', locked_at=None
+    )
+
+
+def claim_batch(worker_id, batch_size):
+    """
+    Atomically claim up to batch_size due jobs for this worker
+    The conditional UPDATE makes concurrent workers skip each other's claims
+    """
+    now = timezone.now()
+    due_ids = list(
+        NotificationJob.objects.filter(status='pending', run_after__lte=now)
+        .order_by('id').values_list('id', flat=True)[:batch_size]
+    )
+    if not due_ids:
+        return []
+
+    NotificationJob.objects.filter(id__in=due_ids, status='pending').update(
+        status='processing', locked_by=worker_id, locked_at=now
+    )
+    return list(NotificationJob.objects.filter(id__in=due_ids, status='processing', locked_by=worker_id))
+
+
+def backoff_delay(attempts):
+    """Exponential backoff in seconds for the given attempt number"""
+    return min(queue_setting('BACKOFF_MAX'), queue_setting('BACKOFF_BASE') * 2 ** (attempts - 1))
+
+
+def run_job(job):
+    """Execute a claimed job; returns True on success"""
+    func = TASKS.get(job.task)
+    try:
+        if func is None:
+            raise LookupError(f"Unknown notification task: {job.task}")
+        with transaction.atomic():
+            func(**job.payload)
+    except Exception:
+        attempts = job.attempts + 1
+        fields = {
+            'attempts': attempts,
+            'last_error': traceback.format_exc(limit=5),
+            'locked_by': '',
+            'locked_at': None,
+            'updated_at': timezone.now(),
+        }
+        if func is None or attempts >= job.max_attempts:
+            fields['status'] = 'dead'
+        else:
+            fields['status'] = 'pending'
+            fields['run_after'] = timezone.now() + timedelta(seconds=backoff_delay(attempts))
+        NotificationJob.objects.filter(pk=job.pk).update(**fields)
+        return False
+
+    NotificationJob.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def process_batch(worker_id, batch_size=None):
+    """Claim and run one batch; returns (succeeded, failed) counts"""
+    jobs = claim_batch(worker_id, batch_size or queue_setting('BATCH_SIZE'))
+    succeeded = failed = 0
+    for job in jobs:
+        if run_job(job):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
+
+
+def retry_dead_jobs():
+    """Move dead-lettered jobs back to pending with a fresh attempt budget"""
+    return NotificationJob.objects.filter(status='dead').update(
+        status='pending', attempts=0, run_after=timezone.now(), last_error=''
+    )
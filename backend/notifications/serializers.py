@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Notification
+from .models import Notification, BroadcastNotification
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -9,3 +9,33 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = '__all__'
         read_only_fields = ('user', 'created_at')
+
+
+class BroadcastNotificationSerializer(serializers.ModelSerializer):
+    """Serializer for broadcast notifications as seen by a single user"""
+    
+    source = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = BroadcastNotification
+        fields = ('id', 'source', 'notification_type', 'title', 'message', 'link', 'is_read', 'created_at')
+    
+    def get_source(self, obj):
+        return 'broadcast'
+    
+    def get_is_read(self, obj):
+        return getattr(obj, 'is_read', False)
+
+
+class NotificationFeedSerializer(serializers.Serializer):
+    """Serializer for the merged personal and broadcast notification feed"""
+    
+    id = serializers.IntegerField()
+    source = serializers.CharField()
+    notification_type = serializers.CharField()
+    title = serializers.CharField()
+    message = serializers.CharField()
+    link = serializers.CharField(allow_null=True)
+    is_read = serializers.BooleanField(source='read')
+    created_at = serializers.DateTimeField()
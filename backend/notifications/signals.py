@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .counters import broadcasts_changed
+from .models import BroadcastNotification
+
+
+@receiver([post_save, post_delete], sender=BroadcastNotification)
+def retire_broadcast_counts(sender, **kwargs):
+    """New, edited (audience) and deleted broadcasts change every cached unread count, admin edits included"""
+    broadcasts_changed()
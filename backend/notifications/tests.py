@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .counters import get_broadcast_unread_count
+from .delivery import FrameBatcher
+from .models import BroadcastNotification
+
+User = get_user_model()
+
+
+class NotificationWorkerTests(TestCase):
+    """The worker only runs on a channel layer other processes can read"""
+
+    @override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+    def test_refuses_in_memory_layer(self):
+        with self.assertRaisesMessage(CommandError, 'InMemoryChannelLayer'):
+            call_command('notification_worker', once=True, stdout=StringIO())
+
+    @override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'notifications.layers.DatabaseChannelLayer'}})
+    def test_runs_on_database_layer(self):
+        call_command('notification_worker', once=True, interval=0, stdout=StringIO())
+
+
+class FrameBatcherKeyTests(SimpleTestCase):
+    """Only messages about the same object replace each other"""
+
+    def setUp(self):
+        self.batcher = FrameBatcher(send=None)
+
+    def test_notifications_with_same_link_stay_apart(self):
+        first = {'type': 'event', 'link': '/events', 'source': 'broadcast', 'id': 1}
+        second = {'type': 'event', 'link': '/events', 'source': 'broadcast', 'id': 2}
+        self.assertNotEqual(self.batcher.key(first), self.batcher.key(second))
+
+    def test_personal_and_broadcast_ids_stay_apart(self):
+        personal = {'type': 'general', 'link': '/', 'source': 'personal', 'id': 7}
+        broadcast = {'type': 'general', 'link': '/', 'source': 'broadcast', 'id': 7}
+        self.assertNotEqual(self.batcher.key(personal), self.batcher.key(broadcast))
+
+    def test_same_notification_coalesces(self):
+        message = {'type': 'general', 'link': '/', 'source': 'personal', 'id': 7}
+        self.assertEqual(self.batcher.key(message), self.batcher.key(dict(message, title='Edited')))
+
+    def test_updates_without_id_coalesce_on_link(self):
+        first = {'type': 'feedback_update', 'link': '/feedback/3', 'status': 'under_review'}
+        second = {'type': 'feedback_update', 'link': '/feedback/3', 'status': 'resolved'}
+        self.assertEqual(self.batcher.key(first), self.batcher.key(second))
+
+    def test_unread_count_keeps_latest(self):
+        self.assertEqual(
+            self.batcher.key({'type': 'unread_count', 'count': 1}),
+            self.batcher.key({'type': 'unread_count', 'count': 2}),
+        )
+
+
+class BroadcastAdminTests(TestCase):
+    """Broadcasts added or deleted in the admin retire the cached unread counts"""
+
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        # Counts are only cached in a cache shared between processes
+        cache_settings = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }})
+        cache_settings.enable()
+        self.addCleanup(cache_settings.disable)
+
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='pass')
+        self.student = User.objects.create_user(email='student@example.com', password='pass')
+        User.objects.filter(pk=self.student.pk).update(date_joined=timezone.now() - timedelta(days=1))
+        self.student.refresh_from_db()
+        self.client.force_login(self.admin)
+
+    def unread(self):
+        return get_broadcast_unread_count(self.student)
+
+    def test_admin_add_and_delete(self):
+        self.assertEqual(self.unread(), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/admin/notifications/broadcastnotification/add/', {
+                'notification_type': 'general', 'title': 'Exam schedule', 'message': 'Posted',
+                'audience': 'all',
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.unread(), 1)
+
+        broadcast = BroadcastNotification.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/admin/notifications/broadcastnotification/{broadcast.pk}/delete/', {'post': 'yes'}
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.unread(), 0)
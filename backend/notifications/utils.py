@@ -10,86 +10,126 @@ except ImportError:
         return func
 
 from django.contrib.auth import get_user_model
-from .models import Notification
+from django.db import transaction
+from .models import Notification, BroadcastNotification
+from .counters import adjust_unread, get_unread_count
+from .groups import broadcast_group, user_group
 
 User = get_user_model()
 
 
-def send_notification_to_all_users(title, message, notification_type='general', link=None, exclude_user=None):
-    """
-    Send notification to all active users
-    Used when admin creates/updates events, clubs, etc.
-    """
-    users = User.objects.filter(is_active=True)
-    if exclude_user:
-        users = users.exclude(id=exclude_user.id)
-    
-    # Create notifications in database
-    notifications = []
-    for user in users:
-        notifications.append(
-            Notification(
-                user=user,
-                title=title,
-                message=message,
-                notification_type=notification_type,
-                link=link
-            )
-        )
-    
-    Notification.objects.bulk_create(notifications)
-    
-    # Send real-time WebSocket notifications
+def _group_send(group_name, event):
     channel_layer = get_channel_layer()
     if channel_layer and CHANNELS_AVAILABLE:
         try:
-            async_to_sync(channel_layer.group_send)(
-                'campus_notifications',
-                {
-                    'type': 'send_notification',
-                    'message': {
-                        'type': notification_type,
-                        'title': title,
-                        'message': message,
-                        'link': link,
-                    }
-                }
-            )
+            async_to_sync(channel_layer.group_send)(group_name, event)
         except Exception as e:
             print(f"Error sending WebSocket notification: {e}")
 
 
-def send_notification_to_user(user, title, message, notification_type='general', link=None):
+def push_to_group(group_name, message):
     """
-    Send notification to a specific user
+    Push a frame to every socket in a channel layer group
+    Sent after the current transaction commits, so clients never see rolled back rows
+    """
+    transaction.on_commit(lambda: _group_send(group_name, {'type': 'send_notification', 'message': message}))
+
+
+def join_groups(user_id, groups):
+    """Add a user's open sockets to groups (e.g. after joining a club)"""
+    transaction.on_commit(lambda: _group_send(user_group(user_id), {'type': 'join_groups', 'groups': list(groups)}))
+
+
+def leave_groups(user_id, groups):
+    """Remove a user's open sockets from groups"""
+    transaction.on_commit(lambda: _group_send(user_group(user_id), {'type': 'leave_groups', 'groups': list(groups)}))
+
+
+def refresh_user_groups(user_id):
+    """Make a user's open sockets recompute their groups (role or department changed)"""
+    transaction.on_commit(lambda: _group_send(user_group(user_id), {'type': 'refresh_groups'}))
+
+
+def push_unread_count(user):
+    """Send a user's current unread count to all of their open sockets"""
+    # Counted after commit, once cached broadcast counts have been dropped
+    transaction.on_commit(
+        lambda: _group_send(user_group(user.id), {
+            'type': 'send_notification',
+            'message': {'type': 'unread_count', 'count': get_unread_count(user)},
+        })
+    )
+
+
+def _send_to_group(group_name, title, message, notification_type, link, **extra):
+    """Push a notification frame to a channel layer group"""
+    push_to_group(group_name, {
+        'type': notification_type,
+        'title': title,
+        'message': message,
+        'link': link,
+        **extra,
+    })
+
+
+def send_broadcast_notification(title, message, notification_type='general', link=None,
+                                audience='all', audience_value=None, exclude_user=None):
     """
-    # Create notification in database
-    notification = Notification.objects.create(
-        user=user,
+    Store a single broadcast notification for an audience
+    Users read it through NotificationViewSet, so no per-user rows are created
+    """
+    broadcast = BroadcastNotification.objects.create(
         title=title,
         message=message,
         notification_type=notification_type,
-        link=link
+        link=link,
+        audience=audience,
+        audience_value=audience_value,
+        created_by=exclude_user
     )
     
-    # Send real-time WebSocket notification
-    channel_layer = get_channel_layer()
-    if channel_layer and CHANNELS_AVAILABLE:
-        try:
-            async_to_sync(channel_layer.group_send)(
-                f'user_{user.id}',
-                {
-                    'type': 'send_notification',
-                    'message': {
-                        'type': notification_type,
-                        'title': title,
-                        'message': message,
-                        'link': link,
-                    }
-                }
-            )
-        except Exception as e:
-            print(f"Error sending WebSocket notification: {e}")
+    # Send real-time WebSocket notifications
+    # Only the audience's sockets get the frame; clients add unread_delta to their badge
+    _send_to_group(
+        broadcast_group(audience, audience_value), title, message, notification_type, link,
+        id=broadcast.id, source='broadcast', audience=audience, audience_value=audience_value,
+        sender_id=exclude_user.id if exclude_user else None, unread_delta=1,
+    )
+    
+    return broadcast
+
+
+def send_notification_to_all_users(title, message, notification_type='general', link=None, exclude_user=None):
+    """
+    Send notification to all active users
+    Used when admin creates/updates events, clubs, etc.
+    """
+    return send_broadcast_notification(
+        title, message, notification_type, link,
+        audience='all', exclude_user=exclude_user
+    )
+
+
+def send_notification_to_user(user, title, message, notification_type='general', link=None):
+    """
+    Send notification to a specific user
+    """
+    # Create notification in database, counting it as unread in the same transaction
+    with transaction.atomic():
+        notification = Notification.objects.create(
+            user=user,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            link=link
+        )
+        adjust_unread(user.id, 1)
+        
+        # Send real-time WebSocket notification with the new unread count
+        _send_to_group(
+            user_group(user.id), title, message, notification_type, link,
+            id=notification.id, source='personal', unread_count=get_unread_count(user),
+        )
     
     return notification
 
@@ -98,42 +138,17 @@ def send_notification_to_role(role, title, message, notification_type='general',
     """
     Send notification to all users with a specific role
     """
-    users = User.objects.filter(is_active=True, role=role)
-    if exclude_user:
-        users = users.exclude(id=exclude_user.id)
-    
-    # Create notifications in database
-    notifications = []
-    for user in users:
-        notifications.append(
-            Notification(
-                user=user,
-                title=title,
-                message=message,
-                notification_type=notification_type,
-                link=link
-            )
-        )
-    
-    Notification.objects.bulk_create(notifications)
-    
-    # Send real-time WebSocket notifications
-    channel_layer = get_channel_layer()
-    if channel_layer and CHANNELS_AVAILABLE:
-        try:
-            # Send to role-specific group or campus-wide
-            group_name = 'campus_notifications'
-            async_to_sync(channel_layer.group_send)(
-                group_name,
-                {
-                    'type': 'send_notification',
-                    'message': {
-                        'type': notification_type,
-                        'title': title,
-                        'message': message,
-                        'link': link,
-                    }
-                }
-            )
-        except Exception as e:
-            print(f"Error sending WebSocket notification: {e}")
+    return send_broadcast_notification(
+        title, message, notification_type, link,
+        audience='role', audience_value=role, exclude_user=exclude_user
+    )
+
+
+def send_notification_to_department(department, title, message, notification_type='general', link=None, exclude_user=None):
+    """
+    Send notification to all users in a specific department
+    """
+    return send_broadcast_notification(
+        title, message, notification_type, link,
+        audience='department', audience_value=department, exclude_user=exclude_user
+    )
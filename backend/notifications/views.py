@@ -2,8 +2,24 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import Notification
-from .serializers import NotificationSerializer
+from django.db import models, transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from .models import Notification, BroadcastNotification, BroadcastReceipt, NotificationWatermark
+from .serializers import NotificationSerializer, BroadcastNotificationSerializer, NotificationFeedSerializer
+from .counters import adjust_unread, broadcast_reads_changed, get_unread_count
+from .utils import push_unread_count
+from .delivery import socket_stats
+from accounts.permissions import IsAdmin
+from core.pagination import KeysetPagination
+
+FEED_FIELDS = ('id', 'notification_type', 'title', 'message', 'link', 'created_at', 'read', 'source')
+
+
+class NotificationFeedPagination(KeysetPagination):
+    """Newest first; source breaks id ties between personal and broadcast rows"""
+    
+    ordering = ('-created_at', '-id', 'source')
 
 
 class NotificationViewSet(viewsets.ModelViewSet):
@@ -11,26 +27,101 @@ class NotificationViewSet(viewsets.ModelViewSet):
     
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationFeedPagination
     
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
     
+    def get_broadcast_queryset(self):
+        """Broadcasts visible to the current user, annotated with their read state"""
+        user = self.request.user
+        is_read = models.Q(models.Exists(
+            BroadcastReceipt.objects.filter(broadcast=models.OuterRef('pk'), user=user)
+        ))
+        watermark = NotificationWatermark.objects.filter(user=user).values_list('read_until', flat=True).first()
+        if watermark:
+            is_read |= models.Q(created_at__lte=watermark)
+        
+        return BroadcastNotification.objects.for_user(user).annotate(
+            read=models.ExpressionWrapper(is_read, output_field=models.BooleanField())
+        )
+    
+    def get_feed_streams(self):
+        """Personal notifications and broadcasts as two streams with the same feed columns"""
+        personal = self.get_queryset().annotate(
+            read=models.F('is_read'),
+            source=models.Value('personal', output_field=models.CharField()),
+        ).values(*FEED_FIELDS)
+        broadcasts = self.get_broadcast_queryset().annotate(
+            source=models.Value('broadcast', output_field=models.CharField()),
+        ).values(*FEED_FIELDS)
+        return [personal, broadcasts]
+    
+    def list(self, request, *args, **kwargs):
+        """Merged feed; each stream is read with its own keyset query"""
+        page = self.paginator.paginate_streams(self.get_feed_streams(), request, self)
+        serializer = NotificationFeedSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    def perform_update(self, serializer):
+        """Keep the unread counter in step with is_read changes"""
+        with transaction.atomic():
+            was_read = serializer.instance.is_read
+            notification = serializer.save()
+            adjust_unread(notification.user_id, int(was_read) - int(notification.is_read))
+            push_unread_count(notification.user)
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            if not instance.is_read:
+                adjust_unread(instance.user_id, -1)
+                push_unread_count(instance.user)
+    
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
-        """Mark all notifications as read"""
-        count = self.get_queryset().filter(is_read=False).update(is_read=True)
+        """Mark all personal and broadcast notifications as read"""
+        now = timezone.now()
+        with transaction.atomic():
+            personal = self.get_queryset().filter(is_read=False).update(is_read=True)
+            adjust_unread(request.user.id, -personal)
+            count = personal + BroadcastNotification.objects.unread_for_user(request.user).filter(created_at__lte=now).count()
+            
+            # Move the watermark forward; receipts below it are now redundant
+            NotificationWatermark.objects.update_or_create(user=request.user, defaults={'read_until': now})
+            BroadcastReceipt.objects.filter(user=request.user, broadcast__created_at__lte=now).delete()
+            broadcast_reads_changed(request.user.id)
+            push_unread_count(request.user)
+        
         return Response({'message': f'{count} notifications marked as read'})
     
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
-        """Mark a notification as read"""
+        """Mark a notification as read (pass source=broadcast for broadcasts)"""
+        source = request.data.get('source') or request.query_params.get('source')
+        if source == 'broadcast':
+            broadcast = get_object_or_404(BroadcastNotification.objects.for_user(request.user), pk=pk)
+            if BroadcastReceipt.objects.get_or_create(broadcast=broadcast, user=request.user)[1]:
+                broadcast_reads_changed(request.user.id)
+                push_unread_count(request.user)
+            broadcast.is_read = True
+            return Response(BroadcastNotificationSerializer(broadcast).data)
+        
         notification = self.get_object()
+        with transaction.atomic():
+            # Conditional update so concurrent requests decrement the counter once
+            if self.get_queryset().filter(pk=notification.pk, is_read=False).update(is_read=True):
+                adjust_unread(request.user.id, -1)
+                push_unread_count(request.user)
         notification.is_read = True
-        notification.save()
         return Response(self.get_serializer(notification).data)
     
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
-        """Get count of unread notifications"""
-        count = self.get_queryset().filter(is_read=False).count()
-        return Response({'count': count})
+        """Get count of unread personal and broadcast notifications"""
+        return Response({'count': get_unread_count(request.user)})
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAdmin])
+    def socket_stats(self, request):
+        """Messages received, coalesced, dropped and delivered by notification sockets (admin only)"""
+        return Response(socket_stats())
@@ -0,0 +1,198 @@
+"""
+Pluggable full-text search backends.
+
+SQLiteFTSBackend keeps one FTS5 table per SearchIndex (rowid = model pk) in
+sync through signals. PostgresSearchBackend relies on GIN expression indexes
+over to_tsvector(), which Postgres maintains itself. DatabaseSearchBackend is
+the icontains fallback for databases without full-text support.
+
+Select one with the SEARCH_BACKEND setting (dotted path); by default the
+backend is picked from the database vendor. install() and rebuild() take the
+connection and model to use, so migrations can pass schema_editor.connection
+and historical models.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection, models
+from django.utils.module_loading import import_string
+
+from .registry import SEARCH_INDEXES
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    """Lower-cased word tokens of a user query"""
+    return TOKEN_RE.findall((query or '').lower())
+
+
+class DatabaseSearchBackend:
+    """Fallback backend: every token must appear (icontains) in one of the fields"""
+
+    def install(self, index, connection=connection, model=None):
+        pass
+
+    def index(self, index, instance):
+        pass
+
+    def remove(self, index, pk):
+        pass
+
+    def rebuild(self, index, connection=connection, model=None):
+        return 0
+
+    def filter(self, index, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+
+        for token in tokens:
+            condition = models.Q()
+            for field in index.fields:
+                condition |= models.Q(**{f'{field}__icontains': token})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class SQLiteFTSBackend(DatabaseSearchBackend):
+    """SQLite FTS5 backend with bm25 ranking and prefix matching"""
+
+    def install(self, index, connection=connection, model=None):
+        columns = ', '.join(index.fields)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {index.table} USING fts5("
+                f"{columns}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+
+    def index(self, index, instance):
+        columns = ', '.join(index.fields)
+        placeholders = ', '.join(['%s'] * len(index.fields))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {index.table} WHERE rowid = %s", [instance.pk])
+            cursor.execute(
+                f"INSERT INTO {index.table} (rowid, {columns}) VALUES (%s, {placeholders})",
+                [instance.pk, *index.get_text(instance)]
+            )
+
+    def remove(self, index, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {index.table} WHERE rowid = %s", [pk])
+
+    def rebuild(self, index, connection=connection, model=None, chunk_size=2000):
+        model = model or index.model
+        columns = ', '.join(index.fields)
+        placeholders = ', '.join(['%s'] * (len(index.fields) + 1))
+        count = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {index.table}")
+            rows = model._default_manager.using(connection.alias).order_by().values_list('pk', *index.fields)
+            batch = []
+            for row in rows.iterator(chunk_size=chunk_size):
+                batch.append([row[0], *[value or '' for value in row[1:]]])
+                if len(batch) >= chunk_size:
+                    cursor.executemany(f"INSERT INTO {index.table} (rowid, {columns}) VALUES ({placeholders})", batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(f"INSERT INTO {index.table} (rowid, {columns}) VALUES ({placeholders})", batch)
+                count += len(batch)
+        return count
+
+    def match_expression(self, query):
+        # Quote every token so user input cannot inject FTS5 syntax; '*' makes it a prefix match
+        return ' '.join(f'"{token}"*' for token in tokenize(query))
+
+    def filter(self, index, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+
+        table = queryset.model._meta.db_table
+        pk_column = queryset.model._meta.pk.column
+        # Join the FTS table so MATCH and bm25() run once per query, not per row
+        return queryset.extra(
+            tables=[index.table],
+            where=[f'{index.table}.rowid = "{table}"."{pk_column}"', f'{index.table} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'bm25({index.table})'},
+            order_by=['search_rank'],
+        )
+
+
+class PostgresSearchBackend(DatabaseSearchBackend):
+    """Postgres backend using to_tsvector() expression indexes and ts_rank()"""
+
+    config = 'simple'
+
+    def vector_sql(self, index, table=None):
+        prefix = f'"{table}".' if table else ''
+        parts = " || ' ' || ".join(f"coalesce({prefix}\"{field}\", '')" for field in index.fields)
+        return f"to_tsvector('{self.config}', {parts})"
+
+    def install(self, index, connection=connection, model=None):
+        table = (model or index.model)._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {index.table}_tsv_idx ON \"{table}\" "
+                f"USING GIN (({self.vector_sql(index)}))"
+            )
+
+    def tsquery(self, query):
+        return ' & '.join(f'{token}:*' for token in tokenize(query))
+
+    def filter(self, index, queryset, query):
+        tsquery = self.tsquery(query)
+        if not tsquery:
+            return queryset.none()
+
+        vector = self.vector_sql(index, queryset.model._meta.db_table)
+        return queryset.extra(
+            where=[f"{vector} @@ to_tsquery('{self.config}', %s)"],
+            params=[tsquery],
+            select={'search_rank': f"ts_rank({vector}, to_tsquery('{self.config}', %s))"},
+            select_params=[tsquery],
+            order_by=['-search_rank'],
+        )
+
+
+def sqlite_has_fts5(connection=connection):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any('FTS5' in row[0] for row in cursor.fetchall())
+
+
+def backend_for_connection(connection):
+    """A new instance of the configured backend, choosing one by the connection's vendor by default"""
+    path = getattr(settings, 'SEARCH_BACKEND', '')
+    if path:
+        return import_string(path)()
+    if connection.vendor == 'sqlite' and sqlite_has_fts5(connection):
+        return SQLiteFTSBackend()
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return DatabaseSearchBackend()
+
+
+_backend = None
+
+
+def get_backend():
+    """Return the configured backend instance for the default database"""
+    global _backend
+    if _backend is None:
+        _backend = backend_for_connection(connection)
+    return _backend
+
+
+def search_queryset(key, queryset, query):
+    """Filter a queryset to full-text matches for query, best matches first"""
+    return get_backend().filter(SEARCH_INDEXES[key], queryset, query)
+
+
+def install_indexes():
+    """Create the backend's index structures for every SearchIndex"""
+    backend = get_backend()
+    for index in SEARCH_INDEXES.values():
+        backend.install(index)
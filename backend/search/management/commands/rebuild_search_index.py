@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from search.backends import get_backend
+from search.registry import SEARCH_INDEXES
+
+
+class Command(BaseCommand):
+    help = 'Create and repopulate the full-text search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('indexes', nargs='*', help=f"Indexes to rebuild (default: all of {', '.join(SEARCH_INDEXES)})")
+
+    def handle(self, *args, **options):
+        keys = options['indexes'] or list(SEARCH_INDEXES)
+        unknown = set(keys) - set(SEARCH_INDEXES)
+        if unknown:
+            raise CommandError(f"Unknown search indexes: {', '.join(sorted(unknown))}")
+
+        backend = get_backend()
+        self.stdout.write(f"Using {backend.__class__.__name__}")
+        for key in keys:
+            index = SEARCH_INDEXES[key]
+            backend.install(index)
+            count = backend.rebuild(index)
+            self.stdout.write(f"Indexed {count} rows for {key}")
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def install_search_indexes(apps, schema_editor):
+    # Historical models and the connection being migrated, not the live ones
+    from search.backends import backend_for_connection
+    from search.registry import SEARCH_INDEXES
+
+    connection = schema_editor.connection
+    backend = backend_for_connection(connection)
+    for index in SEARCH_INDEXES.values():
+        model = apps.get_model(index.model_label)
+        backend.install(index, connection=connection, model=model)
+        backend.rebuild(index, connection=connection, model=model)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('events', '0002_registration_seat_counter'),
+        ('clubs', '0001_initial'),
+        ('lost_found', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_indexes, migrations.RunPython.noop),
+    ]
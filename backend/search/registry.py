@@ -0,0 +1,78 @@
+"""
+Models covered by full-text search.
+
+Each SearchIndex names the text fields that are indexed, the queryset and
+serializer used when results are rendered by the unified /api/search/
+endpoint.
+"""
+from django.apps import apps
+from django.utils.module_loading import import_string
+
+
+class SearchIndex:
+    """Description of one searchable model"""
+    
+    def __init__(self, key, model, fields, serializer, queryset=None):
+        self.key = key
+        self.model_label = model
+        self.fields = fields
+        self.serializer_path = serializer
+        self.queryset_builder = queryset
+    
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+    
+    @property
+    def table(self):
+        """Name of the FTS5 table (SQLite) or expression index prefix (Postgres)"""
+        return f'search_{self.key}'
+    
+    @property
+    def serializer_class(self):
+        return import_string(self.serializer_path)
+    
+    def get_queryset(self, request):
+        """Base queryset for rendering results to the requesting user"""
+        if self.queryset_builder is not None:
+            return self.queryset_builder(request)
+        return self.model.objects.all()
+    
+    def get_text(self, instance):
+        return [getattr(instance, field) or '' for field in self.fields]
+
+
+SEARCH_INDEXES = {
+    index.key: index for index in [
+        SearchIndex(
+            'events', 'events.Event', ('title', 'description', 'venue'),
+            serializer='events.serializers.EventSerializer',
+            queryset=lambda request: apps.get_model('events.Event').objects.with_registration_info(request.user),
+        ),
+        SearchIndex(
+            'clubs', 'clubs.Club', ('name', 'description'),
+            serializer='clubs.serializers.ClubSerializer',
+            queryset=lambda request: apps.get_model('clubs.Club').objects.filter(
+                is_active=True
+            ).with_membership_info(request.user),
+        ),
+        SearchIndex(
+            'lost_found', 'lost_found.LostFoundItem', ('title', 'description', 'location'),
+            serializer='lost_found.serializers.LostFoundItemSerializer',
+            queryset=lambda request: apps.get_model('lost_found.LostFoundItem').objects.select_related(
+                'reported_by', 'claimed_by'
+            ),
+        ),
+    ]
+}
+
+
+def get_index(key):
+    return SEARCH_INDEXES[key]
+
+
+def get_index_for_model(model):
+    for index in SEARCH_INDEXES.values():
+        if index.model_label == model._meta.label:
+            return index
+    return None
@@ -0,0 +1,34 @@
+from django.db import DatabaseError
+from django.db.models.signals import post_save, post_delete
+
+from .backends import get_backend
+from .registry import SEARCH_INDEXES, get_index_for_model
+
+
+def update_search_index(sender, instance, **kwargs):
+    """Re-index an instance whenever it is saved"""
+    index = get_index_for_model(sender)
+    if index is None:
+        return
+    try:
+        get_backend().index(index, instance)
+    except DatabaseError as e:
+        # A stale index is repaired by rebuild_search_index; never fail the write itself
+        print(f"❌ Error updating search index: {e}")
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    """Drop an instance from the index when it is deleted"""
+    index = get_index_for_model(sender)
+    if index is None:
+        return
+    try:
+        get_backend().remove(index, instance.pk)
+    except DatabaseError as e:
+        print(f"❌ Error updating search index: {e}")
+
+
+def connect_signals():
+    for index in SEARCH_INDEXES.values():
+        post_save.connect(update_search_index, sender=index.model_label, dispatch_uid=f'search_save_{index.key}')
+        post_delete.connect(remove_from_search_index, sender=index.model_label, dispatch_uid=f'search_delete_{index.key}')
@@ -0,0 +1,46 @@
+from datetime import timedelta
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from events.models import Event
+from .backends import get_backend
+from .registry import SEARCH_INDEXES
+
+User = get_user_model()
+
+initial = import_module('search.migrations.0001_initial')
+
+
+class SearchMigrationTests(APITestCase):
+    """The initial migration builds the indexes from historical models"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='faculty@example.com', password='pass', role='faculty')
+        self.client.force_authenticate(self.user)
+        Event.objects.create(
+            title='Robotics workshop', description='Build a line follower', category='workshop', venue='Lab 3',
+            start_date=timezone.now() + timedelta(days=1), end_date=timezone.now() + timedelta(days=1, hours=3),
+            organizer=self.user,
+        )
+
+    def search_titles(self, query):
+        response = self.client.get('/api/search/', {'q': query, 'types': 'events'})
+        self.assertEqual(response.status_code, 200)
+        return [event['title'] for event in response.data['results']['events']]
+
+    def test_rebuild_with_historical_models(self):
+        self.assertEqual(self.search_titles('robot'), ['Robotics workshop'])
+
+        # Empty the index, then let the migration refill it
+        get_backend().remove(SEARCH_INDEXES['events'], Event.objects.get().pk)
+        self.assertEqual(self.search_titles('robot'), [])
+
+        state = MigrationLoader(connection).project_state(('search', '0001_initial'))
+        initial.install_search_indexes(state.apps, SimpleNamespace(connection=connection))
+        self.assertEqual(self.search_titles('robot'), ['Robotics workshop'])
@@ -0,0 +1,37 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from .backends import search_queryset
+from .registry import SEARCH_INDEXES
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search(request):
+    """Ranked full-text search across events, clubs and lost & found"""
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response(
+            {'error': 'Query parameter q is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    types = request.query_params.get('types')
+    keys = [key for key in types.split(',') if key in SEARCH_INDEXES] if types else list(SEARCH_INDEXES)
+    
+    try:
+        limit = min(int(request.query_params.get('limit', 10)), 50)
+    except ValueError:
+        limit = 10
+    
+    results = {}
+    for key in keys:
+        index = SEARCH_INDEXES[key]
+        matches = search_queryset(key, index.get_queryset(request), query)[:limit]
+        results[key] = index.serializer_class(matches, many=True, context={'request': request}).data
+    
+    return Response({
+        'query': query,
+        'results': results,
+    })